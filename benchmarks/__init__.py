@@ -0,0 +1,6 @@
+"""
+Benchmark Suite für die Hot Paths auf den PiTops
+Läuft gegen simulierte Hardware und lokale Stand-ins für Supabase/Discord:
+
+    python -m benchmarks.run
+"""
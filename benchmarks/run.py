@@ -0,0 +1,395 @@
+"""
+Benchmark Runner
+Misst die Hot Paths gegen simulierte Hardware + lokalen Supabase/Discord Stand-in
+und vergleicht die Ergebnisse mit einer JSON-Baseline.
+
+    python -m benchmarks.run                      # messen + mit Baseline vergleichen
+    python -m benchmarks.run --save-baseline      # aktuelle Werte als Baseline speichern
+    python -m benchmarks.run --only step_detector --output results.json
+
+Exit-Code 1 wenn ein Wert schlechter als Baseline * (1 ± tolerance) ist.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from benchmarks.simulated import install_fake_pitop, walking_samples, FakeSMBus
+from benchmarks.stand_in import StandIn
+from database.local_postgrest import LatencyProfile
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_TOLERANCE = 0.25      # 25% Abweichung erlaubt
+REPORT_SESSION_SIZES = (100, 1000, 10000)
+DB_CLIENTS = ('lite', 'supabase')
+
+# Frischer Interpreter je Messung: Import + Verbindungsaufbau von SupabaseManager, danach Spitzen-RSS
+DB_CLIENT_SCRIPT = '''
+import json, resource, time
+start = time.perf_counter()
+from database.supabase_manager import SupabaseManager
+db = SupabaseManager()
+startup = (time.perf_counter() - start) * 1000
+print(json.dumps({'ok': db.client is not None, 'startup_ms': startup,
+                  'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+'''
+
+
+# ===== SETUP =====
+
+def setup_environment(stand_in):
+    """Konfiguriert config.py auf den Stand-in und lädt simulierte Hardware"""
+    env_file = tempfile.NamedTemporaryFile('w', suffix='.env', delete=False)
+    env_file.write(
+        f"DEVICE_ID=bench\n"
+        f"USER_NAME=Bench\n"
+        f"SUPABASE_URL={stand_in.url}\n"
+        f"SUPABASE_KEY=bench\n"
+        f"DISCORD_WEBHOOK_URL={stand_in.webhook_url}\n"
+        f"LOCAL_STORE_FILE={env_file.name}.log\n"
+    )
+    env_file.close()
+    os.environ['ENV_FILE'] = env_file.name
+    os.environ['DEVICE_OVERRIDE'] = 'pitop1'
+
+    install_fake_pitop()
+
+    import hardware.i2c_bus as i2c_bus
+    import hardware.step_counter as step_counter
+    i2c_bus.SMBus = FakeSMBus
+    step_counter.I2C_AVAILABLE = True
+    return env_file.name
+
+
+def _median_ms(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+# ===== BENCHMARKS =====
+
+def bench_step_detector(stand_in):
+    """Durchsatz der Schritt-Erkennung in Samples/s"""
+    from hardware.step_counter import StepDetector
+
+    samples = walking_samples(50_000)
+    detector = StepDetector()
+    steps = 0
+    start = time.perf_counter()
+    for i, accel in enumerate(samples):
+        if detector.update(accel, i * 0.02):
+            steps += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        'step_detector_throughput': {
+            'value': len(samples) / elapsed, 'unit': 'samples/s', 'better': 'higher',
+            'steps': steps
+        }
+    }
+
+
+def bench_read_acceleration(stand_in):
+    """Kosten eines _read_acceleration() Aufrufs (I2C Read + Dekodierung)"""
+    from hardware.step_counter import StepCounter
+
+    counter = StepCounter(sampling_process=False)
+    calls = 20_000
+    start = time.perf_counter()
+    for _ in range(calls):
+        counter._read_acceleration()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'read_acceleration_decode': {
+            'value': elapsed / calls * 1e6, 'unit': 'us/call', 'better': 'lower'
+        }
+    }
+
+
+def _seed_session(stand_in, co2_rows, pauses=3):
+    session_id = str(uuid.uuid4())
+    start = datetime.utcnow() - timedelta(seconds=co2_rows * 30)
+    stand_in.insert_rows('sessions', [{
+        'session_id': session_id,
+        'start_time': start.isoformat(),
+        'end_time': datetime.utcnow().isoformat(),
+        'timer_status': 'ended',
+        'user_name': 'Bench',
+        'pause_count': pauses,
+        'total_work_time': co2_rows * 30,
+        'total_pause_time': pauses * 600,
+        'device_id': 'bench'
+    }])
+    stand_in.insert_rows('co2_measurements', [{
+        'session_id': session_id,
+        'co2_level': 450 + (i * 7) % 500,
+        'tvoc_level': 20 + i % 80,
+        'is_alarm': (i * 7) % 500 >= 150,
+        'alarm_type': None,
+        'device_id': 'bench'
+    } for i in range(co2_rows)])
+    stand_in.insert_rows('breakdata', [{
+        'session_id': session_id,
+        'pause_number': n + 1,
+        'step_count': 800,
+        'calories_burned': 40,
+        'distance_meters': 600,
+        'device_id': 'bench'
+    } for n in range(pauses)])
+    return session_id
+
+
+def bench_session_report(stand_in):
+    """get_session_report_data() Laufzeit in Abhängigkeit der Session-Länge"""
+    from database.supabase_manager import SupabaseManager
+
+    db = SupabaseManager()
+    results = {}
+    for size in REPORT_SESSION_SIZES:
+        session_id = _seed_session(stand_in, size)
+        results[f'session_report_{size}'] = {
+            'value': _median_ms(lambda: db.get_session_report_data(session_id)),
+            'unit': 'ms', 'better': 'lower', 'co2_rows': size
+        }
+    return results
+
+
+def bench_button_to_db(stand_in, repeat=5):
+    """Latenz vom Button-Release bis der DB-Write beim Stand-in ankommt"""
+    import main_pitop1
+
+    session = main_pitop1.LearningSession()
+    work_latencies = []
+    break_latencies = []
+    release_latencies = []   # Wie lange der GPIO-Callback blockiert
+
+    for _ in range(repeat):
+        # Button 1: Arbeitsphase starten → sessions INSERT
+        start = time.perf_counter()
+        session.button1.button.press()
+        session.button1.button.release()
+        release_latencies.append((time.perf_counter() - start) * 1000)
+        received = stand_in.wait_for('POST', 'sessions', since=start)
+        work_latencies.append((received - start) * 1000)
+
+        session.commands.join()
+        session.timer_stop_event.set()
+        session.state = "WORK_DONE"
+
+        # Button 2: Pause starten → session_events INSERT break_started
+        start = time.perf_counter()
+        session.button2.button.press()
+        session.button2.button.release()
+        release_latencies.append((time.perf_counter() - start) * 1000)
+        received = stand_in.wait_for(
+            'POST', 'session_events', since=start,
+            predicate=lambda body: body.get('event_type') == 'break_started'
+        )
+        break_latencies.append((received - start) * 1000)
+
+        session.commands.join()
+        session.timer_stop_event.set()
+        session.state = "IDLE"
+        session.session_id = None
+        session.action_history.clear()
+
+    session.commands.stop()
+    session.checkpoint.clear()   # Benchmark-Session nicht beim nächsten Start fortsetzen
+    session.writer.stop()
+    session.store.close()
+    os.unlink(session.store.path)
+    return {
+        'button1_to_session_insert': {
+            'value': statistics.median(work_latencies), 'unit': 'ms', 'better': 'lower'
+        },
+        'button2_to_break_status': {
+            'value': statistics.median(break_latencies), 'unit': 'ms', 'better': 'lower'
+        },
+        'button_release_blocking': {
+            'value': max(release_latencies), 'unit': 'ms', 'better': 'lower'
+        }
+    }
+
+
+def bench_local_store(stand_in, writes=5000):
+    """Latenz von LocalStore.put() im Aufrufer-Thread (Checkpoint-große Werte) + fsyncs"""
+    from services.local_store import LocalStore
+
+    fd, path = tempfile.mkstemp(suffix='.log')
+    os.close(fd)   # leere Datei = leeres Log
+    store = LocalStore(path).open()
+    value = {'session_id': str(uuid.uuid4()), 'state': 'WORKING', 'phase_started_at': time.time(),
+             'action_history': [{'action': 'work_started', 'at': time.time()}] * 10}
+    latencies = []
+    try:
+        for i in range(writes):
+            value['total_work_time'] = i
+            start = time.perf_counter()
+            store.put('checkpoint', value)
+            latencies.append((time.perf_counter() - start) * 1e6)
+            if i % 50 == 0:
+                time.sleep(0.01)   # Commit-Thread kommt zum Zug
+        store.sync()
+        commits = store.commits
+    finally:
+        store.close()
+        os.unlink(path)
+
+    return {
+        'local_store_put_p99': {
+            'value': sorted(latencies)[int(len(latencies) * 0.99)], 'unit': 'us', 'better': 'lower'
+        },
+        'local_store_fsyncs_per_1000_writes': {
+            'value': commits / writes * 1000, 'unit': 'fsyncs', 'better': 'lower'
+        }
+    }
+
+
+def bench_db_client(stand_in, repeat=3):
+    """Startzeit und Speicher von SupabaseManager mit PostgREST Lite vs. supabase SDK (DB_CLIENT)"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = {}
+    for client in DB_CLIENTS:
+        if client == 'supabase' and importlib.util.find_spec('supabase') is None:
+            print("   ℹ️  supabase SDK nicht installiert - nur PostgREST Lite gemessen")
+            continue
+        env = dict(os.environ, DB_CLIENT=client, PYTHONPATH=root)
+        runs = []
+        for _ in range(repeat):
+            out = subprocess.run([sys.executable, '-c', DB_CLIENT_SCRIPT], env=env, cwd=root,
+                                 capture_output=True, text=True, check=True).stdout
+            run = json.loads(out.strip().splitlines()[-1])
+            if not run['ok']:
+                raise RuntimeError(f"DB_CLIENT={client}: keine Verbindung zum Stand-in")
+            runs.append(run)
+        results[f'db_client_{client}_startup'] = {
+            'value': statistics.median(r['startup_ms'] for r in runs), 'unit': 'ms', 'better': 'lower'
+        }
+        results[f'db_client_{client}_rss'] = {
+            'value': statistics.median(r['rss_mb'] for r in runs), 'unit': 'MB', 'better': 'lower'
+        }
+    return results
+
+
+BENCHMARKS = {
+    'step_detector': bench_step_detector,
+    'read_acceleration': bench_read_acceleration,
+    'session_report': bench_session_report,
+    'button_to_db': bench_button_to_db,
+    'local_store': bench_local_store,
+    'db_client': bench_db_client,
+}
+
+
+# ===== BASELINE =====
+
+def compare(results, baseline):
+    """Gibt Liste der Regressionen zurück (name, wert, baseline)"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        tolerance = base.get('tolerance', DEFAULT_TOLERANCE)
+        if result['better'] == 'higher':
+            regressed = result['value'] < base['value'] * (1 - tolerance)
+        else:
+            regressed = result['value'] > base['value'] * (1 + tolerance)
+        if regressed:
+            regressions.append((name, result['value'], base['value']))
+    return regressions
+
+
+def save_baseline(results, path):
+    baseline = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            baseline = json.load(f)
+    for name, result in results.items():
+        tolerance = baseline.get(name, {}).get('tolerance', DEFAULT_TOLERANCE)
+        baseline[name] = {
+            'value': result['value'], 'unit': result['unit'],
+            'better': result['better'], 'tolerance': tolerance
+        }
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Learning Assistant Benchmarks')
+    parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS),
+                        help='Nur diese Benchmarks ausführen (mehrfach möglich)')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='Pfad zur Baseline-JSON')
+    parser.add_argument('--save-baseline', action='store_true', help='Ergebnisse als Baseline speichern')
+    parser.add_argument('--output', help='Ergebnisse zusätzlich als JSON speichern')
+    parser.add_argument('--db-latency', type=float, default=0.0,
+                        help='Simulierte Supabase-Latenz in ms (Standard: 0 = nur lokale Kosten)')
+    parser.add_argument('--db-jitter', type=float, default=0.0, help='Jitter der Latenz ± ms')
+    args = parser.parse_args(argv)
+
+    stand_in = StandIn(latency=LatencyProfile(args.db_latency, args.db_jitter)).start()
+    env_file = setup_environment(stand_in)
+
+    results = {}
+    try:
+        for name in args.only or BENCHMARKS:
+            print(f"\n⏱️  Benchmark: {name}")
+            results.update(BENCHMARKS[name](stand_in))
+    finally:
+        stand_in.stop()
+        os.unlink(env_file)
+
+    print("\n" + "="*60)
+    print("📊 BENCHMARK ERGEBNISSE")
+    print("="*60)
+    for name, result in sorted(results.items()):
+        print(f"   {name:<30} {result['value']:>14,.2f} {result['unit']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'created_at': datetime.utcnow().isoformat(),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'results': results
+            }, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\n💾 Baseline gespeichert: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("\nℹ️  Keine Baseline vorhanden (--save-baseline zum Anlegen)")
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f))
+
+    if regressions:
+        print("\n❌ REGRESSIONEN:")
+        for name, value, base in regressions:
+            print(f"   {name}: {value:,.2f} (Baseline {base:,.2f})")
+        return 1
+
+    print("\n✅ Keine Regressionen gegenüber Baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Simulierte Hardware für Benchmarks
+Ersetzt pi-top SDK (Buttons, LED, Buzzer) und den I2C-Bus des BMA456
+"""
+
+import math
+import random
+import sys
+import types
+
+BMA456_CHIP_ID = 0x16
+
+
+# ===== PI-TOP SDK =====
+
+class FakeButton:
+    def __init__(self, pin_name):
+        self.pin_name = pin_name
+        self.when_pressed = None
+        self.when_released = None
+    
+    def press(self):
+        if self.when_pressed:
+            self.when_pressed()
+    
+    def release(self):
+        if self.when_released:
+            self.when_released()
+    
+    def close(self):
+        pass
+
+
+class FakeOutput:
+    def __init__(self, pin_name):
+        self.pin_name = pin_name
+        self.is_on = False
+    
+    def on(self):
+        self.is_on = True
+    
+    def off(self):
+        self.is_on = False
+    
+    def close(self):
+        pass
+
+
+def install_fake_pitop():
+    """Registriert ein simuliertes 'pitop' Modul (vor dem Import von hardware!)"""
+    module = types.ModuleType('pitop')
+    module.Button = FakeButton
+    module.LED = FakeOutput
+    module.Buzzer = FakeOutput
+    sys.modules['pitop'] = module
+    sys.modules['lgpio'] = None   # Buttons ohne echte GPIO-Flanken → pi-top Callbacks
+    return module
+
+
+# ===== BMA456 / I2C =====
+
+def walking_samples(count, rate_hz=50, cadence_hz=1.8, seed=42):
+    """Erzeugt (x, y, z) in g für gleichmäßiges Gehen (deterministisch)"""
+    rng = random.Random(seed)
+    samples = []
+    for i in range(count):
+        t = i / rate_hz
+        z = 1.0 + 0.35 * math.sin(2 * math.pi * cadence_hz * t) + rng.gauss(0, 0.02)
+        x = 0.05 * math.sin(math.pi * cadence_hz * t) + rng.gauss(0, 0.02)
+        y = rng.gauss(0, 0.02)
+        samples.append((x, y, z))
+    return samples
+
+
+def encode_sample(accel, acc_range=4):
+    """Kodiert (x, y, z) in g als 6 Bytes wie im BMA456 Datenregister"""
+    data = []
+    for value in accel:
+        raw = int(round(value * 32768.0 / acc_range))
+        raw = max(-32768, min(32767, raw)) & 0xFFFF
+        data.extend([raw & 0xFF, raw >> 8])
+    return data
+
+
+class FakeSMBus:
+    """Ersatz für smbus2.SMBus - liefert aufgezeichnete Samples im Kreis"""
+    
+    samples = [encode_sample(s) for s in walking_samples(500)]
+    cursor = 0  # Global über alle Instanzen (StepCounter öffnet pro Read einen neuen Bus)
+    
+    def __init__(self, bus=1):
+        self.bus = bus
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
+    
+    def close(self):
+        pass
+    
+    def read_byte_data(self, addr, reg):
+        return BMA456_CHIP_ID if reg == 0x00 else 0
+    
+    def write_byte_data(self, addr, reg, value):
+        pass
+    
+    def read_i2c_block_data(self, addr, reg, length):
+        data = FakeSMBus.samples[FakeSMBus.cursor % len(FakeSMBus.samples)]
+        FakeSMBus.cursor += 1
+        return data[:length]
@@ -0,0 +1,30 @@
+"""
+Lokaler HTTP Stand-in für Supabase und Discord Webhooks
+Supabase-Teil: database.local_postgrest (SQLite, Latenz-/Fehlerprofile)
+Zusätzlich nimmt /webhook Discord-Nachrichten entgegen (204 wie Discord).
+"""
+
+from database.local_postgrest import LocalPostgrest, _Handler
+
+WEBHOOK_PATH = '/webhook'
+
+
+class _WebhookHandler(_Handler):
+    def handle_other(self, method, path, body):
+        if path != WEBHOOK_PATH:
+            return False
+        self.server_ref.webhooks.append(body)
+        self.server_ref._record(method, 'webhook', body)
+        self._reply(204)
+        return True
+
+
+class StandIn(LocalPostgrest):
+    def __init__(self, host='127.0.0.1', port=0, latency=None, failures=None):
+        super().__init__(host=host, port=port, latency=latency, failures=failures)
+        self.webhooks = []
+        self.server.RequestHandlerClass = type('Handler', (_WebhookHandler,), {'server_ref': self})
+
+    @property
+    def webhook_url(self):
+        return self.url + WEBHOOK_PATH
@@ -38,8 +38,8 @@ def load_env_for_device():
                 print("   Oder setze: DEVICE_OVERRIDE=pitop1")
                 sys.exit(1)
     
-    # .env File laden
-    env_file = f'.env.{device}'
+    # .env File laden (ENV_FILE überschreibt den Standardpfad, z.B. für Benchmarks)
+    env_file = os.environ.get('ENV_FILE') or f'.env.{device}'
     
     if os.path.exists(env_file):
         load_dotenv(env_file)
@@ -61,6 +61,15 @@ USER_HEIGHT = int(os.getenv('USER_HEIGHT', '165'))
 SUPABASE_URL = os.getenv('SUPABASE_URL', '')
 SUPABASE_KEY = os.getenv('SUPABASE_KEY', '')
 DISCORD_WEBHOOK_URL = os.getenv('DISCORD_WEBHOOK_URL', '')
+DATABASE_URL = os.getenv('DATABASE_URL', '')  # Direkte Postgres-Verbindung (nur für database/migrate.py)
+DB_CLIENT = os.getenv('DB_CLIENT', 'lite').lower()  # 'lite' (database/postgrest_lite.py) oder 'supabase' (SDK)
+
+# Peer Link (services/peer_link.py) - direkte LAN-Verbindung PiTop 1 → PiTop 2
+PEER_DEVICE_ID = os.getenv('PEER_DEVICE_ID', '')   # DEVICE_ID des gepaarten Geräts (leer = aus)
+PEER_SECRET = os.getenv('PEER_SECRET', '')         # Gemeinsames Geheimnis (HMAC), auf beiden gleich
+PEER_GROUP = os.getenv('PEER_GROUP', '239.255.42.99')
+PEER_PORT = int(os.getenv('PEER_PORT', '50042'))
+CLOCK_SYNC_INTERVAL = int(os.getenv('CLOCK_SYNC_INTERVAL', '60'))   # Uhren-Offset zu PiTop 1 messen (s)
 
 # ===== HARDCODED KONSTANTEN =====
 
@@ -76,6 +85,10 @@ SHORT_PRESS_MAX = float(os.getenv('SHORT_PRESS_MAX', '0.5'))  # Max 0.5s für Sh
 CANCEL_PRESS = float(os.getenv('CANCEL_PRESS', '3.0'))        # 3s = Letzte Aktion stornieren
 END_SESSION_PRESS = float(os.getenv('END_SESSION_PRESS', '7.0'))  # 7s = Session beenden
 
+# Flanken mit Kernel-Zeitstempel (hardware/gpio_edges.py, lgpio)
+GPIO_CHIP = int(os.getenv('GPIO_CHIP', '0'))                          # Pi 5 mit älterem Kernel: 4
+BUTTON_DEBOUNCE_MS = float(os.getenv('BUTTON_DEBOUNCE_MS', '20'))    # Entprellung im Treiber
+
 # Legacy (für Kompatibilität, falls noch verwendet)
 DOUBLE_CLICK_INTERVAL = float(os.getenv('DOUBLE_CLICK_INTERVAL', '0.5'))
 
@@ -84,6 +97,9 @@ CO2_WARNING_THRESHOLD = int(os.getenv('CO2_WARNING_THRESHOLD', '600'))
 CO2_CRITICAL_THRESHOLD = int(os.getenv('CO2_CRITICAL_THRESHOLD', '800'))
 CO2_MEASUREMENT_INTERVAL = int(os.getenv('CO2_MEASUREMENT_INTERVAL', '120'))
 CO2_CHECK_INTERVAL = int(os.getenv('CO2_CHECK_INTERVAL', '30'))
+CO2_RAW_RETENTION_DAYS = int(os.getenv('CO2_RAW_RETENTION_DAYS', '30'))  # Danach → Rollups (database/co2_rollup.py)
+CO2_BATCH_SIZE = int(os.getenv('CO2_BATCH_SIZE', '60'))            # Messungen pro co2_batches-Zeile
+CO2_BATCH_MAX_AGE = int(os.getenv('CO2_BATCH_MAX_AGE', '600'))     # Spätestens nach 10 Min schreiben (s)
 
 # LED
 LED_BLINK_FAST = float(os.getenv('LED_BLINK_FAST', '0.1'))
@@ -102,6 +118,44 @@ METERS_PER_STEP = float(os.getenv('METERS_PER_STEP', '0.75'))
 STEP_UPDATE_INTERVAL = int(os.getenv('STEP_UPDATE_INTERVAL', '5'))
 PAUSE_POLL_INTERVAL = int(os.getenv('PAUSE_POLL_INTERVAL', '1'))
 
+# Sensor-Sampling in eigenem Prozess (hardware/sensor_process.py)
+SENSOR_PROCESS = os.getenv('SENSOR_PROCESS', 'true').lower() in ('1', 'true', 'yes')
+STEP_SAMPLE_RATE = float(os.getenv('STEP_SAMPLE_RATE', '50'))          # BMA456 Samples pro Sekunde
+CO2_SAMPLE_INTERVAL = float(os.getenv('CO2_SAMPLE_INTERVAL', '1.0'))   # SGP30 braucht 1 Hz
+STEP_IDLE_POWER = os.getenv('STEP_IDLE_POWER', 'suspend')   # BMA456 außerhalb der Pause: suspend / low_power / active
+
+# Crash-Recovery (services/checkpoint.py)
+CHECKPOINT_FILE = os.getenv('CHECKPOINT_FILE', f'.checkpoint.{CURRENT_DEVICE}.json')
+CHECKPOINT_HEARTBEAT_INTERVAL = int(os.getenv('CHECKPOINT_HEARTBEAT_INTERVAL', '60'))  # Zwischensummen → sessions
+CHECKPOINT_SAVE_INTERVAL = int(os.getenv('CHECKPOINT_SAVE_INTERVAL', '10'))  # laufende Phase → lokaler Checkpoint (Restzeit ohne Wanduhr)
+
+# Lokaler Speicher (services/local_store.py): Checkpoint + Write-Queue als Log mit Group Commit
+LOCAL_STORE_FILE = os.getenv('LOCAL_STORE_FILE', f'.local.{CURRENT_DEVICE}.log')
+LOCAL_STORE_COMMIT_MS = int(os.getenv('LOCAL_STORE_COMMIT_MS', '200'))            # fsync-Intervall = max. Verlust bei Stromausfall
+LOCAL_STORE_COMMIT_RECORDS = int(os.getenv('LOCAL_STORE_COMMIT_RECORDS', '64'))   # früher committen ab so vielen Records
+
+# Write-Behind (services/write_behind.py): vom Server abgelehnte Writes (5xx, fehlende Session)
+# erst nach so vielen Versuchen UND Sekunden ablegen - Netzwerkausfälle werden unbegrenzt wiederholt
+WRITE_BEHIND_MAX_ATTEMPTS = int(os.getenv('WRITE_BEHIND_MAX_ATTEMPTS', '20'))
+WRITE_BEHIND_MAX_AGE = float(os.getenv('WRITE_BEHIND_MAX_AGE', '3600'))
+
+# Session-Cache in SupabaseManager (database/session_cache.py), 0 = aus
+SESSION_CACHE_TTL = float(os.getenv('SESSION_CACHE_TTL', '30'))
+
+# Wochen-/Monats-Digest (services/digest.py)
+DIGEST_WEBHOOKS_FILE = os.getenv('DIGEST_WEBHOOKS_FILE', '')   # JSON {user_name: webhook_url}, leer = DISCORD_WEBHOOK_URL
+DIGEST_WORKERS = int(os.getenv('DIGEST_WORKERS', '4'))        # Parallele Webhook-Requests
+
+# Auswertungen (database/analytics.py)
+ANALYTICS_TIMEZONE = os.getenv('ANALYTICS_TIMEZONE', 'Europe/Berlin')   # Heatmap in lokaler Zeit
+SUMMARY_TIMEZONE = os.getenv('SUMMARY_TIMEZONE', ANALYTICS_TIMEZONE)   # Tag der Tages-Zusammenfassungen (nicht die Systemzeitzone)
+
+# Export (database/export.py)
+EXPORT_DIR = os.getenv('EXPORT_DIR', 'export')               # Zielverzeichnis inkl. High-Water-Mark
+EXPORT_FORMAT = os.getenv('EXPORT_FORMAT', 'parquet')        # parquet (pyarrow) oder csv (gzip)
+EXPORT_SAFETY_LAG = int(os.getenv('EXPORT_SAFETY_LAG', '60'))          # s - jüngere Zeilen erst im nächsten Lauf
+EXPORT_OPEN_SESSION_DAYS = int(os.getenv('EXPORT_OPEN_SESSION_DAYS', '7'))   # länger offene Sessions trotzdem exportieren
+
 # ===== DEBUG OUTPUT =====
 if __name__ == '__main__':
     # Wenn direkt ausgeführt, zeige alle Werte
@@ -0,0 +1,451 @@
+"""
+Analytics - vektorisierte Auswertungen über alle Sessions (pandas/NumPy)
+Lädt sessions, CO2-Messungen (co2_measurements + co2_batches), breakdata und
+session_events spaltenweise als CSV in DataFrames - ein COPY pro Tabelle statt
+Millionen Zeilen-Dicts - und rechnet ohne Python-Schleifen:
+
+    exposure        Minuten über CO2_WARNING_THRESHOLD pro Nutzer (zeitgewichtet)
+    steps_vs_work   Korrelation Schritte einer Pause ↔ Länge der folgenden Arbeitsphase
+    heatmap         Ø CO2 pro Wochentag × Stunde (zeitgewichtet, lokale Zeit)
+
+Quellen (in dieser Reihenfolge):
+    --csv DIR       <tabelle>.csv[.gz] (synthetic_data --csv) oder CSV-Export (database/export.py)
+    DATABASE_URL    COPY (SELECT ...) TO STDOUT per psycopg2 - ein Request pro Tabelle
+    Supabase        PostgREST CSV-Seiten (Accept: text/csv, Keyset über id)
+
+    python -m database.analytics --csv export/
+    python -m database.analytics --since 2025-01-01 --threshold 800
+
+Optional: pip install pandas (nicht auf den PiTops nötig - läuft z.B. am Laptop).
+"""
+
+import argparse
+import glob
+import io
+import os
+import sys
+import time
+
+try:
+    import numpy as np
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+try:
+    import psycopg2
+    PSYCOPG_AVAILABLE = True
+except ImportError:
+    PSYCOPG_AVAILABLE = False
+
+COLUMNS = {
+    'sessions': ['session_id', 'user_name', 'device_id', 'start_time', 'end_time',
+                 'pause_count', 'total_work_time', 'total_pause_time'],
+    'co2_measurements': ['session_id', 'co2_level', 'tvoc_level', 'is_alarm', 'created_at'],
+    'co2_batches': ['session_id', 'started_at', 'offsets_ms', 'co2_levels', 'tvoc_levels', 'alarm_flags'],
+    'breakdata': ['session_id', 'pause_number', 'step_count', 'calories_burned', 'distance_meters',
+                  'created_at'],
+    'session_events': ['session_id', 'event_type', 'occurred_at', 'payload'],
+}
+TIME_COLUMNS = {
+    'sessions': ['start_time', 'end_time'],
+    'co2_measurements': ['created_at'],
+    'co2_batches': ['started_at'],
+    'breakdata': ['created_at'],
+    'session_events': ['occurred_at'],
+}
+SINCE_COLUMN = {table: columns[0] for table, columns in TIME_COLUMNS.items()}
+DTYPES = {
+    'session_id': 'category',
+    'co2_level': 'float32',
+    'tvoc_level': 'float32',
+    'step_count': 'float32',
+    'pause_number': 'float32',
+    'event_type': 'category',
+    'user_name': 'category',
+    'device_id': 'category',
+}
+
+CO2_WARNING_THRESHOLD = 600   # Standard ohne config (--csv am Laptop)
+TIMEZONE = 'Europe/Berlin'
+MAX_SAMPLE_GAP = 120       # s - längere Lücke zählt nicht (Sensor aus, Pause, Session-Ende)
+WORK_END_EVENTS = ('work_ended', 'ended')   # storniert (cancelled) zählt nicht als Arbeitsphase
+WEEKDAYS = ['Mo', 'Di', 'Mi', 'Do', 'Fr', 'Sa', 'So']
+REST_PAGE_SIZE = 1000
+
+
+# ===== QUELLEN =====
+
+class CsvSource:
+    """Verzeichnis mit <tabelle>.csv[.gz] (synthetic_data --csv) oder
+    <tabelle>/<gerät>/<monat>/part-*.csv.gz (database/export.py --format csv)"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def read(self, table, columns, since=None):
+        paths = glob.glob(os.path.join(self.directory, f"{table}.csv*")) \
+            or sorted(glob.glob(os.path.join(self.directory, table, '*', '*', '*.csv.gz')))
+        if not paths:
+            return None
+        header = pd.read_csv(paths[0], nrows=0).columns
+        usecols = [c for c in columns if c in header]
+        frames = [_read_csv(path, table, usecols) for path in paths]
+        frame = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        if 'session_id' in frame:
+            frame['session_id'] = frame['session_id'].astype('category')   # concat: Kategorien vereinigen
+        if since is not None and SINCE_COLUMN[table] in frame:
+            frame = frame[frame[SINCE_COLUMN[table]] >= since]
+        return frame
+
+
+class PostgresSource:
+    """COPY (SELECT ...) TO STDOUT - eine Abfrage und ein CSV-Stream pro Tabelle"""
+
+    def __init__(self, database_url):
+        if not PSYCOPG_AVAILABLE:
+            raise RuntimeError("psycopg2 nicht installiert - pip install psycopg2-binary")
+        self.conn = psycopg2.connect(database_url)
+
+    def read(self, table, columns, since=None):
+        where = f" WHERE {SINCE_COLUMN[table]} >= %s" if since is not None else ''
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s)", (table,))
+            if cur.fetchone()[0] is None:
+                return None
+            query = cur.mogrify(f"SELECT {', '.join(columns)} FROM {table}{where}",
+                                (since.isoformat(),) if since is not None else None).decode()
+            buffer = io.BytesIO()
+            cur.copy_expert(f"COPY ({query}) TO STDOUT WITH CSV HEADER", buffer)
+        buffer.seek(0)
+        return _read_csv(buffer, table, columns)
+
+
+class RestSource:
+    """PostgREST CSV-Seiten (Accept: text/csv) - ohne Datenbank-Zugang, dafür ein Request pro Seite"""
+
+    def __init__(self, db, page_size=REST_PAGE_SIZE):
+        self.db = db
+        self.page_size = page_size
+
+    def read(self, table, columns, since=None):
+        pages = []
+        last_id = 0
+        while True:
+            query = self.db.client.table(table).select(', '.join(['id'] + columns))
+            if since is not None:
+                query = query.gte(SINCE_COLUMN[table], since.isoformat())
+            try:
+                text = query.gt('id', last_id).order('id').limit(self.page_size).csv().execute().data
+            except Exception as e:
+                if pages:
+                    raise
+                print(f"⚠️  {table} nicht verfügbar ({e})")
+                return None
+            page = _read_csv(io.StringIO(text), table, ['id'] + columns)
+            if len(page):
+                pages.append(page)
+                last_id = int(page['id'].iloc[-1])
+            if len(page) < self.page_size:
+                break
+        if not pages:
+            return _read_csv(io.StringIO(','.join(columns) + '\n'), table, columns)
+        return pd.concat(pages, ignore_index=True).drop(columns='id')
+
+
+def _read_csv(source, table, columns):
+    frame = pd.read_csv(source, usecols=columns,
+                        dtype={c: t for c, t in DTYPES.items() if c in columns},
+                        true_values=['t', 'true', 'True'], false_values=['f', 'false', 'False'])
+    for column in TIME_COLUMNS[table]:
+        if column in frame:
+            frame[column] = pd.to_datetime(frame[column], utc=True, format='ISO8601')
+    return frame
+
+
+def _empty(table):
+    """Leerer DataFrame mit den Spalten und Typen der Tabelle (Tabelle fehlt / keine Zeilen)"""
+    return _read_csv(io.StringIO(','.join(COLUMNS[table]) + '\n'), table, COLUMNS[table])
+
+
+def _booleans(series):
+    if series.dtype == bool:
+        return series
+    return series.astype(str).str.lower().isin(('t', 'true', '1'))
+
+
+def _explode_batches(batches):
+    """co2_batches (Arrays als '{1,2,3}') → eine Zeile pro Messung, ohne Python-Schleife"""
+    if batches is None or batches.empty:
+        return None
+
+    def flat(column, numeric=True):
+        text = batches[column].fillna('{}').str.strip('{}')
+        joined = ','.join(t for t in text if t)
+        values = pd.Series(joined.split(',') if joined else [], dtype=object)
+        return pd.to_numeric(values.replace('NULL', np.nan), errors='coerce') if numeric else values
+
+    text = batches['offsets_ms'].fillna('{}').str.strip('{}')
+    lengths = np.where(text.str.len() > 0, text.str.count(',') + 1, 0)
+    offsets = flat('offsets_ms').to_numpy()
+    started = np.repeat(batches['started_at'].dt.tz_convert(None).to_numpy(), lengths)
+    return pd.DataFrame({
+        'session_id': np.repeat(batches['session_id'].to_numpy(), lengths),
+        'co2_level': flat('co2_levels').to_numpy(dtype='float32'),
+        'tvoc_level': flat('tvoc_levels').to_numpy(dtype='float32'),
+        'is_alarm': _booleans(flat('alarm_flags', numeric=False)).to_numpy(),
+        'created_at': pd.DatetimeIndex(started).tz_localize('UTC') + pd.to_timedelta(offsets, unit='ms'),
+    })
+
+
+# ===== DATEN =====
+
+class FleetData:
+    """Alle Tabellen als DataFrames (UTC-Zeitstempel), CO2 aus Rohdaten + Batches"""
+
+    def __init__(self, sessions, co2, breaks, events=None):
+        self.sessions = sessions
+        self.co2 = co2
+        self.breaks = breaks
+        self.events = events
+
+    @classmethod
+    def load(cls, source, since=None):
+        if not PANDAS_AVAILABLE:
+            raise RuntimeError("pandas nicht installiert - pip install pandas")
+        if since is not None:
+            since = pd.Timestamp(since, tz='UTC') if pd.Timestamp(since).tzinfo is None else pd.Timestamp(since)
+
+        frames = {}
+        for table, columns in COLUMNS.items():
+            started = time.perf_counter()
+            frames[table] = source.read(table, columns, since)
+            rows = 0 if frames[table] is None else len(frames[table])
+            print(f"   📥 {table:<17} {rows:>12,} Zeilen  {time.perf_counter() - started:6.2f} s")
+
+        for table in ('sessions', 'co2_measurements', 'breakdata'):
+            if frames[table] is None:
+                frames[table] = _empty(table)
+
+        co2 = frames['co2_measurements']
+        co2['is_alarm'] = _booleans(co2['is_alarm'])
+        batched = _explode_batches(frames['co2_batches'])
+        if batched is not None:
+            co2 = pd.concat([co2, batched], ignore_index=True)
+
+        sessions = frames['sessions']
+        # Nutzer/Gerät an die Messungen hängen (für Gruppierungen)
+        co2['session_id'] = co2['session_id'].astype('category')   # nach concat mit Batches ggf. object
+        session_ids = sessions['session_id'].astype(str)
+        for column in ('user_name', 'device_id'):
+            # Categorical.map: ein Lookup pro Session statt pro Messung
+            co2[column] = co2['session_id'].map(dict(zip(session_ids, sessions[column].astype(str))))
+        return cls(sessions, with_durations(co2), frames['breakdata'], frames['session_events'])
+
+
+def with_durations(co2):
+    """Sortiert nach Session + Zeit, Spalte seconds = Gewicht jeder Messung:
+    Sekunden bis zur nächsten Messung der Session (letzte: Median der Session), max MAX_SAMPLE_GAP"""
+    codes = co2['session_id'].cat.codes.to_numpy()
+    stamps = co2['created_at'].dt.tz_convert(None).to_numpy()   # datetime64 statt Timestamp-Objekte
+    order = np.lexsort((stamps, codes))
+    co2 = co2.iloc[order].reset_index(drop=True)
+    codes, stamps = codes[order], stamps[order]
+
+    seconds = np.full(len(co2), np.nan)
+    same = codes[1:] == codes[:-1]
+    seconds[:-1] = np.where(same, (stamps[1:] - stamps[:-1]) / np.timedelta64(1, 's'), np.nan)
+    seconds = pd.Series(seconds)
+    median = seconds.groupby(codes, sort=False).transform('median')
+    co2['seconds'] = seconds.fillna(median).fillna(0).clip(upper=MAX_SAMPLE_GAP).to_numpy()
+    return co2
+
+
+# ===== AUSWERTUNGEN =====
+
+def exposure(data, threshold=None, by='user_name'):
+    """CO2-Exposition: Minuten über threshold pro Nutzer/Gerät (Messungen zeitgewichtet)"""
+    if threshold is None:
+        import config
+        threshold = config.CO2_WARNING_THRESHOLD
+    co2 = data.co2
+    seconds = co2['seconds'].to_numpy()
+    above = co2['co2_level'].to_numpy() > threshold
+
+    frame = pd.DataFrame({
+        by: co2[by].array,
+        'measured_min': seconds / 60,
+        'exposure_min': np.where(above, seconds, 0) / 60,
+        'co2_seconds': co2['co2_level'].to_numpy() * seconds,
+        'seconds': seconds,
+        'co2_max': co2['co2_level'].to_numpy(),
+        'session_id': co2['session_id'].cat.codes.to_numpy(),
+    })
+    grouped = frame.groupby(by, observed=True)
+    result = grouped.agg(
+        sessions=('session_id', 'nunique'),
+        measured_min=('measured_min', 'sum'),
+        exposure_min=('exposure_min', 'sum'),
+        co2_max=('co2_max', 'max'),
+    )
+    result['co2_avg'] = grouped['co2_seconds'].sum() / grouped['seconds'].sum().replace(0, np.nan)
+    result['exposure_share'] = result['exposure_min'] / result['measured_min'].replace(0, np.nan)
+    result['exposure_min_per_session'] = result['exposure_min'] / result['sessions']
+    return result.sort_values('exposure_min', ascending=False).round(1)
+
+
+def work_phases(data):
+    """Arbeitsphasen aus session_events → session_id, phase (0 = erste), work_min"""
+    events = data.events
+    if events is None or events.empty:
+        return None
+    events = events.sort_values(['session_id', 'occurred_at'], kind='stable')
+    grouped = events.groupby('session_id', sort=False, observed=True)
+    following_at = grouped['occurred_at'].shift(-1)
+    following_type = grouped['event_type'].shift(-1)
+
+    # Phase n = Arbeitsphase nach Pause n: Pausen davor zählen (stornierte Pausen nicht)
+    kind = events['event_type'].astype(str)
+    pauses = (kind == 'break_started').astype(int)
+    if 'payload' in events:
+        pauses -= ((kind == 'cancelled')
+                   & events['payload'].astype(str).str.contains('break_start', regex=False)).astype(int)
+    phase = pauses.groupby(events['session_id'], sort=False, observed=True).cumsum()
+
+    starts = (kind == 'work_started').to_numpy()
+    phases = pd.DataFrame({
+        'session_id': events['session_id'].to_numpy()[starts],
+        'phase': phase.to_numpy()[starts],
+        'work_min': ((following_at - events['occurred_at']).dt.total_seconds() / 60).to_numpy()[starts],
+        'closed': following_type.isin(WORK_END_EVENTS).to_numpy()[starts],
+    })
+    # Stornierte Phasen fallen weg; mehrere Phasen ohne Pause dazwischen → die erste zählt
+    phases = phases[phases['closed']].drop(columns='closed')
+    return phases.drop_duplicates(['session_id', 'phase'], keep='first')
+
+
+def steps_vs_work(data):
+    """Korrelation: Schritte in Pause n ↔ Länge der Arbeitsphase danach"""
+    breaks = data.breaks if data.breaks is not None else _empty('breakdata')
+    breaks = breaks[['session_id', 'pause_number', 'step_count']].dropna()
+    phases = work_phases(data)
+
+    if phases is not None and len(phases):
+        # Pause n (1-basiert) liegt vor Arbeitsphase n (0-basiert: Phase 0 = vor der ersten Pause)
+        pairs = breaks.merge(phases, left_on=['session_id', 'pause_number'],
+                             right_on=['session_id', 'phase'], how='inner')
+        method = 'Arbeitsphase nach der Pause (session_events)'
+    else:
+        # Ohne Events: pro Session Ø Schritte pro Pause ↔ Ø Länge einer Arbeitsphase
+        per_session = breaks.groupby('session_id', observed=True)['step_count'].mean()
+        sessions = data.sessions.set_index('session_id')
+        work = sessions['total_work_time'] / 60 / (sessions['pause_count'].fillna(0) + 1)
+        pairs = pd.DataFrame({'step_count': per_session, 'work_min': work}).dropna()
+        method = 'pro Session (ohne session_events)'
+
+    result = {'method': method, 'n': len(pairs), 'pearson': None, 'spearman': None, 'bins': None}
+    if len(pairs) >= 3 and pairs['step_count'].nunique() > 1 and pairs['work_min'].nunique() > 1:
+        result['pearson'] = round(pairs['step_count'].corr(pairs['work_min']), 3)
+        # Spearman = Pearson der Ränge (ohne scipy)
+        result['spearman'] = round(pairs['step_count'].rank().corr(pairs['work_min'].rank()), 3)
+        bins = pd.qcut(pairs['step_count'], q=min(5, pairs['step_count'].nunique()), duplicates='drop')
+        result['bins'] = pairs.groupby(bins, observed=True)['work_min'].agg(['count', 'mean', 'median']).round(1)
+    return result
+
+
+def heatmap(data, timezone=None, user_name=None, device_id=None):
+    """Ø CO2 pro Wochentag × Stunde (lokale Zeit, zeitgewichtet) → DataFrame 7 × 24"""
+    if timezone is None:
+        import config
+        timezone = config.ANALYTICS_TIMEZONE
+    co2 = data.co2
+    if user_name is not None:
+        co2 = co2[co2['user_name'] == user_name]
+    if device_id is not None:
+        co2 = co2[co2['device_id'] == device_id]
+    seconds = co2['seconds'].to_numpy()
+
+    local = co2['created_at'].dt.tz_convert(timezone)
+    frame = pd.DataFrame({
+        'weekday': local.dt.weekday.to_numpy(),
+        'hour': local.dt.hour.to_numpy(),
+        'weighted': co2['co2_level'].to_numpy() * seconds,
+        'seconds': seconds,
+    })
+    sums = frame.groupby(['weekday', 'hour'])[['weighted', 'seconds']].sum()
+    grid = (sums['weighted'] / sums['seconds'].replace(0, np.nan)).unstack('hour')
+    grid = grid.reindex(index=range(7), columns=range(24))
+    grid.index = WEEKDAYS
+    return grid.round(0)
+
+
+# ===== AUSGABE =====
+
+def print_heatmap(grid, hours=range(6, 23)):
+    print("        " + "".join(f"{h:>5}" for h in hours))
+    for day, row in grid.iterrows():
+        cells = "".join("    ·" if pd.isna(row[h]) else f"{int(row[h]):>5}" for h in hours)
+        print(f"   {day:<4} {cells}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Vektorisierte Auswertungen über alle Sessions')
+    parser.add_argument('--csv', metavar='DIR', help='CSV-Export statt Datenbank lesen (ohne .env)')
+    parser.add_argument('--since', help='Nur Daten ab diesem Tag (YYYY-MM-DD)')
+    parser.add_argument('--threshold', type=int,
+                        help='CO2-Schwelle für die Exposition (Standard: CO2_WARNING_THRESHOLD)')
+    parser.add_argument('--timezone', help='Zeitzone der Heatmap (Standard: ANALYTICS_TIMEZONE)')
+    parser.add_argument('--user', help='Heatmap nur für diesen Nutzer')
+    args = parser.parse_args(argv)
+
+    if not PANDAS_AVAILABLE:
+        print("❌ pandas nicht installiert - pip install pandas")
+        return 1
+
+    threshold, timezone = CO2_WARNING_THRESHOLD, TIMEZONE
+    if args.csv:
+        source = CsvSource(args.csv)
+    else:
+        import config
+        threshold, timezone = config.CO2_WARNING_THRESHOLD, config.ANALYTICS_TIMEZONE
+        if config.DATABASE_URL and PSYCOPG_AVAILABLE:
+            source = PostgresSource(config.DATABASE_URL)
+        else:
+            from database.supabase_manager import SupabaseManager
+            db = SupabaseManager()
+            if not db.client:
+                return 1
+            source = RestSource(db)
+    threshold = args.threshold or threshold
+    timezone = args.timezone or timezone
+
+    started = time.perf_counter()
+    print(f"\n📊 ANALYTICS - Quelle: {type(source).__name__}")
+    data = FleetData.load(source, since=args.since)
+    loaded = time.perf_counter()
+
+    result = exposure(data, threshold)
+    print(f"\n🌡️  CO2-Exposition über {threshold} ppm (Minuten)")
+    print(result.head(20).to_string())
+
+    correlation = steps_vs_work(data)
+    print(f"\n👣 Schritte ↔ folgende Arbeitsphase ({correlation['method']}, n={correlation['n']:,})")
+    print(f"   Pearson r = {correlation['pearson']} | Spearman ρ = {correlation['spearman']}")
+    if correlation['bins'] is not None:
+        print(correlation['bins'].to_string())
+
+    print(f"\n🗓️  Ø CO2 nach Wochentag × Stunde ({args.user or 'alle Nutzer'})")
+    print_heatmap(heatmap(data, timezone, user_name=args.user))
+
+    finished = time.perf_counter()
+    print(f"\n⏱️  {len(data.co2):,} CO2-Messungen, {len(data.sessions):,} Sessions | "
+          f"Laden {loaded - started:.1f} s, Auswerten {finished - loaded:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    if '--csv' not in ' '.join(sys.argv) and not os.environ.get('DEVICE_OVERRIDE') \
+            and '--device=' not in ' '.join(sys.argv):
+        os.environ['DEVICE_OVERRIDE'] = 'pitop1'
+    sys.exit(main())
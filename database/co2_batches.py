@@ -0,0 +1,109 @@
+"""
+CO2 Batches - gepackte Messreihen statt einer JSON-Zeile pro Messung
+Eine Zeile in co2_batches hält bis zu CO2_BATCH_SIZE Messungen einer Session als
+parallele Arrays (Offsets in ms ab started_at, eCO2, TVOC, Alarm, kritisch). session_id und
+device_id stehen einmal pro Batch statt in jeder Messung.
+
+    co2_batches         Zeilen wie sie PiTop 1 schreibt (Migration 0006)
+    co2_samples         View: unnest → eine Zeile pro Messung
+    co2_measurements_all View: Rohdaten + Batches im Format von co2_measurements
+
+Client-seitig entpackt iter_co2_samples() einen Batch in co2_measurements-Zeilen,
+damit Co2Stats beide Quellen gleich verarbeitet.
+"""
+
+import time
+import uuid
+from datetime import datetime, timezone
+from threading import Lock
+
+import config
+
+
+def pack(session_id, samples, device_id=None):
+    """[(timestamp, co2, tvoc, is_alarm, is_critical)] → co2_batches-Zeile"""
+    started = samples[0][0]
+    return {
+        'session_id': session_id,
+        'device_id': device_id or config.DEVICE_ID,
+        'started_at': _iso(started),
+        'offsets_ms': [int(round((ts - started) * 1000)) for ts, _, _, _, _ in samples],
+        'co2_levels': [int(co2) for _, co2, _, _, _ in samples],
+        'tvoc_levels': [None if tvoc is None else int(tvoc) for _, _, tvoc, _, _ in samples],
+        'alarm_flags': [bool(alarm) for _, _, _, alarm, _ in samples],
+        'critical_flags': [bool(critical) for _, _, _, _, critical in samples],   # Migration 0012
+        'idempotency_key': str(uuid.uuid4()),   # Wiederholung nach Timeout → kein zweiter Batch
+    }
+
+
+def iter_co2_samples(batch):
+    """co2_batches-Zeile → Zeilen im Format von co2_measurements (ohne id)"""
+    started = _timestamp(batch['started_at'])
+    for offset, co2, tvoc, alarm in zip(batch['offsets_ms'], batch['co2_levels'],
+                                        batch['tvoc_levels'], batch['alarm_flags']):
+        yield {
+            'batch_id': batch.get('id'),
+            'session_id': batch.get('session_id'),
+            'device_id': batch.get('device_id'),
+            'co2_level': co2,
+            'tvoc_level': tvoc,
+            'is_alarm': alarm,
+            'created_at': _iso(started + offset / 1000),
+        }
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def _timestamp(iso):
+    parsed = datetime.fromisoformat(iso.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class Co2Batcher:
+    """Sammelt Messungen pro Session - ein Insert pro Batch (voll, zu alt oder flush())"""
+
+    def __init__(self, db, writer=None, batch_size=None, max_age=None):
+        self.db = db
+        self.writer = writer          # WriteBehind: Insert im Hintergrund mit Wiederholung
+        self.batch_size = batch_size or config.CO2_BATCH_SIZE
+        self.max_age = max_age or config.CO2_BATCH_MAX_AGE
+        self.session_id = None
+        self.samples = []
+        self.lock = Lock()
+
+        # Statistik
+        self.batches = 0
+        self.samples_written = 0
+
+    def add(self, session_id, co2_level, tvoc_level=None, is_alarm=False, timestamp=None, is_critical=False):
+        """is_critical: Alarm-Stufe beim Messen (CO2_CRITICAL_THRESHOLD des Geräts) - nicht nachträglich ableiten"""
+        timestamp = timestamp or time.time()
+        with self.lock:
+            if self.session_id != session_id:
+                self._flush_locked()
+                self.session_id = session_id
+            self.samples.append((timestamp, co2_level, tvoc_level, is_alarm, is_critical))
+            if len(self.samples) >= self.batch_size or timestamp - self.samples[0][0] >= self.max_age:
+                self._flush_locked()
+
+    def flush(self):
+        """Offene Messungen sofort schreiben (Pausenstart, Session-Ende, Shutdown)"""
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self.samples or not self.session_id:
+            self.samples = []
+            return
+        row = pack(self.session_id, self.samples)
+        self.batches += 1
+        self.samples_written += len(self.samples)
+        self.samples = []
+        if self.writer:
+            self.writer.submit('co2_batch', self.db.insert_co2_batch, row)
+        else:
+            self.db.insert_co2_batch(row)
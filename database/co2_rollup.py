@@ -0,0 +1,237 @@
+"""
+CO2 Rollup Pipeline - Downsampling + Retention für co2_measurements und co2_batches
+Verdichtet Rohdaten und Batches älter als N Tage zu Minuten- und Session-Aggregaten
+(min, max, Mittelwert, TVOC-Mittelwert, Alarm-Sekunden) und löscht sie danach.
+Reports lesen Rollup + Rohdaten + Batches transparent (Co2Stats).
+
+    python -m database.co2_rollup                  # Retention aus config (CO2_RAW_RETENTION_DAYS)
+    python -m database.co2_rollup --older-than 14 --keep-raw
+
+Idempotent: Jedes Rollup merkt sich max_raw_id bzw. max_batch_id - bereits verdichtete
+Zeilen werden bei einem erneuten Lauf (z.B. nach Abbruch vor dem Löschen) übersprungen.
+Erst co2_measurements, dann co2_batches: pro Session liegen Altdaten zeitlich vor den Batches.
+Schema: database/migrations/0001_co2_rollups.sql, 0008_rollup_batches.sql
+"""
+
+import argparse
+import os
+import sys
+from itertools import islice
+from datetime import datetime, timedelta
+
+from database.co2_batches import iter_co2_samples
+from database.co2_stats import Co2Stats
+
+RAW_COLUMNS = 'id, session_id, device_id, co2_level, tvoc_level, is_alarm, created_at'
+BATCH_COLUMNS = 'id, session_id, device_id, started_at, offsets_ms, co2_levels, tvoc_levels, alarm_flags'
+# Quelle → (Spalten, Rollup-Spalte mit der höchsten verdichteten id)
+SOURCES = {
+    'co2_measurements': (RAW_COLUMNS, 'max_raw_id'),
+    'co2_batches': (BATCH_COLUMNS, 'max_batch_id'),
+}
+ID_COLUMNS = [column for _, column in SOURCES.values()]
+IN_CHUNK = 100   # session_ids pro in.()-Filter (URL-Länge)
+
+
+def _chunks(items, size):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _minute(created_at):
+    """'2025-01-01T10:15:42.123+00:00' → '2025-01-01T10:15:00'"""
+    return f"{created_at[:16]}:00"
+
+
+class _Pending:
+    """Aggregate seit dem letzten Flush (+ bereits vorhandene Rollups der Sessions)"""
+
+    def __init__(self, id_column='max_raw_id'):
+        self.id_column = id_column
+        self.sessions = {}     # session_id → Co2Stats
+        self.minutes = {}      # (session_id, minute) → Co2Stats
+        self.devices = {}
+        self.max_ids = {}
+        self.existing = {}     # session_id → vorhandenes co2_rollup_session (oder None)
+        self.rows = 0
+
+    def add(self, row):
+        session_id = row['session_id']
+        existing = self.existing.get(session_id)
+        if existing and row['id'] <= (existing.get(self.id_column) or 0):
+            return  # schon in einem früheren Lauf verdichtet
+
+        self.sessions.setdefault(session_id, Co2Stats()).add(row)
+        self.minutes.setdefault((session_id, _minute(row['created_at'])), Co2Stats()).add(row)
+        self.devices[session_id] = row.get('device_id')
+        self.max_ids[session_id] = row['id']
+        self.rows += 1
+
+
+class Co2Rollup:
+    def __init__(self, db, page_size=None, flush_rows=50000):
+        from database.supabase_manager import PAGE_SIZE
+        self.db = db
+        self.page_size = page_size or PAGE_SIZE
+        self.flush_rows = flush_rows
+
+    def compact(self, older_than_days, keep_raw=False):
+        """Verdichtet alle Rohdaten und Batches älter als older_than_days → Anzahl verdichteter Messungen"""
+        if not self.db.client:
+            return 0
+
+        cutoff = (datetime.utcnow() - timedelta(days=older_than_days)).isoformat()
+        print(f"🗜️  CO2 Rollup: Rohdaten vor {cutoff[:19]} verdichten"
+              f"{' (Rohdaten bleiben erhalten)' if keep_raw else ''}")
+
+        total = 0
+        for table in SOURCES:
+            total += self._compact_table(table, cutoff, keep_raw)
+
+        print(f"✅ CO2 Rollup: {total:,} Messungen verdichtet")
+        return total
+
+    def _compact_table(self, table, cutoff, keep_raw):
+        columns, id_column = SOURCES[table]
+        total = 0
+        last_id = 0
+        pending = _Pending(id_column)
+
+        source_rows = self.db.iter_rows(
+            table, columns,
+            where=lambda q: q.lt('created_at', cutoff),
+            page_size=self.page_size
+        )
+        for rows in _chunks(source_rows, self.page_size):
+            self._load_existing(pending, {row['session_id'] for row in rows})
+            for row in rows:
+                if table == 'co2_batches':
+                    for sample in iter_co2_samples(row):
+                        sample['id'] = row['id']   # Batch ist die Einheit für max_batch_id
+                        pending.add(sample)
+                else:
+                    pending.add(row)
+            last_id = rows[-1]['id']
+
+            if pending.rows >= self.flush_rows:
+                total += self._flush(table, pending, cutoff, last_id, keep_raw)
+                pending = _Pending(id_column)
+
+        if last_id:
+            # Auch ohne neue Aggregate: bereits verdichtete Zeilen (Abbruch/--keep-raw) löschen
+            total += self._flush(table, pending, cutoff, last_id, keep_raw)
+        return total
+
+    def _load_existing(self, pending, session_ids):
+        missing = [sid for sid in session_ids if sid not in pending.existing]
+        for chunk in _chunks(missing, IN_CHUNK):
+            response = self.db.client.table('co2_rollup_session')\
+                .select('*')\
+                .in_('session_id', chunk)\
+                .execute()
+            for sid in chunk:
+                pending.existing[sid] = None
+            for row in response.data or []:
+                pending.existing[row['session_id']] = row
+
+    def _flush(self, table, pending, cutoff, last_id, keep_raw):
+        if pending.sessions:
+            self._upsert_rollups(pending, cutoff)
+            print(f"   💾 {table}: {pending.rows:,} Messungen → {len(pending.sessions)} Sessions, "
+                  f"{len(pending.minutes):,} Minuten")
+
+        # Erst Rollups, dann Rohdaten löschen - ein Abbruch dazwischen ist per max_raw_id/max_batch_id sicher
+        if not keep_raw:
+            self.db.client.table(table)\
+                .delete(returning='minimal')\
+                .lt('created_at', cutoff)\
+                .lte('id', last_id)\
+                .execute()
+        return pending.rows
+
+    def _upsert_rollups(self, pending, cutoff):
+        # 1. Session-Rollups: vorhandenes Rollup + neue Aggregate
+        session_rows = []
+        for session_id, stats in pending.sessions.items():
+            existing = pending.existing.get(session_id) or {}
+            merged = Co2Stats()
+            merged.merge_rollup(existing)
+            merged.merge(stats)
+            row = merged.to_rollup()
+            row.update({column: existing.get(column) or 0 for column in ID_COLUMNS})
+            row.update({
+                'session_id': session_id,
+                'device_id': pending.devices[session_id],
+                pending.id_column: pending.max_ids[session_id],
+                'compacted_until': cutoff,
+                'updated_at': datetime.utcnow().isoformat()
+            })
+            session_rows.append(row)
+            pending.existing[session_id] = row
+
+        # 2. Minuten-Rollups: Grenz-Minute eines früheren Flushs mergen
+        minute_rows = {}
+        for (session_id, minute), stats in pending.minutes.items():
+            row = stats.to_rollup()
+            row.update({column: pending.existing[session_id][column] for column in ID_COLUMNS})
+            row.update({
+                'session_id': session_id,
+                'minute': minute,
+                'device_id': pending.devices[session_id]
+            })
+            minute_rows[(session_id, minute)] = (stats, row)
+
+        first_minute = min(minute for _, minute in minute_rows)
+        for chunk in _chunks(pending.sessions, IN_CHUNK):
+            existing = self.db.client.table('co2_rollup_minute')\
+                .select('*')\
+                .in_('session_id', chunk)\
+                .gte('minute', first_minute)\
+                .execute().data or []
+            for old in existing:
+                key = (old['session_id'], _minute(old['minute']))
+                if key in minute_rows:
+                    stats, row = minute_rows[key]
+                    merged = Co2Stats()
+                    merged.merge_rollup(old)
+                    merged.merge(stats)
+                    row.update(merged.to_rollup())
+
+        # 3. Upsert
+        for chunk in _chunks(session_rows, 500):
+            self.db.client.table('co2_rollup_session')\
+                .upsert(chunk, on_conflict='session_id', returning='minimal')\
+                .execute()
+        for chunk in _chunks([row for _, row in minute_rows.values()], 1000):
+            self.db.client.table('co2_rollup_minute')\
+                .upsert(chunk, on_conflict='session_id,minute', returning='minimal')\
+                .execute()
+
+
+def main(argv=None):
+    import config
+    from database.supabase_manager import SupabaseManager
+
+    parser = argparse.ArgumentParser(description='CO2 Rohdaten verdichten (Rollup + Retention)')
+    parser.add_argument('--older-than', type=int, default=config.CO2_RAW_RETENTION_DAYS,
+                        help='Rohdaten älter als N Tage verdichten (Standard: CO2_RAW_RETENTION_DAYS)')
+    parser.add_argument('--keep-raw', action='store_true', help='Rohdaten nach dem Verdichten behalten')
+    parser.add_argument('--page-size', type=int,
+                        help='Zeilen pro Seite (Standard 1000, nicht größer als PostgREST max-rows)')
+    args = parser.parse_args(argv)
+
+    db = SupabaseManager()
+    if not db.client:
+        return 1
+    Co2Rollup(db, page_size=args.page_size).compact(args.older_than, keep_raw=args.keep_raw)
+    return 0
+
+
+if __name__ == "__main__":
+    if not os.environ.get('DEVICE_OVERRIDE') and '--device=' not in ' '.join(sys.argv):
+        os.environ['DEVICE_OVERRIDE'] = 'pitop1'
+    sys.exit(main())
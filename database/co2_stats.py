@@ -0,0 +1,135 @@
+"""
+CO2-Statistik als mergebarer Akkumulator
+Wird aus Rohdaten (co2_measurements, co2_batches) und Rollups (co2_rollup_session) gespeist,
+damit Reports dieselben Werte liefern - egal ob Daten schon kompaktiert sind.
+"""
+
+DEFAULT_CO2 = 400  # Außenluft - wenn keine Messungen vorhanden
+
+
+class Co2Stats:
+    def __init__(self):
+        self.count = 0
+        self.co2_sum = 0
+        self.co2_min = None
+        self.co2_max = None
+        self.tvoc_sum = 0
+        self.tvoc_count = 0
+        self.alarm_seconds = 0     # Jede Alarm-Zeile = 1 Sekunde (PiTop 1 loggt bei Alarm jede Sekunde)
+        self.alarm_count = 0       # Alarm-Perioden (nicht einzelne Messungen)
+        self.first_is_alarm = False
+        self.in_alarm = False      # Zustand der letzten Messung (für Perioden über Grenzen hinweg)
+        self.first_at = None
+        self.last_at = None
+        self.last_id = 0           # Cursor: höchste enthaltene co2_measurements.id
+        self.last_batch_id = 0     # Cursor: höchste enthaltene co2_batches.id
+
+    def add(self, row):
+        """Fügt eine Rohdaten-Zeile hinzu (Reihenfolge = Zeitreihenfolge)"""
+        co2 = row.get('co2_level')
+        if co2 is None:
+            return
+
+        if not self.count:
+            self.first_is_alarm = bool(row.get('is_alarm'))
+        self.count += 1
+        self.co2_sum += co2
+        self.co2_min = co2 if self.co2_min is None else min(self.co2_min, co2)
+        self.co2_max = co2 if self.co2_max is None else max(self.co2_max, co2)
+
+        tvoc = row.get('tvoc_level')
+        if tvoc:
+            self.tvoc_sum += tvoc
+            self.tvoc_count += 1
+
+        if row.get('is_alarm'):
+            self.alarm_seconds += 1
+            if not self.in_alarm:
+                self.alarm_count += 1
+            self.in_alarm = True
+        else:
+            self.in_alarm = False
+
+        created_at = row.get('created_at')
+        if created_at:
+            self.first_at = self.first_at or created_at
+            self.last_at = created_at
+        self.last_id = row.get('id') or self.last_id
+
+    def merge_rollup(self, rollup):
+        """Übernimmt ein Rollup (zeitlich VOR den danach hinzugefügten Rohdaten)"""
+        if not rollup or not rollup.get('sample_count'):
+            return
+
+        continues_alarm = self.in_alarm and rollup.get('first_is_alarm')
+        if not self.count:
+            self.first_is_alarm = bool(rollup.get('first_is_alarm'))
+        self.count += rollup['sample_count']
+        self.co2_sum += rollup['co2_sum']
+        for attr, key, pick in (('co2_min', 'co2_min', min), ('co2_max', 'co2_max', max)):
+            value = rollup.get(key)
+            if value is not None:
+                current = getattr(self, attr)
+                setattr(self, attr, value if current is None else pick(current, value))
+        self.tvoc_sum += rollup.get('tvoc_sum') or 0
+        self.tvoc_count += rollup.get('tvoc_count') or 0
+        self.alarm_seconds += rollup.get('alarm_seconds') or 0
+        self.alarm_count += (rollup.get('alarm_count') or 0) - (1 if continues_alarm else 0)
+        self.in_alarm = bool(rollup.get('last_is_alarm'))
+        self.first_at = self.first_at or rollup.get('first_at')
+        self.last_at = rollup.get('last_at') or self.last_at
+        self.last_id = max(self.last_id, rollup.get('max_raw_id') or 0)
+        self.last_batch_id = max(self.last_batch_id, rollup.get('max_batch_id') or 0)
+
+    def merge(self, other):
+        """Hängt einen später liegenden Akkumulator an (z.B. Delta seit letzter Pause)"""
+        self.merge_rollup(other.to_rollup())
+
+    # ===== AUSGABE =====
+
+    @property
+    def avg_co2(self):
+        return int(self.co2_sum / self.count) if self.count else DEFAULT_CO2
+
+    @property
+    def avg_tvoc(self):
+        return int(self.tvoc_sum / self.tvoc_count) if self.tvoc_count else 0
+
+    def to_report(self):
+        """Format für get_session_report_data()['co2']"""
+        return {
+            'avg_co2': self.avg_co2,
+            'min_co2': self.co2_min if self.count else DEFAULT_CO2,
+            'max_co2': self.co2_max if self.count else DEFAULT_CO2,
+            'alarm_count': self.alarm_count
+        }
+
+    def to_break_stats(self):
+        """Format für BreakStation (Discord nach jeder Pause)"""
+        return {
+            'avg_co2': self.avg_co2,
+            'min_co2': self.co2_min,
+            'max_co2': self.co2_max,
+            'avg_tvoc': self.avg_tvoc,
+            'alarm_count': self.alarm_seconds,
+            'measurement_count': self.count
+        }
+
+    def to_rollup(self):
+        """Spalten für co2_rollup_session / co2_rollup_minute"""
+        return {
+            'sample_count': self.count,
+            'co2_sum': self.co2_sum,
+            'co2_min': self.co2_min,
+            'co2_max': self.co2_max,
+            'co2_mean': round(self.co2_sum / self.count, 1) if self.count else None,
+            'tvoc_sum': self.tvoc_sum,
+            'tvoc_count': self.tvoc_count,
+            'tvoc_mean': round(self.tvoc_sum / self.tvoc_count, 1) if self.tvoc_count else None,
+            'alarm_seconds': self.alarm_seconds,
+            'alarm_count': self.alarm_count,
+            'first_is_alarm': self.first_is_alarm,
+            'last_is_alarm': self.in_alarm,
+            'first_at': self.first_at,
+            'last_at': self.last_at
+        }
@@ -0,0 +1,263 @@
+"""
+Tages-Zusammenfassungen - Wochen- und Monatsberichte ohne Scan der Rohdaten
+Beim Session-Ende (end_session / close_session) wird die Session einmal verdichtet
+(summary_session) und danach nur ihr Tag neu summiert - aus den wenigen
+summary_session-Zeilen dieses Tages, nicht aus sessions/co2/breakdata:
+
+    summary_session     eine Zeile pro beendeter Session
+    summary_user_day    pro Nutzer und Tag
+    summary_device_day  pro Gerät und Tag
+
+Summen + Anzahl statt Mittelwerte (wie die CO2 Rollups), damit sich Tage exakt zu
+Wochen/Monaten addieren. Wiederholungen sind harmlos: alles per Upsert, der Tag wird
+jedes Mal komplett aus summary_session neu berechnet.
+
+    python -m database.daily_summary week --user Alicia
+    python -m database.daily_summary month --device-id pitop1 --day 2025-03-01
+    python -m database.daily_summary rebuild --days 90      # Nachtrag/Reparatur
+
+Tag = Datum des Session-Starts in SUMMARY_TIMEZONE (Sessions über Mitternacht zählen zum
+Starttag) - auf beiden PiTops gleich, unabhängig von der Systemzeitzone.
+Pausen-Daten, die PiTop 2 erst nach dem Session-Ende hochlädt, summieren die Session
+danach erneut (record_session_if_ended).
+Schema: database/migrations/0007_daily_summaries.sql
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+# Summenspalten in summary_session und den Tagestabellen
+SUM_COLUMNS = ('work_seconds', 'pause_seconds', 'pause_count', 'step_count', 'calories_burned',
+               'distance_meters', 'co2_count', 'co2_sum', 'tvoc_sum', 'tvoc_count',
+               'alarm_count', 'alarm_seconds')
+
+SCOPES = {
+    'user': ('summary_user_day', 'user_name'),
+    'device': ('summary_device_day', 'device_id'),
+}
+
+
+def local_day(timestamp, tz=None):
+    """'2025-03-01T22:30:00' (UTC) → '2025-03-01' bzw. der Tag in Zeitzone tz ('Europe/Berlin')"""
+    parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(ZoneInfo(tz) if tz else None).date().isoformat()
+
+
+def period_range(period, day=None, tz=None):
+    """'week' → Montag bis Sonntag, 'month' → Kalendermonat (jeweils inkl. day, Standard: heute in tz)"""
+    day = day or datetime.now(ZoneInfo(tz) if tz else None).date()
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    if period == 'week':
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=6)
+    if period == 'month':
+        start = day.replace(day=1)
+        following = (start + timedelta(days=32)).replace(day=1)
+        return start, following - timedelta(days=1)
+    raise ValueError(f"Unbekannter Zeitraum: {period}")
+
+
+def summarize_session(session, co2_stats, movement_rows, tz=None):
+    """sessions-Zeile + Co2Stats + breakdata-Zeilen → summary_session-Zeile"""
+    row = {
+        'session_id': session['session_id'],
+        'user_name': session.get('user_name'),
+        'device_id': session.get('device_id'),
+        'day': local_day(session['start_time'], tz),
+        'work_seconds': session.get('total_work_time') or 0,
+        'pause_seconds': session.get('total_pause_time') or 0,
+        'pause_count': session.get('pause_count') or 0,
+        'step_count': 0,
+        'calories_burned': 0,
+        'distance_meters': 0,
+        'co2_count': co2_stats.count,
+        'co2_sum': co2_stats.co2_sum,
+        'co2_min': co2_stats.co2_min,
+        'co2_max': co2_stats.co2_max,
+        'tvoc_sum': co2_stats.tvoc_sum,
+        'tvoc_count': co2_stats.tvoc_count,
+        'alarm_count': co2_stats.alarm_count,
+        'alarm_seconds': co2_stats.alarm_seconds,
+        'updated_at': datetime.utcnow().isoformat(),
+    }
+    for movement in movement_rows:
+        row['step_count'] += movement.get('step_count') or 0
+        row['calories_burned'] += movement.get('calories_burned') or 0
+        row['distance_meters'] += movement.get('distance_meters') or 0
+    return row
+
+
+def merge_rows(rows):
+    """Summen über mehrere Session-/Tageszeilen (min/max getrennt)"""
+    total = {column: 0 for column in SUM_COLUMNS}
+    total['session_count'] = 0
+    total['co2_min'] = total['co2_max'] = None
+    for row in rows:
+        for column in SUM_COLUMNS:
+            total[column] += row.get(column) or 0
+        total['session_count'] += row.get('session_count', 1)
+        for column, pick in (('co2_min', min), ('co2_max', max)):
+            value = row.get(column)
+            if value is not None:
+                total[column] = value if total[column] is None else pick(total[column], value)
+    return total
+
+
+class DailySummary:
+    def __init__(self, db, timezone=None):
+        import config
+        self.db = db
+        self.timezone = timezone or config.SUMMARY_TIMEZONE
+
+    # ===== SCHREIBEN (Session-Ende) =====
+
+    def record_session(self, session_id):
+        """Session verdichten + ihre Tage (Nutzer, Gerät) neu summieren → summary_session-Zeile"""
+        session = self.db.get_session(session_id)
+        if not session or not session.get('start_time'):
+            return None
+
+        co2_stats = self.db.get_session_co2_stats(session_id)
+        movement = self.db.iter_rows(
+            'breakdata', 'step_count, calories_burned, distance_meters',
+            where=lambda q: q.eq('session_id', session_id)
+        )
+        row = summarize_session(session, co2_stats, movement, self.timezone)
+        self.db.client.table('summary_session')\
+            .upsert(row, on_conflict='session_id', returning='minimal')\
+            .execute()
+
+        for scope in SCOPES:
+            self._refresh_day(scope, row[SCOPES[scope][1]], row['day'])
+        return row
+
+    def record_session_if_ended(self, session_id):
+        """Nachtrag (z.B. Pausen-Daten von PiTop 2 nach dem Session-Ende) → neu verdichten,
+        laufende Sessions bleiben unverändert (sie werden an ihrem Ende verdichtet)"""
+        response = self.db.client.table('sessions')\
+            .select('end_time')\
+            .eq('session_id', session_id)\
+            .limit(1)\
+            .execute()   # ungecacht: das Ende kommt von PiTop 1
+        if not response.data or not response.data[0].get('end_time'):
+            return None
+        self.db.invalidate_session(session_id)
+        return self.record_session(session_id)
+
+    def _refresh_day(self, scope, key, day):
+        """Einen Tag aus summary_session neu berechnen (eine Handvoll Zeilen)"""
+        if key is None:
+            return
+        table, column = SCOPES[scope]
+        sessions = self.db.client.table('summary_session')\
+            .select('*')\
+            .eq(column, key)\
+            .eq('day', day)\
+            .execute().data or []
+
+        row = merge_rows(sessions)
+        row.update({column: key, 'day': day, 'updated_at': datetime.utcnow().isoformat()})
+        self.db.client.table(table)\
+            .upsert(row, on_conflict=f'{column},day', returning='minimal')\
+            .execute()
+
+    def rebuild(self, days=30):
+        """Alle beendeten Sessions der letzten N Tage neu verdichten → Anzahl Sessions"""
+        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        sessions = self.db.iter_rows(
+            'sessions', 'session_id, end_time',
+            where=lambda q: q.gte('start_time', cutoff)
+        )
+        count = 0
+        for session in sessions:
+            if session.get('end_time') and self.record_session(session['session_id']):
+                count += 1
+        print(f"✅ Tages-Zusammenfassungen: {count} Sessions neu verdichtet")
+        return count
+
+    # ===== LESEN (Berichte) =====
+
+    def report(self, period='week', user_name=None, device_id=None, day=None):
+        """Wochen-/Monatsbericht aus einem Read der Tagestabelle"""
+        scope, key = ('device', device_id) if device_id else ('user', user_name)
+        table, column = SCOPES[scope]
+        start, end = period_range(period, day, self.timezone)
+
+        days = self.db.client.table(table)\
+            .select('*')\
+            .eq(column, key)\
+            .gte('day', start.isoformat())\
+            .lte('day', end.isoformat())\
+            .order('day')\
+            .execute().data or []
+
+        return build_report(period, start, end, column, key, days)
+
+
+def build_report(period, start, end, column, key, days):
+    """Tageszeilen eines Nutzers/Geräts → Bericht (Summen, Mittelwerte, Tage)"""
+    total = merge_rows(days)
+    active_days = sum(1 for row in days if row.get('session_count'))
+    return {
+        'period': period,
+        column: key,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'active_days': active_days,
+        **total,
+        'avg_co2': round(total['co2_sum'] / total['co2_count']) if total['co2_count'] else None,
+        'avg_tvoc': round(total['tvoc_sum'] / total['tvoc_count']) if total['tvoc_count'] else None,
+        'avg_steps_per_day': round(total['step_count'] / active_days) if active_days else 0,
+        'days': days,
+    }
+
+
+def print_report(report):
+    key = report.get('user_name') or report.get('device_id')
+    label = {'week': 'Woche', 'month': 'Monat'}[report['period']]
+    print(f"\n📅 {label} {report['start']} – {report['end']} ({key})")
+    print(f"   Sessions: {report['session_count']} an {report['active_days']} Tagen")
+    print(f"   Arbeitszeit: {report['work_seconds'] // 60} min | Pausen: {report['pause_count']} "
+          f"({report['pause_seconds'] // 60} min)")
+    print(f"   Schritte: {report['step_count']} (Ø {report['avg_steps_per_day']}/Tag) | "
+          f"{report['calories_burned']:.0f} kcal | {report['distance_meters']:.0f} m")
+    print(f"   CO2: Ø {report['avg_co2'] or '-'} ppm, max {report['co2_max'] or '-'} ppm | "
+          f"{report['alarm_count']} Alarme ({report['alarm_seconds']} s)")
+    for row in report['days']:
+        print(f"   {row['day']}: {row['session_count']} Sessions, {row['work_seconds'] // 60} min, "
+              f"{row['step_count']} Schritte")
+
+
+def main(argv=None):
+    import config
+    from database.supabase_manager import SupabaseManager
+
+    parser = argparse.ArgumentParser(description='Wochen-/Monatsberichte aus den Tages-Zusammenfassungen')
+    parser.add_argument('command', choices=['week', 'month', 'rebuild'])
+    parser.add_argument('--user', default=config.USER_NAME, help='Nutzer (Standard: USER_NAME)')
+    parser.add_argument('--device-id', help='Gerät statt Nutzer, z.B. pitop1')
+    parser.add_argument('--day', help='Tag im gewünschten Zeitraum (YYYY-MM-DD, Standard: heute)')
+    parser.add_argument('--days', type=int, default=30, help='rebuild: Sessions der letzten N Tage')
+    args = parser.parse_args(argv)
+
+    db = SupabaseManager()
+    if not db.client:
+        return 1
+    summary = DailySummary(db)
+    if args.command == 'rebuild':
+        summary.rebuild(args.days)
+    else:
+        print_report(summary.report(args.command, user_name=args.user, device_id=args.device_id, day=args.day))
+    return 0
+
+
+if __name__ == "__main__":
+    if not os.environ.get('DEVICE_OVERRIDE') and '--device=' not in ' '.join(sys.argv):
+        os.environ['DEVICE_OVERRIDE'] = 'pitop1'
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+EXPLAIN für jede Abfrage, die SupabaseManager und die PiTops stellen
+Beweist, dass die Indizes aus database/migrations/0002_query_indexes.sql genutzt
+werden. Exit-Code 1 wenn eine Abfrage auf einer großen Tabelle per Seq Scan läuft.
+
+    python -m database.explain_queries
+    python -m database.explain_queries --verbose      # komplette Pläne ausgeben
+
+Supabase: EXPLAIN über PostgREST muss einmalig erlaubt werden (SQL Editor):
+    alter role authenticator set pgrst.db_plan_enabled to 'true';
+    notify pgrst, 'reload config';
+Danach wieder abschalten, falls Pläne nicht öffentlich sichtbar sein sollen.
+"""
+
+import argparse
+import os
+import re
+import sys
+import uuid
+
+# Auf kleinen Tabellen ist ein Seq Scan die richtige Planner-Entscheidung
+SMALL_TABLE_ROWS = 1000
+
+SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+INDEX_SCAN = re.compile(r'(?:Index|Index Only|Bitmap Index) Scan (?:Backward )?using (\w+)')
+
+# (Name, Tabelle, Aufrufer, Query-Builder) - gleiche Filter/Sortierung wie im Code.
+# UPDATEs filtern wie die SELECTs per eq(session_id) und nutzen denselben Index.
+QUERIES = [
+    ('get_active_session', 'sessions', 'SupabaseManager.get_active_session',
+     lambda c, sid: c.table('sessions')
+        .select('session_id, pause_count, timer_status, user_weight, user_height')
+        .is_('end_time', 'null').order('start_time', desc=True).limit(1)),
+    ('open_sessions', 'sessions', 'SupabaseManager.get_open_sessions (Crash-Recovery)',
+     lambda c, sid: c.table('sessions').select('session_id, start_time, last_seen_at')
+        .is_('end_time', 'null').eq('device_id', 'pitop1').order('start_time', desc=True)),
+    ('session_by_id', 'sessions', 'end_session / Report',
+     lambda c, sid: c.table('sessions').select('*').eq('session_id', sid)),
+    ('co2_by_session', 'co2_measurements', 'SupabaseManager.get_session_co2_stats',
+     lambda c, sid: c.table('co2_measurements')
+        .select('id, co2_level, tvoc_level, is_alarm, created_at')
+        .eq('session_id', sid).gt('id', 0).order('id')),
+    ('co2_batches_by_session', 'co2_batches', 'SupabaseManager.get_session_co2_stats',
+     lambda c, sid: c.table('co2_batches')
+        .select('id, started_at, offsets_ms, co2_levels, tvoc_levels, alarm_flags')
+        .eq('session_id', sid).gt('id', 0).order('id')),
+    ('co2_retention', 'co2_measurements', 'Co2Rollup.compact',
+     lambda c, sid: c.table('co2_measurements').select('id')
+        .lt('created_at', '2000-01-01T00:00:00').gt('id', 0).order('id').limit(1000)),
+    ('breakdata_by_session', 'breakdata', 'SupabaseManager.get_session_report_data',
+     lambda c, sid: c.table('breakdata')
+        .select('step_count, calories_burned, distance_meters').eq('session_id', sid)),
+    ('summary_day', 'summary_session', 'DailySummary._refresh_day (end_session)',
+     lambda c, sid: c.table('summary_session').select('*')
+        .eq('user_name', 'Alicia').eq('day', '2025-01-01')),
+    ('summary_week', 'summary_user_day', 'SupabaseManager.get_period_report',
+     lambda c, sid: c.table('summary_user_day').select('*').eq('user_name', 'Alicia')
+        .gte('day', '2025-01-01').lte('day', '2025-01-07').order('day')),
+    ('co2_rollup_by_session', 'co2_rollup_session', 'SupabaseManager.get_session_co2_stats',
+     lambda c, sid: c.table('co2_rollup_session').select('*').eq('session_id', sid).limit(1)),
+    ('events_by_session', 'session_events', 'SupabaseManager.get_session_state / get_timer_status',
+     lambda c, sid: c.table('session_events').select('*')
+        .eq('session_id', sid).gt('id', 0).order('id').limit(1000)),
+    ('events_tail', 'session_events', 'EventTail.poll (PiTop 2)',
+     lambda c, sid: c.table('session_events').select('*').gt('id', 0).order('id').limit(1000)),
+    ('latest_session_started', 'session_events', 'EventTail.start_at_latest_session',
+     lambda c, sid: c.table('session_events').select('id')
+        .eq('event_type', 'session_started').order('id', desc=True).limit(1)),
+]
+
+
+def _estimated_rows(client, table):
+    """Geschätzte Zeilenzahl (pg_class) - None wenn nicht verfügbar"""
+    try:
+        return client.table(table).select('id', count='estimated').limit(1).execute().count
+    except Exception:
+        return None
+
+
+def check_query(client, name, table, build, session_id):
+    """→ (ok, verdict, plan)"""
+    plan = build(client, session_id).explain().execute()
+    indexes = INDEX_SCAN.findall(plan)
+    seq_tables = SEQ_SCAN.findall(plan)
+
+    if table not in seq_tables:
+        return True, f"Index: {', '.join(indexes)}" if indexes else 'kein Seq Scan', plan
+
+    rows = _estimated_rows(client, table)
+    if rows is not None and rows < SMALL_TABLE_ROWS:
+        return True, f"Seq Scan (nur ~{rows} Zeilen - Planner-Entscheidung)", plan
+    return False, f"Seq Scan auf {table}" + (f" (~{rows:,} Zeilen)" if rows else ''), plan
+
+
+def main(argv=None):
+    from database.supabase_manager import SupabaseManager
+
+    parser = argparse.ArgumentParser(description='EXPLAIN aller DB-Abfragen (Index-Nutzung prüfen)')
+    parser.add_argument('--session-id', help='Beispiel-Session für eq(session_id) (Standard: zufällig)')
+    parser.add_argument('--verbose', action='store_true', help='Komplette Pläne ausgeben')
+    args = parser.parse_args(argv)
+
+    db = SupabaseManager()
+    if not db.client:
+        return 1
+    session_id = args.session_id or str(uuid.uuid4())
+
+    print("\n" + "="*60)
+    print("🔍 EXPLAIN - INDEX-NUTZUNG")
+    print("="*60)
+
+    failures = 0
+    for name, table, caller, build in QUERIES:
+        try:
+            ok, verdict, plan = check_query(db.client, name, table, build, session_id)
+        except Exception as e:
+            print(f"⚠️  {name:<24} EXPLAIN fehlgeschlagen: {e}")
+            failures += 1
+            continue
+
+        print(f"{'✅' if ok else '❌'} {name:<24} {verdict}")
+        print(f"   ↳ {caller}")
+        if args.verbose or not ok:
+            for line in plan.strip().splitlines():
+                print(f"      {line}")
+        failures += 0 if ok else 1
+
+    if failures:
+        print(f"\n❌ {failures} Abfrage(n) ohne Index - Migrationen angewendet? (python -m database.migrate)")
+        return 1
+    print("\n✅ Alle Abfragen nutzen einen Index")
+    return 0
+
+
+if __name__ == "__main__":
+    if not os.environ.get('DEVICE_OVERRIDE') and '--device=' not in ' '.join(sys.argv):
+        os.environ['DEVICE_OVERRIDE'] = 'pitop1'
+    sys.exit(main())
@@ -0,0 +1,362 @@
+"""
+Export - Session-Historie seitenweise nach Parquet oder CSV (gzip)
+Für Auswertungen außerhalb der Produktion: statt Ad-hoc-Selects über ganze Tabellen
+liest der Export jede Tabelle per Keyset über id (Index-Range, PAGE_SIZE Zeilen pro
+Request, Zeilen werden beim Eintreffen dekodiert) und schreibt partitioniert nach
+Gerät und Monat:
+
+    export/
+      _export_state.json                            High-Water-Mark: letzte id pro Tabelle,
+                                                    offene Sessions (noch nicht exportiert)
+      sessions/pitop1/2025-03/part-000000001234.parquet
+      co2_batches/pitop1/2025-03/part-000000080001.csv.gz
+      ...
+
+Speicher bleibt begrenzt: höchstens ROW_GROUP_ROWS Zeilen pro Partition bzw.
+MAX_BUFFERED_ROWS insgesamt im Puffer, höchstens MAX_OPEN_FILES offene Dateien.
+Dateinamen = erste id der Datei, geschrieben wird nach *.tmp und erst beim Schließen
+umbenannt - ein abgebrochener Lauf hinterlässt keine halben Dateien, der nächste
+Lauf setzt an der gespeicherten id wieder an.
+
+    python -m database.export                       # inkrementell nach EXPORT_DIR
+    python -m database.export export/ --format csv --tables sessions,breakdata
+
+Sessions werden erst exportiert, wenn sie beendet sind (end_time): laufende Sessions
+werden übersprungen und in _export_state.json gemerkt, der nächste Lauf liest ab der
+ältesten davon (Low-Water-Mark) und exportiert sie nach. Nach EXPORT_OPEN_SESSION_DAYS
+Tagen wird eine offene Session so exportiert, wie sie ist. Alle anderen Tabellen sind
+append-only.
+Zeilen jünger als EXPORT_SAFETY_LAG Sekunden (created_at) bleiben für den nächsten Lauf:
+ids werden beim Insert vergeben, aber in Commit-Reihenfolge sichtbar - eine kleinere id
+kann nach einer größeren auftauchen und läge sonst schon unter der Marke.
+CSV-Exporte liest database/analytics.py direkt: python -m database.analytics --csv export/
+Optional: pip install pyarrow (ohne pyarrow: CSV)
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from database.supabase_manager import PAGE_SIZE
+
+# Tabelle → Zeitspalte für die Monats-Partition
+TABLES = {
+    'sessions': 'start_time',
+    'co2_measurements': 'created_at',
+    'co2_batches': 'started_at',
+    'breakdata': 'created_at',
+    'session_events': 'occurred_at',
+}
+STATE_FILE = '_export_state.json'
+SAFETY_LAG = 60                # s - Standard ohne config
+OPEN_SESSION_DAYS = 7
+ROW_GROUP_ROWS = 50_000        # Zeilen pro Partition bis zum Schreiben (= Parquet Row-Group)
+MAX_BUFFERED_ROWS = 200_000    # alle Partitionen zusammen
+MAX_OPEN_FILES = 32
+
+# Parquet-Spaltentypen (nicht aufgeführte Spalten → string, JSON als Text)
+PARQUET_TYPES = {
+    'id': 'int64',
+    'user_weight': 'float64',
+    'user_height': 'float64',
+    'pause_count': 'int32',
+    'total_work_time': 'int32',
+    'total_pause_time': 'int32',
+    'co2_level': 'int32',
+    'tvoc_level': 'int32',
+    'is_alarm': 'bool_',
+    'pause_number': 'int32',
+    'step_count': 'int32',
+    'calories_burned': 'float64',
+    'distance_meters': 'float64',
+    'monotonic_ms': 'int64',
+    'offsets_ms': 'list<int32>',
+    'co2_levels': 'list<int32>',
+    'tvoc_levels': 'list<int32>',
+    'alarm_flags': 'list<bool_>',
+    'critical_flags': 'list<bool_>',
+    'start_time': 'timestamp',
+    'end_time': 'timestamp',
+    'last_seen_at': 'timestamp',
+    'created_at': 'timestamp',
+    'started_at': 'timestamp',
+    'occurred_at': 'timestamp',
+}
+
+
+def partition(row, time_column):
+    """Zeile → (Gerät, Monat) z.B. ('pitop1', '2025-03')"""
+    device = str(row.get('device_id') or 'unknown').replace('/', '_')
+    month = (row.get(time_column) or '')[:7] or 'unknown'
+    return device, month
+
+
+# ===== DATEIEN =====
+
+def _timestamp(value):
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _arrow_type(column):
+    kind = PARQUET_TYPES.get(column, 'string')
+    if kind == 'timestamp':
+        return pa.timestamp('us', tz='UTC')
+    if kind.startswith('list<'):
+        return pa.list_(getattr(pa, kind[5:-1])())
+    return getattr(pa, kind)()
+
+
+def _arrow_values(column, values):
+    kind = PARQUET_TYPES.get(column, 'string')
+    if kind == 'timestamp':
+        return [None if v is None else _timestamp(v) for v in values]
+    if kind == 'bool_':
+        return [None if v is None else bool(v) for v in values]
+    if kind == 'string':
+        return [v if v is None or isinstance(v, str) else json.dumps(v) for v in values]
+    return values
+
+
+def _csv_value(value):
+    """Wie COPY ... CSV: Arrays als {1,2,3}, Booleans t/f, NULL leer"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, list):
+        return '{' + ','.join('NULL' if v is None else str(_csv_value(v)) for v in value) + '}'
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+
+class _PartFile:
+    """Eine Datei einer Partition - schreibt nach <name>.tmp, Umbenennen bei close()"""
+
+    extension = ''
+
+    def __init__(self, directory, first_id, columns):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"part-{first_id:012d}{self.extension}")
+        self.tmp_path = self.path + '.tmp'
+        self.columns = columns
+
+    def close(self):
+        os.replace(self.tmp_path, self.path)
+
+
+class _ParquetFile(_PartFile):
+    extension = '.parquet'
+
+    def __init__(self, directory, first_id, columns):
+        super().__init__(directory, first_id, columns)
+        self.schema = pa.schema([(c, _arrow_type(c)) for c in columns])
+        self.writer = pq.ParquetWriter(self.tmp_path, self.schema, compression='zstd')
+
+    def write(self, rows):
+        arrays = [pa.array(_arrow_values(c, [row.get(c) for row in rows]), type=self.schema.field(c).type)
+                  for c in self.columns]
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+        super().close()
+
+
+class _CsvFile(_PartFile):
+    extension = '.csv.gz'
+
+    def __init__(self, directory, first_id, columns):
+        super().__init__(directory, first_id, columns)
+        self.file = gzip.open(self.tmp_path, 'wt', encoding='utf-8', newline='', compresslevel=6)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def write(self, rows):
+        self.writer.writerows([_csv_value(row.get(c)) for c in self.columns] for row in rows)
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
+FORMATS = {'parquet': _ParquetFile, 'csv': _CsvFile}
+
+
+# ===== EXPORT =====
+
+class Exporter:
+    def __init__(self, db, directory, fmt='parquet', page_size=PAGE_SIZE,
+                 safety_lag=SAFETY_LAG, open_session_days=OPEN_SESSION_DAYS):
+        if fmt == 'parquet' and not PYARROW_AVAILABLE:
+            print("⚠️  pyarrow nicht installiert - Export als CSV (pip install pyarrow für Parquet)")
+            fmt = 'csv'
+        self.db = db
+        self.directory = directory
+        self.format = fmt
+        self.page_size = page_size
+        self.safety_lag = timedelta(seconds=safety_lag)
+        self.open_session_age = timedelta(days=open_session_days)
+
+        # Pro Tabelle zurückgesetzt
+        self.buffers = {}                 # (Gerät, Monat) → [Zeilen]
+        self.buffered = 0
+        self.files = OrderedDict()        # (Gerät, Monat) → _PartFile, älteste zuerst (LRU)
+        self.files_written = 0
+
+    # ----- High-Water-Mark -----
+
+    def load_state(self):
+        path = os.path.join(self.directory, STATE_FILE)
+        if not os.path.exists(path):
+            return {'tables': {}}
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_state(self, state):
+        """Atomar (tmp + replace) - ein Abbruch lässt die alte Marke stehen"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, STATE_FILE)
+        state['updated_at'] = datetime.utcnow().isoformat()
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(path + '.tmp', path)
+
+    # ----- Tabellen -----
+
+    def run(self, tables=None):
+        """Alle (bzw. die angegebenen) Tabellen ab ihrer Marke exportieren → {Tabelle: Zeilen}"""
+        result = {}
+        for table in tables or TABLES:
+            result[table] = self.export_table(table)
+        return result
+
+    def export_table(self, table):
+        state = self.load_state()
+        after_id = state['tables'].get(table, 0)
+        open_ids = set(state.get('open', {}).get(table, []))
+        time_column = TABLES[table]
+        self.buffers, self.buffered, self.files, self.files_written = {}, 0, OrderedDict(), 0
+
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        count = 0
+        last_id = after_id
+        still_open = set()
+        # Low-Water-Mark: ab der ältesten noch offenen Session lesen
+        low_water = min(open_ids) - 1 if open_ids else after_id
+        rows = self.db.iter_rows(table, '*', after_id=low_water, page_size=self.page_size)
+        try:
+            for row in rows:
+                new = row['id'] > after_id
+                if not new and row['id'] not in open_ids:
+                    continue   # schon exportiert
+                if new and row.get('created_at') and now - _timestamp(row['created_at']) < self.safety_lag:
+                    break      # evtl. noch nicht committete kleinere ids - nächster Lauf
+                if new:
+                    last_id = row['id']
+                if table == 'sessions' and not row.get('end_time') \
+                        and now - _timestamp(row.get('start_time') or row['created_at']) < self.open_session_age:
+                    still_open.add(row['id'])   # laufende Session: nach ihrem Ende nachholen
+                    continue
+                key = partition(row, time_column)
+                buffer = self.buffers.setdefault(key, [])
+                buffer.append(row)
+                self.buffered += 1
+                count += 1
+                if len(buffer) >= ROW_GROUP_ROWS:
+                    self._flush(table, key)
+                elif self.buffered >= MAX_BUFFERED_ROWS:
+                    self._flush_all(table)
+        finally:
+            rows.close()
+
+        self._flush_all(table)
+        for part in self.files.values():
+            part.close()
+        self.files.clear()
+
+        if last_id != after_id or still_open != open_ids:
+            state['tables'][table] = last_id
+            if still_open:
+                state.setdefault('open', {})[table] = sorted(still_open)
+            else:
+                state.get('open', {}).pop(table, None)
+            state.setdefault('format', self.format)
+            self.save_state(state)
+        waiting = f", {len(still_open)} offen" if still_open else ''
+        print(f"   📤 {table:<17} {count:>10,} Zeilen → {self.files_written} Dateien "
+              f"(id > {after_id} bis {last_id}{waiting}, {time.perf_counter() - started:.1f} s)")
+        return count
+
+    def _flush_all(self, table):
+        for key in list(self.buffers):
+            self._flush(table, key)
+
+    def _flush(self, table, key):
+        rows = self.buffers.pop(key, None)
+        if not rows:
+            return
+        self.buffered -= len(rows)
+        part = self.files.get(key)
+        if part is None:
+            if len(self.files) >= MAX_OPEN_FILES:
+                _, oldest = self.files.popitem(last=False)
+                oldest.close()
+            directory = os.path.join(self.directory, table, *key)
+            part = self.files[key] = FORMATS[self.format](directory, rows[0]['id'], list(rows[0]))
+            self.files_written += 1
+        self.files.move_to_end(key)
+        part.write(rows)
+
+
+def main(argv=None):
+    import config
+    from database.supabase_manager import SupabaseManager
+
+    parser = argparse.ArgumentParser(description='Session-Historie inkrementell nach Parquet/CSV exportieren')
+    parser.add_argument('directory', nargs='?', default=config.EXPORT_DIR,
+                        help='Zielverzeichnis (Standard: EXPORT_DIR)')
+    parser.add_argument('--format', choices=sorted(FORMATS), default=config.EXPORT_FORMAT,
+                        help='parquet (pyarrow) oder csv (gzip), Standard: EXPORT_FORMAT')
+    parser.add_argument('--tables', help=f"Kommagetrennt, Standard: {','.join(TABLES)}")
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE,
+                        help='Zeilen pro Request (<= max-rows des Projekts)')
+    args = parser.parse_args(argv)
+
+    tables = [t.strip() for t in args.tables.split(',')] if args.tables else None
+    unknown = [t for t in tables or [] if t not in TABLES]
+    if unknown:
+        print(f"❌ Unbekannte Tabelle(n): {', '.join(unknown)}")
+        return 1
+
+    db = SupabaseManager()
+    if not db.client:
+        return 1
+    exporter = Exporter(db, args.directory, args.format, args.page_size,
+                        config.EXPORT_SAFETY_LAG, config.EXPORT_OPEN_SESSION_DAYS)
+    print(f"\n📤 EXPORT nach {args.directory} ({exporter.format})")
+    started = time.perf_counter()
+    result = exporter.run(tables)
+    print(f"✅ Export fertig: {sum(result.values()):,} Zeilen in {time.perf_counter() - started:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    if not os.environ.get('DEVICE_OVERRIDE') and '--device=' not in ' '.join(sys.argv):
+        os.environ['DEVICE_OVERRIDE'] = 'pitop1'
+    sys.exit(main())
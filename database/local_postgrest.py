@@ -0,0 +1,668 @@
+"""
+Lokaler Supabase/PostgREST Stand-in auf SQLite
+Implementiert die Teilmenge von PostgREST, die SupabaseManager und die
+PiTop-Programme nutzen (insert, upsert, update, delete, select mit eq/neq/gt/gte/
+lt/lte/is/in, order, limit, single, explain) - mit einstellbarer Latenz und Fehlerquote.
+Tabellen, Spalten und Indizes werden aus database/migrations/*.sql gelesen; unbekannte
+Tabellen/Spalten lehnt der Stand-in wie PostgREST ab (404 / 400 PGRST204).
+
+Damit laufen DB-Tests ohne Internet/.env-Credentials und Timings sind reproduzierbar:
+
+    python -m database.local_postgrest --port 54321 --latency 80 --jitter 20 --error-rate 0.02
+
+und in der .env: SUPABASE_URL=http://127.0.0.1:54321  SUPABASE_KEY=local
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qsl
+
+from database.migrate import MIGRATIONS_DIR, discover
+
+REST_PREFIX = '/rest/v1/'
+SINGLE_OBJECT = 'application/vnd.pgrst.object+json'
+PLAN = 'application/vnd.pgrst.plan'
+CSV = 'text/csv'
+NOW_SQL = "(strftime('%Y-%m-%dT%H:%M:%f', 'now'))"
+
+# Schema wie in Supabase: aus database/migrations/*.sql (Spalten-Typen, Defaults, Indizes)
+_CONSTRAINTS = ('primary', 'unique', 'check', 'constraint', 'foreign', 'exclude')
+
+
+def _split_top_level(body):
+    """Tabellen-Definition an Kommas außerhalb von Klammern trennen"""
+    parts, depth, current = [], 0, ''
+    for char in body:
+        if char == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+            continue
+        depth += (char == '(') - (char == ')')
+        current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def _column_type(definition):
+    """Postgres-Spaltendefinition → SQLite-Deklaration (Arrays/jsonb als JSON)"""
+    kind = definition.split()[0].lower()
+    if kind.endswith('[]') or kind in ('json', 'jsonb'):
+        decl = 'JSON'
+    elif kind in ('smallint', 'integer', 'int', 'bigint'):
+        decl = 'INTEGER'
+    elif kind.startswith(('real', 'numeric', 'double', 'float')):
+        decl = 'REAL'
+    elif kind == 'boolean':
+        decl = 'BOOLEAN'
+    else:
+        decl = 'TEXT'   # uuid, text, timestamptz, date
+    default = re.search(r'\bdefault\s+(\S+)', definition, re.IGNORECASE)
+    if default:
+        value = default.group(1).lower()
+        if value in ('false', 'true'):
+            decl += f" DEFAULT {int(value == 'true')}"
+        elif value == 'now()':
+            decl += f' DEFAULT {NOW_SQL}'
+        elif re.fullmatch(r'-?\d+(\.\d+)?', value):
+            decl += f' DEFAULT {value}'
+    return decl
+
+
+def load_schema(directory=None):
+    """Migrationen in Reihenfolge lesen → (Tabelle → {Spalte: Deklaration}, [CREATE INDEX ...])
+
+    id und created_at legt SqliteStore selbst an. Views, Constraints und DO-Blöcke
+    werden übersprungen; Primärschlüssel/unique werden zu eindeutigen Indizes.
+    """
+    schema, indexes = {}, []
+    for _, _, path in discover(directory or MIGRATIONS_DIR):
+        with open(path, encoding='utf-8') as f:
+            sql = re.sub(r'--[^\n]*', '', f.read())
+        sql = re.sub(r'\bdo\s+\$\$.*?\$\$\s*;', '', sql, flags=re.IGNORECASE | re.DOTALL)
+        for statement in sql.split(';'):
+            statement = ' '.join(statement.split())
+            table = re.match(r'create table if not exists (\w+) \((.*)\)$', statement, re.IGNORECASE)
+            column = re.match(r'alter table (\w+) add column if not exists (\w+) (.*)$', statement, re.IGNORECASE)
+            if table:
+                name, columns = table.group(1), schema.setdefault(table.group(1), {})
+                for item in _split_top_level(table.group(2)):
+                    words = item.split()
+                    first = words[0].lower()
+                    key = re.match(r'(?:primary key|unique) \((.*?)\)', item, re.IGNORECASE)
+                    if first in _CONSTRAINTS:
+                        if key:
+                            indexes.append(f'CREATE UNIQUE INDEX IF NOT EXISTS {name}_pkey ON {name} ({key.group(1)})')
+                        continue
+                    if first in ('id', 'created_at'):
+                        continue
+                    columns[first] = _column_type(' '.join(words[1:]))
+                    if re.search(r'\bprimary key\b', item, re.IGNORECASE):
+                        indexes.append(f'CREATE UNIQUE INDEX IF NOT EXISTS {name}_pkey ON {name} ({first})')
+            elif column:
+                schema.setdefault(column.group(1), {})[column.group(2).lower()] = _column_type(column.group(3))
+            elif re.match(r'create (unique )?index ', statement, re.IGNORECASE):
+                indexes.append(statement)
+    return schema, indexes
+
+
+SCHEMA, INDEXES = load_schema()
+
+OPERATORS = {'eq': '=', 'neq': '!=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+
+
+class PostgrestError(Exception):
+    def __init__(self, status, message, code='PGRST000'):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+# ===== PROFILE =====
+
+class LatencyProfile:
+    """Künstliche Antwortzeit: base_ms + gleichverteilter Jitter (deterministisch per Seed)"""
+
+    def __init__(self, base_ms=0.0, jitter_ms=0.0, seed=0):
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.base_ms + jitter) / 1000.0
+
+
+class FailureProfile:
+    """Injizierte Fehler: HTTP 503 (error_rate) oder hängende Verbindung (timeout_rate)"""
+
+    def __init__(self, error_rate=0.0, timeout_rate=0.0, hang_seconds=10.0, seed=0):
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self._forced = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def fail_next(self, count=1, kind='error'):
+        """Erzwingt Fehler für die nächsten count Anfragen ('error' oder 'timeout')"""
+        with self._lock:
+            self._forced.extend([kind] * count)
+
+    def pick(self):
+        with self._lock:
+            if self._forced:
+                return self._forced.pop(0)
+            roll = self._rng.random()
+        if roll < self.timeout_rate:
+            return 'timeout'
+        if roll < self.timeout_rate + self.error_rate:
+            return 'error'
+        return None
+
+
+# ===== SQLITE BACKEND =====
+
+class SqliteStore:
+    def __init__(self, path=':memory:'):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.columns = {}   # table → {column: declared type}
+        for table, columns in SCHEMA.items():
+            self._create_table(table, columns)
+        for statement in INDEXES:
+            self.conn.execute(statement)
+
+    def _create_table(self, table, columns):
+        definitions = ['id INTEGER PRIMARY KEY AUTOINCREMENT']
+        definitions += [f'"{name}" {decl}' for name, decl in columns.items()]
+        definitions.append(f'created_at TEXT DEFAULT {NOW_SQL}')
+        with self.lock:
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({", ".join(definitions)})')
+            self._load_columns(table)
+
+    def _load_columns(self, table):
+        info = self.conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+        self.columns[table] = {row[1]: (row[2] or 'TEXT').upper() for row in info}
+
+    def _check_row(self, table, row):
+        """Wie PostgREST: unbekannte Tabelle → 404, unbekannte Spalte → 400 (Schema aus den Migrationen)"""
+        self._check_table(table)
+        for name in row:
+            if name not in self.columns[table]:
+                raise PostgrestError(400, f"Could not find the '{name}' column of '{table}' in the schema cache",
+                                     'PGRST204')
+
+    def _check_table(self, table):
+        if table not in self.columns:
+            raise PostgrestError(404, f'relation "public.{table}" does not exist', '42P01')
+
+    def _check_column(self, table, column):
+        if column not in self.columns[table]:
+            raise PostgrestError(400, f'column {table}.{column} does not exist', '42703')
+
+    # ----- Konvertierung -----
+
+    def _to_sql(self, table, column, value):
+        kind = self.columns[table].get(column, 'TEXT')
+        if isinstance(value, (list, dict)):
+            return json.dumps(value)
+        if kind.startswith('BOOLEAN') and isinstance(value, str):
+            return 1 if value.lower() == 'true' else 0
+        return value
+
+    def _from_sql(self, table, row, names):
+        kinds = self.columns[table]
+        result = {}
+        for name, value in zip(names, row):
+            kind = kinds.get(name, 'TEXT')
+            if value is not None and kind.startswith('BOOLEAN'):
+                value = bool(value)
+            elif value is not None and kind.startswith('JSON'):
+                value = json.loads(value)
+            result[name] = value
+        return result
+
+    # ----- Query-Bausteine -----
+
+    def _where(self, table, filters):
+        clauses = []
+        params = []
+        for column, expression in filters:
+            self._check_column(table, column)
+            op, _, value = expression.partition('.')
+            negate = op == 'not'
+            if negate:
+                op, _, value = value.partition('.')
+
+            if op in OPERATORS:
+                clause = f'"{column}" {OPERATORS[op]} ?'
+                params.append(self._to_sql(table, column, value))
+            elif op == 'is':
+                if value not in ('null', 'true', 'false'):
+                    raise PostgrestError(400, f'invalid is. value: {value}')
+                clause = f'"{column}" IS {value.upper()}'
+            elif op == 'in':
+                items = [v.strip().strip('"') for v in value.strip('()').split(',') if v.strip()]
+                clause = f'"{column}" IN ({", ".join("?" * len(items))})'
+                params.extend(self._to_sql(table, column, v) for v in items)
+            else:
+                raise PostgrestError(400, f'unsupported operator: {op}')
+
+            clauses.append(f'NOT ({clause})' if negate else clause)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def _order(self, table, order):
+        if not order:
+            return ''
+        parts = []
+        for item in order.split(','):
+            column, *modifiers = item.split('.')
+            self._check_column(table, column)
+            direction = 'DESC' if 'desc' in modifiers else 'ASC'
+            nulls = ' NULLS FIRST' if 'nullsfirst' in modifiers else (
+                ' NULLS LAST' if 'nullslast' in modifiers else '')
+            parts.append(f'"{column}" {direction}{nulls}')
+        return ' ORDER BY ' + ', '.join(parts)
+
+    def _columns(self, table, select):
+        if not select or select.strip() == '*':
+            return list(self.columns[table])
+        names = [c.strip() for c in select.split(',') if c.strip()]
+        for name in names:
+            self._check_column(table, name)
+        return names
+
+    # ----- Operationen -----
+
+    def _select_sql(self, table, select, filters, order, limit, offset):
+        self._check_table(table)
+        names = self._columns(table, select)
+        where, params = self._where(table, filters)
+        columns = ', '.join(f'"{n}"' for n in names)
+        sql = f'SELECT {columns} FROM "{table}"{where}'
+        sql += self._order(table, order)
+        if limit is not None or offset is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [-1 if limit is None else limit, offset or 0]
+        return sql, params, names
+
+    def select(self, table, select='*', filters=(), order=None, limit=None, offset=None):
+        with self.lock:
+            sql, params, names = self._select_sql(table, select, filters, order, limit, offset)
+            rows = self.conn.execute(sql, params).fetchall()
+            return [self._from_sql(table, row, names) for row in rows]
+
+    def explain(self, table, select='*', filters=(), order=None, limit=None, offset=None):
+        """EXPLAIN QUERY PLAN → Text im Stil von Postgres (Index Scan / Seq Scan / Sort)"""
+        with self.lock:
+            sql, params, _ = self._select_sql(table, select, filters, order, limit, offset)
+            plan = self.conn.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+
+        lines = []
+        for _, _, _, detail in plan:
+            words = detail.split()
+            if 'TEMP B-TREE' in detail:
+                lines.append('Sort')
+            elif 'PRIMARY KEY' in detail:
+                lines.append(f'Index Scan using {table}_pkey on {table}')
+            elif 'INDEX' in words:
+                lines.append(f'Index Scan using {words[words.index("INDEX") + 1]} on {table}')
+            elif words[:1] == ['SCAN']:
+                lines.append(f'Seq Scan on {table}')
+            else:
+                lines.append(detail)
+        return '\n'.join(f'{"  " * i}{"->  " if i else ""}{line}' for i, line in enumerate(lines)) + '\n'
+
+    def insert(self, table, rows, returning=True):
+        with self.lock:
+            ids = []
+            # Aufeinanderfolgende Zeilen mit gleichen Spalten per executemany
+            groups = []
+            for row in rows:
+                self._check_row(table, row)
+                names = tuple(row)
+                if groups and groups[-1][0] == names:
+                    groups[-1][1].append(row)
+                else:
+                    groups.append((names, [row]))
+
+            for names, group in groups:
+                if not names:
+                    for _ in group:
+                        ids.append(self.conn.execute(f'INSERT INTO "{table}" DEFAULT VALUES').lastrowid)
+                    continue
+                columns = ', '.join(f'"{n}"' for n in names)
+                sql = f'INSERT INTO "{table}" ({columns}) VALUES ({", ".join("?" * len(names))})'
+                cursor = self.conn.executemany(
+                    sql, [[self._to_sql(table, n, row[n]) for n in names] for row in group]
+                )
+                # IDs sind unter dem Lock fortlaufend (AUTOINCREMENT)
+                last_id = self.conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+                ids.extend(range(last_id - cursor.rowcount + 1, last_id + 1))
+            self.conn.commit()
+            return self._by_ids(table, ids) if returning else []
+
+    def update(self, table, values, filters):
+        with self.lock:
+            self._check_table(table)
+            self._check_row(table, values)
+            ids = [row['id'] for row in self.select(table, 'id', filters)]
+            if ids and values:
+                assignments = ', '.join(f'"{n}" = ?' for n in values)
+                params = [self._to_sql(table, n, v) for n, v in values.items()]
+                self.conn.executemany(
+                    f'UPDATE "{table}" SET {assignments} WHERE id = ?',
+                    [params + [row_id] for row_id in ids]
+                )
+                self.conn.commit()
+            return self._by_ids(table, ids)
+
+    def upsert(self, table, rows, on_conflict=('id',), ignore_duplicates=False, returning=True):
+        """INSERT ... ON CONFLICT (on_conflict) DO UPDATE/NOTHING - zeilenweise per Lookup"""
+        with self.lock:
+            ids = []
+            for row in rows:
+                self._check_row(table, row)
+                for column in on_conflict:
+                    self._check_column(table, column)
+                filters = [(c, 'is.null' if row.get(c) is None else f'eq.{row[c]}') for c in on_conflict]
+                existing = self.select(table, 'id', filters, limit=1)
+                if not existing:
+                    ids.extend(r['id'] for r in self.insert(table, [row]))
+                elif not ignore_duplicates:
+                    ids.extend(r['id'] for r in self.update(table, row, [('id', f"eq.{existing[0]['id']}")]))
+            self.conn.commit()
+            return self._by_ids(table, ids) if returning else []
+
+    def delete(self, table, filters):
+        with self.lock:
+            rows = self.select(table, '*', filters)
+            if rows:
+                self.conn.executemany(f'DELETE FROM "{table}" WHERE id = ?', [(r['id'],) for r in rows])
+                self.conn.commit()
+            return rows
+
+    def _by_ids(self, table, ids):
+        if not ids:
+            return []
+        names = list(self.columns[table])
+        placeholders = ', '.join('?' * len(ids))
+        rows = self.conn.execute(
+            f'SELECT * FROM "{table}" WHERE id IN ({placeholders}) ORDER BY id', ids
+        ).fetchall()
+        return [self._from_sql(table, row, names) for row in rows]
+
+
+# ===== HTTP SERVER =====
+
+class LocalPostgrest:
+    def __init__(self, db_path=':memory:', host='127.0.0.1', port=0, latency=None, failures=None,
+                 max_rows=None):
+        self.store = SqliteStore(db_path)
+        self.max_rows = max_rows   # wie PostgREST db-max-rows: GET-Antworten werden still gekürzt
+        self.latency = latency or LatencyProfile()
+        self.failures = failures or FailureProfile()
+        self.requests = []   # (perf_counter, method, table, body)
+        self.stats = {'requests': 0, 'connections': 0, 'errors': 0, 'timeouts': 0}
+        self._cond = threading.Condition()
+
+        handler = type('Handler', (_Handler,), {'server_ref': self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    # ===== DIREKTZUGRIFF (Testdaten, Assertions) =====
+
+    def insert_rows(self, table, rows):
+        """Fügt Zeilen ohne HTTP/Latenz ein"""
+        return self.store.insert(table, rows)
+
+    def rows(self, table, **filters):
+        return self.store.select(table, '*', [(k, f'eq.{v}') for k, v in filters.items()], 'id')
+
+    def wait_for(self, method, table, predicate=None, since=0.0, timeout=5.0):
+        """Wartet auf eine Anfrage und gibt deren Empfangszeit (perf_counter) zurück"""
+        deadline = time.perf_counter() + timeout
+        with self._cond:
+            while True:
+                for received, m, t, body in self.requests:
+                    if received >= since and m == method and t == table:
+                        if predicate is None or predicate(body):
+                            return received
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def count(self, key):
+        with self._cond:
+            self.stats[key] += 1
+
+    def _record(self, method, table, body):
+        with self._cond:
+            self.stats['requests'] += 1
+            self.requests.append((time.perf_counter(), method, table, body))
+            self._cond.notify_all()
+
+    # ===== REST =====
+
+    def handle_rest(self, method, table, params, headers, body):
+        """Führt eine PostgREST-Anfrage aus → (status, payload)"""
+        select = '*'
+        order = None
+        limit = None
+        offset = None
+        filters = []
+        on_conflict = None
+        for key, value in params:
+            if key == 'select':
+                select = value
+            elif key == 'order':
+                order = value
+            elif key == 'limit':
+                limit = int(value)
+            elif key == 'offset':
+                offset = int(value)
+            elif key == 'on_conflict':
+                on_conflict = tuple(c.strip() for c in value.split(','))
+            elif key == 'columns':
+                continue
+            else:
+                filters.append((key, value))
+
+        prefer = headers.get('Prefer', '')
+        representation = 'return=representation' in prefer
+
+        if method == 'GET' and PLAN in headers.get('Accept', ''):
+            return 200, self.store.explain(table, select, filters, order, limit, offset)
+
+        if method == 'POST' and 'resolution=' in prefer:
+            rows = self.store.upsert(
+                table, body if isinstance(body, list) else [body], on_conflict or ('id',),
+                ignore_duplicates='resolution=ignore-duplicates' in prefer, returning=representation
+            )
+            status = 201
+        elif method == 'POST':
+            rows = self.store.insert(table, body if isinstance(body, list) else [body], representation)
+            status = 201
+        elif method == 'PATCH':
+            rows = self.store.update(table, body or {}, filters)
+            status = 200
+        elif method == 'DELETE':
+            rows = self.store.delete(table, filters)
+            status = 200
+        else:
+            if self.max_rows:
+                limit = min(limit, self.max_rows) if limit is not None else self.max_rows
+            rows = self.store.select(table, select, filters, order, limit, offset)
+            status = 200
+
+        if method != 'GET':
+            if not representation:
+                return 201 if method == 'POST' else 204, None
+            names = self.store._columns(table, select)
+            rows = [{n: row.get(n) for n in names} for row in rows]
+
+        if method == 'GET' and CSV in headers.get('Accept', ''):
+            return status, _to_csv(rows, self.store._columns(table, select))
+
+        if SINGLE_OBJECT in headers.get('Accept', ''):
+            if len(rows) != 1:
+                raise PostgrestError(406, 'JSON object requested, multiple (or no) rows returned', 'PGRST116')
+            return status, rows[0]
+        return status, rows
+
+
+def _csv_value(value):
+    """Textdarstellung wie Postgres (t/f, {1,2,3}, NULL = leer)"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, list):
+        return '{' + ','.join('NULL' if v is None else str(_csv_value(v)) for v in value) + '}'
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+
+def _to_csv(rows, names):
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(names)
+    for row in rows:
+        writer.writerow([_csv_value(row.get(n)) for n in names])
+    return out.getvalue()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_ref = None
+    protocol_version = 'HTTP/1.1'   # Keep-Alive, damit Connection-Pooling messbar ist
+    disable_nagle_algorithm = True  # Header + Body sofort senden (kein 40ms Delayed-ACK)
+
+    def setup(self):
+        super().setup()
+        self.server_ref.count('connections')
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload=None):
+        text = isinstance(payload, str)
+        data = payload.encode() if text else (json.dumps(payload).encode() if payload is not None else b'')
+        self.send_response(status)
+        if data:
+            self.send_header('Content-Type', 'text/plain' if text else 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def handle_other(self, method, path, body):
+        """Hook für Unterklassen (z.B. Discord Webhook) - False wenn nicht behandelt"""
+        return False
+
+    def _handle(self, method):
+        ref = self.server_ref
+        parsed = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        body = json.loads(raw) if raw else None
+
+        failure = ref.failures.pick()
+        time.sleep(ref.latency.delay())
+
+        if failure == 'timeout':
+            ref.count('timeouts')
+            time.sleep(ref.failures.hang_seconds)
+            self.close_connection = True
+            return
+        if failure == 'error':
+            ref.count('errors')
+            return self._reply(503, {'code': 'PGRST000', 'message': 'injected failure', 'details': None, 'hint': None})
+
+        if self.handle_other(method, parsed.path, body):
+            return
+        if not parsed.path.startswith(REST_PREFIX):
+            return self._reply(404, {'message': 'not found'})
+
+        table = parsed.path[len(REST_PREFIX):]
+        params = parse_qsl(parsed.query, keep_blank_values=True)
+        headers = {k: v for k, v in self.headers.items()}
+        try:
+            status, payload = ref.handle_rest(method, table, params, headers, body)
+        except PostgrestError as e:
+            status, payload = e.status, {'code': e.code, 'message': str(e), 'details': None, 'hint': None}
+        except (sqlite3.Error, ValueError) as e:
+            status, payload = 400, {'code': 'PGRST100', 'message': str(e), 'details': None, 'hint': None}
+
+        ref._record(method, table, body)
+        self._reply(status, payload)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PATCH(self):
+        self._handle('PATCH')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Lokaler Supabase/PostgREST Stand-in (SQLite)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=54321)
+    parser.add_argument('--db', default=':memory:', help='SQLite-Datei (Standard: im Speicher)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Basis-Latenz in ms')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Jitter ± ms')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Anteil HTTP 503 (0-1)')
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='Anteil hängender Anfragen (0-1)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-rows', type=int, help='Max. Zeilen pro Antwort (Supabase Standard: 1000)')
+    args = parser.parse_args(argv)
+
+    server = LocalPostgrest(
+        db_path=args.db, host=args.host, port=args.port,
+        latency=LatencyProfile(args.latency, args.jitter, seed=args.seed),
+        failures=FailureProfile(args.error_rate, args.timeout_rate, seed=args.seed),
+        max_rows=args.max_rows
+    )
+    print(f"✅ Lokaler PostgREST Stand-in: {server.url}")
+    print(f"   SUPABASE_URL={server.url}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        server.server.server_close()
+        print("\n🛑 Stand-in gestoppt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Schema-Migrationen (database/migrations/NNNN_name.sql)
+Versionierte SQL-Dateien werden in Reihenfolge genau einmal angewendet und in
+schema_migrations protokolliert.
+
+    python -m database.migrate              # Status: angewendet / ausstehend
+    python -m database.migrate apply        # ausstehende anwenden (DATABASE_URL + psycopg2)
+    python -m database.migrate print --output pending.sql   # SQL für den Supabase SQL Editor
+
+PostgREST kann kein DDL ausführen - zum Anwenden braucht es eine direkte
+Postgres-Verbindung (DATABASE_URL aus Supabase → Project Settings → Database).
+Ohne psycopg2/DATABASE_URL liefert "print" dasselbe SQL inkl. Protokoll-Eintrag.
+"""
+
+import argparse
+import os
+import re
+import sys
+from contextlib import closing
+
+try:
+    import psycopg2
+    PSYCOPG_AVAILABLE = True
+except ImportError:
+    PSYCOPG_AVAILABLE = False
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations')
+FILENAME_PATTERN = re.compile(r'^(\d{4})_(\w+)\.sql$')
+
+BOOTSTRAP_SQL = """create table if not exists schema_migrations (
+    version     text         primary key,
+    name        text         not null,
+    applied_at  timestamptz  not null default now()
+);"""
+
+
+def discover(directory=MIGRATIONS_DIR):
+    """Alle Migrationen → [(version, name, path)] sortiert nach Version"""
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = FILENAME_PATTERN.match(filename)
+        if match:
+            migrations.append((match.group(1), match.group(2), os.path.join(directory, filename)))
+    versions = [m[0] for m in migrations]
+    duplicates = {v for v in versions if versions.count(v) > 1}
+    if duplicates:
+        raise ValueError(f"Doppelte Migrations-Versionen: {', '.join(sorted(duplicates))}")
+    return migrations
+
+
+def _record_sql(version, name):
+    return (f"insert into schema_migrations (version, name) values ('{version}', '{name}') "
+            f"on conflict (version) do nothing;")
+
+
+class Migrator:
+    def __init__(self, database_url=None, directory=MIGRATIONS_DIR):
+        self.database_url = database_url
+        self.migrations = discover(directory)
+
+    # ----- Status -----
+
+    def applied_versions(self):
+        """Bereits angewendete Versionen (direkt per Postgres oder über PostgREST)"""
+        if self.database_url and PSYCOPG_AVAILABLE:
+            # "with conn" ist nur die Transaktion - schließen erst über closing()
+            with closing(psycopg2.connect(self.database_url)) as conn:
+                with conn, conn.cursor() as cur:
+                    cur.execute(BOOTSTRAP_SQL)
+                    cur.execute('select version from schema_migrations')
+                    return {row[0] for row in cur.fetchall()}
+
+        from database.supabase_manager import SupabaseManager
+        db = SupabaseManager()
+        if not db.client:
+            return set()
+        try:
+            response = db.client.table('schema_migrations').select('version').execute()
+            return {row['version'] for row in response.data or []}
+        except Exception:
+            return set()   # Tabelle existiert noch nicht → nichts angewendet
+
+    def pending(self, applied=None):
+        applied = self.applied_versions() if applied is None else applied
+        return [m for m in self.migrations if m[0] not in applied]
+
+    # ----- Anwenden -----
+
+    def apply(self):
+        """Wendet alle ausstehenden Migrationen an (je eine Transaktion) → Anzahl"""
+        if not PSYCOPG_AVAILABLE:
+            raise RuntimeError("psycopg2 nicht installiert - pip install psycopg2-binary "
+                               "(oder: python -m database.migrate print)")
+        if not self.database_url:
+            raise RuntimeError("DATABASE_URL fehlt in .env (oder: python -m database.migrate print)")
+
+        count = 0
+        for version, name, path in self.pending():
+            with open(path) as f:
+                sql = f.read()
+            print(f"🔧 Migration {version}_{name} ...")
+            with closing(psycopg2.connect(self.database_url)) as conn:
+                with conn, conn.cursor() as cur:
+                    cur.execute(sql)
+                    cur.execute(_record_sql(version, name))
+            print(f"✅ Migration {version}_{name} angewendet")
+            count += 1
+        return count
+
+    def render(self, migrations):
+        """SQL für den Supabase SQL Editor (eine Transaktion je Migration)"""
+        parts = [BOOTSTRAP_SQL]
+        for version, name, path in migrations:
+            with open(path) as f:
+                sql = f.read().strip()
+            parts.append(f"-- ===== {version}_{name} =====\nbegin;\n{sql}\n{_record_sql(version, name)}\ncommit;")
+        return '\n\n'.join(parts) + '\n'
+
+
+def main(argv=None):
+    import config
+
+    parser = argparse.ArgumentParser(description='Schema-Migrationen anwenden')
+    parser.add_argument('command', nargs='?', default='status', choices=['status', 'apply', 'print'])
+    parser.add_argument('--output', help='SQL von "print" in Datei schreiben statt stdout')
+    args = parser.parse_args(argv)
+
+    migrator = Migrator(config.DATABASE_URL)
+
+    if args.command == 'apply':
+        try:
+            count = migrator.apply()
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"✅ {count} Migration(en) angewendet" if count else "✅ Schema ist aktuell")
+        return 0
+
+    pending = migrator.pending()
+    if args.command == 'print':
+        sql = migrator.render(pending)
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(sql)
+            print(f"💾 {len(pending)} Migration(en) → {args.output}")
+        else:
+            sys.stdout.write(sql)
+        return 0
+
+    pending_versions = {m[0] for m in pending}
+    print("\n📋 SCHEMA-MIGRATIONEN")
+    for version, name, _ in migrator.migrations:
+        mark = '⏳ ausstehend' if version in pending_versions else '✅ angewendet'
+        print(f"   {version}_{name:<30} {mark}")
+    return 0
+
+
+if __name__ == "__main__":
+    if not os.environ.get('DEVICE_OVERRIDE') and '--device=' not in ' '.join(sys.argv):
+        os.environ['DEVICE_OVERRIDE'] = 'pitop1'
+    sys.exit(main())
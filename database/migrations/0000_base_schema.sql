@@ -0,0 +1,44 @@
+-- 0000: Ausgangsschema - die ursprünglich im Supabase Table Editor angelegten Tabellen
+--
+-- In bestehenden Projekten gibt es die Tabellen schon ("if not exists" → keine Änderung),
+-- neue Projekte und der lokale Stand-in (database/local_postgrest.py) bauen das Schema
+-- vollständig aus database/migrations/*.sql auf.
+-- Spätere Spalten kommen aus ihren Migrationen (last_seen_at: 0004, step_timeline: 0005).
+
+create table if not exists sessions (
+    id                bigint       generated by default as identity primary key,
+    session_id        uuid         not null,
+    start_time        timestamptz  not null default now(),
+    end_time          timestamptz,
+    timer_status      text,
+    user_name         text,
+    user_weight       real,
+    user_height       real,
+    device_id         text,
+    pause_count       integer      default 0,
+    total_work_time   integer      default 0,
+    total_pause_time  integer      default 0,
+    created_at        timestamptz  not null default now()
+);
+
+create table if not exists co2_measurements (
+    id           bigint       generated by default as identity primary key,
+    session_id   uuid,
+    co2_level    integer,
+    tvoc_level   integer,
+    is_alarm     boolean      default false,
+    alarm_type   text,
+    device_id    text,
+    created_at   timestamptz  not null default now()
+);
+
+create table if not exists breakdata (
+    id               bigint       generated by default as identity primary key,
+    session_id       uuid,
+    pause_number     integer,
+    step_count       integer,
+    calories_burned  real,
+    distance_meters  real,
+    device_id        text,
+    created_at       timestamptz  not null default now()
+);
@@ -0,0 +1,51 @@
+-- 0001: CO2 Rollups - Downsampling + Retention für co2_measurements
+--
+-- Rohdaten älter als CO2_RAW_RETENTION_DAYS werden von database/co2_rollup.py
+-- in Minuten- und Session-Aggregate verdichtet und danach gelöscht.
+-- Summen + Anzahl statt nur Mittelwerte, damit Aggregate exakt mergebar sind.
+
+create table if not exists co2_rollup_minute (
+    session_id      uuid         not null,
+    minute          timestamptz  not null,
+    device_id       text,
+    sample_count    integer      not null,
+    co2_sum         bigint       not null,
+    co2_min         integer,
+    co2_max         integer,
+    co2_mean        numeric(7,1),
+    tvoc_sum        bigint       not null default 0,
+    tvoc_count      integer      not null default 0,
+    tvoc_mean       numeric(7,1),
+    alarm_seconds   integer      not null default 0,   -- 1 Alarm-Zeile = 1 Sekunde
+    alarm_count     integer      not null default 0,   -- Alarm-Perioden
+    first_is_alarm  boolean      not null default false,
+    last_is_alarm   boolean      not null default false,
+    first_at        timestamptz,
+    last_at         timestamptz,
+    max_raw_id      bigint       not null,
+    primary key (session_id, minute)
+);
+
+create table if not exists co2_rollup_session (
+    session_id      uuid         primary key,
+    device_id       text,
+    sample_count    integer      not null,
+    co2_sum         bigint       not null,
+    co2_min         integer,
+    co2_max         integer,
+    co2_mean        numeric(7,1),
+    tvoc_sum        bigint       not null default 0,
+    tvoc_count      integer      not null default 0,
+    tvoc_mean       numeric(7,1),
+    alarm_seconds   integer      not null default 0,
+    alarm_count     integer      not null default 0,
+    first_is_alarm  boolean      not null default false,
+    last_is_alarm   boolean      not null default false,
+    first_at        timestamptz,
+    last_at         timestamptz,
+    max_raw_id      bigint       not null,             -- Rohdaten bis zu dieser id sind enthalten
+    compacted_until timestamptz  not null,
+    updated_at      timestamptz  not null default now()
+);
+
+create index if not exists co2_rollup_minute_minute_idx on co2_rollup_minute (minute);
@@ -0,0 +1,62 @@
+-- 0002: Indizes + Constraints für die Abfragen, die der Code tatsächlich stellt
+--
+-- Prüfen mit: python -m database.explain_queries  (EXPLAIN jeder SupabaseManager-Abfrage)
+--
+--   sessions          eq(session_id)                                → sessions_session_id_key
+--   sessions          is(end_time, null) order(start_time desc)    → sessions_active_start_time_idx (partiell)
+--   sessions          order(start_time desc) limit 1 (PiTop 2 Poll) → sessions_start_time_idx
+--   co2_measurements  eq(session_id) [gt(id)] order(id)             → co2_measurements_session_id_idx
+--   co2_measurements  lt(created_at) (Retention, 0001)              → co2_measurements_created_at_idx
+--   breakdata         eq(session_id)                                → breakdata_session_id_idx
+
+-- Eindeutige session_id (Voraussetzung für Fremdschlüssel und on_conflict=session_id).
+-- Schlägt fehl, wenn es bereits Duplikate gibt - diese vorher bereinigen:
+--   select session_id, count(*) from sessions group by 1 having count(*) > 1;
+create unique index if not exists sessions_session_id_key on sessions (session_id);
+
+-- get_active_session(): nur offene Sessions, neueste zuerst. Partiell → bleibt klein,
+-- egal wie viele beendete Sessions sich ansammeln.
+create index if not exists sessions_active_start_time_idx
+    on sessions (start_time desc)
+    where end_time is null;
+
+-- BreakStation._polling_loop(): neueste Session (jede Sekunde)
+create index if not exists sessions_start_time_idx on sessions (start_time desc);
+
+-- CO2-Statistik je Session, in id-Reihenfolge (Alarm-Perioden) und ab max_raw_id des Rollups
+create index if not exists co2_measurements_session_id_idx on co2_measurements (session_id, id);
+
+-- Retention (database/co2_rollup.py): Rohdaten vor dem Cutoff
+create index if not exists co2_measurements_created_at_idx on co2_measurements (created_at);
+
+-- Bewegungsdaten je Session (Report + Pausen)
+create index if not exists breakdata_session_id_idx on breakdata (session_id, pause_number);
+
+-- Fremdschlüssel: Messwerte gehören zu einer Session. "not valid" prüft nur neue Zeilen,
+-- Altbestand kann später mit "alter table ... validate constraint ..." geprüft werden.
+-- Ohne "on delete cascade": eine Session mit Daten zu löschen schlägt fehl, statt
+-- Messwerte und Pausen still mitzulöschen.
+do $$
+begin
+    alter table co2_measurements
+        add constraint co2_measurements_session_id_fkey
+        foreign key (session_id) references sessions (session_id) not valid;
+exception when duplicate_object then null;
+end $$;
+
+do $$
+begin
+    alter table breakdata
+        add constraint breakdata_session_id_fkey
+        foreign key (session_id) references sessions (session_id) not valid;
+exception when duplicate_object then null;
+end $$;
+
+-- Keine negativen Zähler/Zeiten
+do $$
+begin
+    alter table sessions
+        add constraint sessions_counters_check
+        check (pause_count >= 0 and total_work_time >= 0 and total_pause_time >= 0) not valid;
+exception when duplicate_object then null;
+end $$;
@@ -0,0 +1,34 @@
+-- 0003: Session Events - append-only Log der Zustandsänderungen
+--
+-- Statt sessions.timer_status von drei Stellen aus zu überschreiben, schreibt jedes
+-- Gerät nur noch INSERTs. Status/Pausen/Zeiten leitet services/session_events.py ab,
+-- PiTop 2 liest per Cursor (id > letzte id) mit.
+
+create table if not exists session_events (
+    id            bigint generated always as identity primary key,
+    session_id    uuid         not null,
+    event_type    text         not null check (event_type in (
+                      'session_started', 'work_started', 'work_ended',
+                      'break_started', 'break_ended', 'cancelled', 'ended')),
+    device_id     text         not null,
+    occurred_at   timestamptz  not null,               -- Wanduhr des Geräts
+    monotonic_ms  bigint,                               -- time.monotonic() des Geräts (Dauern)
+    payload       jsonb,
+    created_at    timestamptz  not null default now()
+);
+
+do $$
+begin
+    alter table session_events
+        add constraint session_events_session_id_fkey
+        foreign key (session_id) references sessions (session_id) not valid;
+exception when duplicate_object then null;
+end $$;
+
+-- Timeline/Projektion einer Session (get_session_state)
+create index if not exists session_events_session_id_idx on session_events (session_id, id);
+
+-- PiTop 2: letztes session_started finden
+create index if not exists session_events_type_idx on session_events (event_type, id desc);
+
+-- Tail per Cursor läuft über den Primärschlüssel (id > cursor order by id)
@@ -0,0 +1,10 @@
+-- 0004: Heartbeat für Crash-Recovery (services/checkpoint.py)
+--
+-- PiTop 1 schreibt regelmäßig Zwischensummen + last_seen_at in die offene Session.
+-- Stürzt das Gerät ab, schließt der nächste Start verwaiste Sessions mit
+-- end_time = last_seen_at statt sie ewig offen zu lassen.
+
+alter table sessions add column if not exists last_seen_at timestamptz;
+
+-- get_open_sessions(): is(end_time, null) eq(device_id) order(start_time desc)
+-- läuft über den partiellen Index sessions_active_start_time_idx (0002)
@@ -0,0 +1,7 @@
+-- 0005: Schritt-Zeitleiste pro Pause (database/step_timeline.py)
+--
+-- Abstände zwischen den Schritten in ms als uint16 (Little Endian), Base64-kodiert.
+-- Eine Spalte pro Pause statt einer Zeile pro Schritt: 600 Schritte ≈ 1,6 KB.
+-- Auswerten: database.step_timeline.decode() / summarize()
+
+alter table breakdata add column if not exists step_timeline text;
@@ -0,0 +1,60 @@
+-- 0006: CO2 Batches - gepackte Messreihen statt einer Zeile pro Messung
+--
+-- PiTop 1 sammelt CO2_BATCH_SIZE Messungen einer Session (database/co2_batches.py)
+-- und schreibt sie als eine Zeile mit parallelen Arrays. session_id/device_id stehen
+-- einmal pro Batch, Zeitpunkte als ms-Offsets ab started_at.
+-- co2_measurements bleibt für Altdaten bestehen (Rollups/Retention: 0001).
+
+create table if not exists co2_batches (
+    id            bigint generated always as identity primary key,
+    session_id    uuid         not null,
+    device_id     text         not null,
+    started_at    timestamptz  not null,
+    offsets_ms    integer[]    not null,
+    co2_levels    integer[]    not null,      -- SGP30: bis 60000 ppm
+    tvoc_levels   integer[],                  -- bis 60000 ppb
+    alarm_flags   boolean[]    not null,
+    created_at    timestamptz  not null default now(),
+    check (cardinality(offsets_ms) = cardinality(co2_levels)
+           and cardinality(offsets_ms) = cardinality(alarm_flags))
+);
+
+do $$
+begin
+    alter table co2_batches
+        add constraint co2_batches_session_id_fkey
+        foreign key (session_id) references sessions (session_id) not valid;
+exception when duplicate_object then null;
+end $$;
+
+-- get_session_co2_stats: eq(session_id) gt(id) order(id)
+create index if not exists co2_batches_session_id_idx on co2_batches (session_id, id);
+
+-- Auswertungen nach Zeitraum
+create index if not exists co2_batches_started_at_idx on co2_batches (started_at);
+
+-- Eine Zeile pro Messung
+create or replace view co2_samples as
+select b.id                                            as batch_id,
+       b.session_id,
+       b.device_id,
+       s.co2_level,
+       s.tvoc_level,
+       s.is_alarm,
+       b.started_at + s.offset_ms * interval '1 millisecond' as created_at
+from co2_batches b
+cross join lateral unnest(b.offsets_ms, b.co2_levels, b.tvoc_levels, b.alarm_flags)
+    with ordinality as s(offset_ms, co2_level, tvoc_level, is_alarm, n);
+
+-- Rohdaten + Batches im Format von co2_measurements
+-- alarm_type aus den Standard-Schwellen (CO2_CRITICAL_THRESHOLD 800 ppm)
+create or replace view co2_measurements_all as
+select session_id, device_id, co2_level, tvoc_level, is_alarm, alarm_type, created_at
+from co2_measurements
+union all
+select session_id, device_id, co2_level, tvoc_level, is_alarm,
+       case when not is_alarm then null
+            when co2_level >= 800 then 'critical'
+            else 'warning' end                          as alarm_type,
+       created_at
+from co2_samples;
@@ -0,0 +1,84 @@
+-- 0007: Tages-Zusammenfassungen für Wochen-/Monatsberichte (database/daily_summary.py)
+--
+-- Beim Session-Ende schreibt PiTop 1 eine Zeile in summary_session und summiert danach
+-- nur den betroffenen Tag neu (pro Nutzer und pro Gerät). Berichte lesen <= 31 Tageszeilen
+-- statt sessions, co2_* und breakdata zu scannen.
+-- Summen + Anzahl statt Mittelwerte, damit Tage exakt zu Wochen/Monaten addierbar sind.
+
+create table if not exists summary_session (
+    session_id       uuid         primary key,
+    user_name        text,
+    device_id        text,
+    day              date         not null,          -- lokales Datum des Session-Starts
+    work_seconds     integer      not null default 0,
+    pause_seconds    integer      not null default 0,
+    pause_count      integer      not null default 0,
+    step_count       integer      not null default 0,
+    calories_burned  real         not null default 0,
+    distance_meters  real         not null default 0,
+    co2_count        integer      not null default 0,
+    co2_sum          bigint       not null default 0,
+    co2_min          integer,
+    co2_max          integer,
+    tvoc_sum         bigint       not null default 0,
+    tvoc_count       integer      not null default 0,
+    alarm_count      integer      not null default 0,
+    alarm_seconds    integer      not null default 0,
+    updated_at       timestamptz  not null default now()
+);
+
+do $$
+begin
+    alter table summary_session
+        add constraint summary_session_session_id_fkey
+        foreign key (session_id) references sessions (session_id) not valid;
+exception when duplicate_object then null;
+end $$;
+
+-- Tag neu summieren: eq(user_name|device_id) eq(day)
+create index if not exists summary_session_user_day_idx on summary_session (user_name, day);
+create index if not exists summary_session_device_day_idx on summary_session (device_id, day);
+
+create table if not exists summary_user_day (
+    user_name        text         not null,
+    day              date         not null,
+    session_count    integer      not null default 0,
+    work_seconds     integer      not null default 0,
+    pause_seconds    integer      not null default 0,
+    pause_count      integer      not null default 0,
+    step_count       integer      not null default 0,
+    calories_burned  real         not null default 0,
+    distance_meters  real         not null default 0,
+    co2_count        integer      not null default 0,
+    co2_sum          bigint       not null default 0,
+    co2_min          integer,
+    co2_max          integer,
+    tvoc_sum         bigint       not null default 0,
+    tvoc_count       integer      not null default 0,
+    alarm_count      integer      not null default 0,
+    alarm_seconds    integer      not null default 0,
+    updated_at       timestamptz  not null default now(),
+    primary key (user_name, day)
+);
+
+create table if not exists summary_device_day (
+    device_id        text         not null,
+    day              date         not null,
+    session_count    integer      not null default 0,
+    work_seconds     integer      not null default 0,
+    pause_seconds    integer      not null default 0,
+    pause_count      integer      not null default 0,
+    step_count       integer      not null default 0,
+    calories_burned  real         not null default 0,
+    distance_meters  real         not null default 0,
+    co2_count        integer      not null default 0,
+    co2_sum          bigint       not null default 0,
+    co2_min          integer,
+    co2_max          integer,
+    tvoc_sum         bigint       not null default 0,
+    tvoc_count       integer      not null default 0,
+    alarm_count      integer      not null default 0,
+    alarm_seconds    integer      not null default 0,
+    updated_at       timestamptz  not null default now(),
+    primary key (device_id, day)
+);
@@ -0,0 +1,12 @@
+-- 0008: CO2 Rollups + Retention auch für co2_batches (database/co2_rollup.py)
+--
+-- Batches älter als CO2_RAW_RETENTION_DAYS werden wie co2_measurements in
+-- co2_rollup_minute / co2_rollup_session verdichtet und danach gelöscht.
+-- max_batch_id: Batches bis zu dieser id sind im Rollup enthalten
+-- (get_session_co2_stats liest danach nur noch neuere Batches).
+
+alter table co2_rollup_session add column if not exists max_batch_id bigint not null default 0;
+alter table co2_rollup_minute add column if not exists max_batch_id bigint not null default 0;
+
+-- Retention: Batches vor dem Cutoff (Insert-Zeitpunkt = letzte Messung des Batches)
+create index if not exists co2_batches_created_at_idx on co2_batches (created_at);
@@ -0,0 +1,32 @@
+-- 0009: Fremdschlüssel auf sessions ohne "on delete cascade"
+--
+-- 0002/0003/0006/0007 legten die Fremdschlüssel ursprünglich mit "on delete cascade" an -
+-- ein versehentliches delete auf sessions hätte Messwerte, Pausen, Events und
+-- Zusammenfassungen mitgelöscht. Neu angelegt mit der Standard-Aktion (no action):
+-- Sessions mit Daten lassen sich nicht mehr löschen, ohne die Daten vorher explizit zu entfernen.
+-- Auf neuen Projekten (Migrationen schon ohne cascade) ändert sich nichts.
+
+alter table co2_measurements
+    drop constraint if exists co2_measurements_session_id_fkey,
+    add constraint co2_measurements_session_id_fkey
+        foreign key (session_id) references sessions (session_id) not valid;
+
+alter table breakdata
+    drop constraint if exists breakdata_session_id_fkey,
+    add constraint breakdata_session_id_fkey
+        foreign key (session_id) references sessions (session_id) not valid;
+
+alter table session_events
+    drop constraint if exists session_events_session_id_fkey,
+    add constraint session_events_session_id_fkey
+        foreign key (session_id) references sessions (session_id) not valid;
+
+alter table co2_batches
+    drop constraint if exists co2_batches_session_id_fkey,
+    add constraint co2_batches_session_id_fkey
+        foreign key (session_id) references sessions (session_id) not valid;
+
+alter table summary_session
+    drop constraint if exists summary_session_session_id_fkey,
+    add constraint summary_session_session_id_fkey
+        foreign key (session_id) references sessions (session_id) not valid;
@@ -0,0 +1,8 @@
+-- 0010: Boot-Kennung pro Event (services/session_events.py)
+--
+-- monotonic_ms beginnt nach jedem Neustart des Geräts neu. Dauern zwischen zwei Events
+-- werden nur dann über monotonic_ms berechnet, wenn beide dieselbe boot_id haben
+-- (Linux: /proc/sys/kernel/random/boot_id) - sonst über occurred_at (Wanduhr).
+-- Ältere Events ohne boot_id zählen über die Wanduhr.
+
+alter table session_events add column if not exists boot_id text;
@@ -0,0 +1,15 @@
+-- 0011: Idempotenz-Schlüssel für Writes aus der Write-Behind-Queue (services/write_behind.py)
+--
+-- Die Queue schreibt mindestens einmal: kam die Antwort auf einen Insert nicht an
+-- (Timeout, Neustart vor dem ACK), wird er wiederholt. Das Gerät erzeugt den Schlüssel
+-- beim Einreihen, der Insert läuft als upsert(on_conflict=idempotency_key,
+-- ignore_duplicates) - eine Wiederholung legt keine zweite Zeile an.
+-- Ältere Zeilen ohne Schlüssel (NULL) sind vom Unique-Index nicht betroffen.
+
+alter table session_events add column if not exists idempotency_key uuid;
+alter table co2_batches add column if not exists idempotency_key uuid;
+alter table breakdata add column if not exists idempotency_key uuid;
+
+create unique index if not exists session_events_idempotency_key_idx on session_events (idempotency_key);
+create unique index if not exists co2_batches_idempotency_key_idx on co2_batches (idempotency_key);
+create unique index if not exists breakdata_idempotency_key_idx on breakdata (idempotency_key);
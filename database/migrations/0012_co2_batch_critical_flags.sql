@@ -0,0 +1,41 @@
+-- 0012: Alarm-Stufe pro Messung in co2_batches
+--
+-- co2_measurements_all (0006) hat alarm_type aus der Standard-Schwelle 800 ppm abgeleitet -
+-- mit einem anderen CO2_CRITICAL_THRESHOLD stimmte 'critical'/'warning' nicht. PiTop 1
+-- speichert jetzt pro Messung, ob sie kritisch war (critical_flags parallel zu alarm_flags).
+-- Ältere Batches ohne critical_flags (NULL) werden weiter über 800 ppm eingestuft.
+
+alter table co2_batches add column if not exists critical_flags boolean[];
+
+do $$
+begin
+    alter table co2_batches
+        add constraint co2_batches_critical_flags_check
+        check (critical_flags is null or cardinality(critical_flags) = cardinality(offsets_ms)) not valid;
+exception when duplicate_object then null;
+end $$;
+
+-- Neue Spalte am Ende (create or replace view erlaubt nur Anhängen)
+create or replace view co2_samples as
+select b.id                                            as batch_id,
+       b.session_id,
+       b.device_id,
+       s.co2_level,
+       s.tvoc_level,
+       s.is_alarm,
+       b.started_at + s.offset_ms * interval '1 millisecond' as created_at,
+       s.is_critical
+from co2_batches b
+cross join lateral unnest(b.offsets_ms, b.co2_levels, b.tvoc_levels, b.alarm_flags, b.critical_flags)
+    with ordinality as s(offset_ms, co2_level, tvoc_level, is_alarm, is_critical, n);
+
+create or replace view co2_measurements_all as
+select session_id, device_id, co2_level, tvoc_level, is_alarm, alarm_type, created_at
+from co2_measurements
+union all
+select session_id, device_id, co2_level, tvoc_level, is_alarm,
+       case when not is_alarm then null
+            when coalesce(is_critical, co2_level >= 800) then 'critical'
+            else 'warning' end                          as alarm_type,
+       created_at
+from co2_samples;
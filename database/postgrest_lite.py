@@ -0,0 +1,296 @@
+"""
+PostgREST Lite - schlanker Datenclient statt des kompletten supabase SDK
+Das SDK lädt Auth, Storage, Realtime und postgrest auf httpx - auf dem Pi kostet das
+Startzeit und RAM, obwohl wir nur Tabellen lesen und schreiben. Dieser Client spricht
+PostgREST direkt über eine gepoolte requests.Session und bietet die Builder-API, die
+SupabaseManager & Co. nutzen:
+
+    client.table('sessions').select('id').eq('session_id', sid).limit(1).execute().data
+    client.table('session_events').insert(row, returning='minimal').execute()
+    for row in client.table('co2_measurements').select('*').order('id').stream(): ...
+
+URL und Header pro (Tabelle, Operation, Prefer) werden einmal vorbereitet und
+wiederverwendet; stream() dekodiert große JSON-Arrays Zeile für Zeile.
+"""
+
+import codecs
+import json
+
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_SIZE = 4                 # Parallele Verbindungen (Write-Behind + Main-Loop + Timer)
+TIMEOUT = (3.05, 15)          # (Connect, Read) in Sekunden
+STREAM_CHUNK = 16 * 1024
+
+SINGLE_OBJECT = 'application/vnd.pgrst.object+json'
+PLAN = 'application/vnd.pgrst.plan'
+CSV = 'text/csv'
+
+OPERATIONS = {'select': 'GET', 'insert': 'POST', 'upsert': 'POST', 'update': 'PATCH', 'delete': 'DELETE'}
+
+
+class APIError(Exception):
+    """Fehlerantwort von PostgREST (gleiche Felder wie postgrest.exceptions.APIError)"""
+
+    def __init__(self, error, status=None):
+        if not isinstance(error, dict):
+            error = {'message': str(error)}
+        self.code = error.get('code')
+        self.message = error.get('message')
+        self.details = error.get('details')
+        self.hint = error.get('hint')
+        self.status = status
+        super().__init__(self.message)
+
+
+class APIResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+    def __repr__(self):
+        return f"APIResponse(data={self.data!r}, count={self.count!r})"
+
+
+class PostgrestLite:
+    def __init__(self, url, key, pool_size=POOL_SIZE, timeout=TIMEOUT):
+        self.base_url = url.rstrip('/') + '/rest/v1/'
+        self.timeout = timeout
+        self.templates = {}   # (table, operation, prefer, accept) → (method, url, headers)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'apikey': key,
+            'Authorization': f'Bearer {key}',
+            'Accept': 'application/json',
+            'Content-Type': 'application/json',
+        })
+
+    def table(self, name):
+        return QueryBuilder(self, name)
+
+    from_ = table
+
+    def template(self, table, operation, prefer=None, accept=None):
+        """Vorbereitete Anfrage (Methode, URL, Header) - einmal pro Tabelle, Operation und Prefer"""
+        key = (table, operation, prefer, accept)
+        template = self.templates.get(key)
+        if template is None:
+            headers = dict(self.session.headers)
+            if prefer:
+                headers['Prefer'] = prefer
+            if accept:
+                headers['Accept'] = accept
+            template = self.templates[key] = (OPERATIONS[operation], self.base_url + table, headers)
+        return template
+
+    def close(self):
+        self.session.close()
+
+
+class QueryBuilder:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.operation = 'select'
+        self.params = []
+        self.prefer = []
+        self.accept = None
+        self.body = None
+        self.explained = False
+
+    # ===== OPERATIONEN =====
+
+    def select(self, columns='*', count=None):
+        self.operation = 'select'
+        self.params.append(('select', ','.join(c.strip() for c in columns.split(','))))
+        if count:
+            self.prefer.append(f'count={count}')
+        return self
+
+    def insert(self, json, returning='representation', count=None):
+        self.operation = 'insert'
+        return self._write(json, returning, count)
+
+    def upsert(self, json, on_conflict='', ignore_duplicates=False, returning='representation'):
+        self.operation = 'upsert'
+        if on_conflict:
+            self.params.append(('on_conflict', on_conflict))
+        self.prefer.append('resolution=ignore-duplicates' if ignore_duplicates
+                           else 'resolution=merge-duplicates')
+        return self._write(json, returning)
+
+    def update(self, json, returning='representation', count=None):
+        self.operation = 'update'
+        return self._write(json, returning, count)
+
+    def delete(self, returning='representation', count=None):
+        self.operation = 'delete'
+        return self._write(None, returning, count)
+
+    def _write(self, body, returning, count=None):
+        self.body = body
+        self.prefer.append(f'return={returning}')
+        if count:
+            self.prefer.append(f'count={count}')
+        return self
+
+    # ===== FILTER =====
+
+    def filter(self, column, operator, value):
+        self.params.append((column, f'{operator}.{value}'))
+        return self
+
+    def eq(self, column, value):
+        return self.filter(column, 'eq', value)
+
+    def neq(self, column, value):
+        return self.filter(column, 'neq', value)
+
+    def gt(self, column, value):
+        return self.filter(column, 'gt', value)
+
+    def gte(self, column, value):
+        return self.filter(column, 'gte', value)
+
+    def lt(self, column, value):
+        return self.filter(column, 'lt', value)
+
+    def lte(self, column, value):
+        return self.filter(column, 'lte', value)
+
+    def is_(self, column, value):
+        return self.filter(column, 'is', 'null' if value is None else value)
+
+    def in_(self, column, values):
+        return self.filter(column, 'in', f"({','.join(_quote(v) for v in values)})")
+
+    # ===== MODIFIER =====
+
+    def order(self, column, desc=False, nullsfirst=None):
+        value = f"{column}.{'desc' if desc else 'asc'}"
+        if nullsfirst is not None:
+            value += '.nullsfirst' if nullsfirst else '.nullslast'
+        for i, (key, existing) in enumerate(self.params):
+            if key == 'order':
+                self.params[i] = ('order', f'{existing},{value}')
+                return self
+        self.params.append(('order', value))
+        return self
+
+    def limit(self, size):
+        self.params.append(('limit', str(size)))
+        return self
+
+    def offset(self, size):
+        self.params.append(('offset', str(size)))
+        return self
+
+    def single(self):
+        """Genau eine Zeile → data ist ein dict (sonst APIError PGRST116)"""
+        self.accept = SINGLE_OBJECT
+        return self
+
+    def csv(self):
+        """Ergebnis als CSV - data ist der Text (wie postgrest-py), spaltenweise einlesbar"""
+        self.accept = CSV
+        return self
+
+    def explain(self, analyze=False, verbose=False, format='text'):
+        """Ausführungsplan statt Daten - execute() gibt den Plan als Text zurück"""
+        options = '|'.join(name for name, on in (('analyze', analyze), ('verbose', verbose)) if on)
+        self.accept = f'{PLAN}+{format}; for="application/json"' + (f'; options={options}' if options else '')
+        self.explained = True
+        return self
+
+    # ===== AUSFÜHREN =====
+
+    def _send(self, stream=False):
+        method, url, headers = self.client.template(
+            self.table, self.operation, ','.join(self.prefer) or None, self.accept)
+        data = json.dumps(self.body, separators=(',', ':'), default=str) if self.body is not None else None
+
+        response = self.client.session.request(
+            method, url, params=self.params, data=data, headers=headers,
+            timeout=self.client.timeout, stream=stream
+        )
+        if response.status_code >= 400:
+            try:
+                error = response.json()
+            except ValueError:
+                error = {'message': response.text or response.reason}
+            response.close()
+            raise APIError(error, response.status_code)
+        return response
+
+    def execute(self):
+        response = self._send()
+        if self.explained:
+            return response.text
+        if self.accept == CSV:
+            return APIResponse(response.text, _count(response.headers.get('Content-Range')))
+        data = response.json() if response.content else []
+        return APIResponse(data, _count(response.headers.get('Content-Range')))
+
+    def stream(self):
+        """Zeilen einzeln beim Eintreffen dekodieren (konstanter Speicher, erste Zeile sofort)"""
+        response = self._send(stream=True)
+        try:
+            yield from _iter_json_array(response.iter_content(STREAM_CHUNK))
+        finally:
+            response.close()
+
+
+def _quote(value):
+    """Werte in in.(...) mit reservierten Zeichen quoten"""
+    text = str(value)
+    if any(c in text for c in ',()"'):
+        return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    return text
+
+
+def _count(content_range):
+    """'0-24/3573' → 3573 (None ohne Prefer: count oder bei '*')"""
+    if not content_range or '/' not in content_range:
+        return None
+    total = content_range.rsplit('/', 1)[1]
+    return int(total) if total.isdigit() else None
+
+
+def _iter_json_array(chunks):
+    """Inkrementelles Dekodieren eines JSON-Arrays aus Byte-Chunks → Elemente"""
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    started = False
+
+    for chunk in chunks:
+        buffer += utf8.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != '[':
+                    raise APIError({'message': 'JSON-Array erwartet'})
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                return
+            try:
+                item, pos_end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break   # Element unvollständig → nächsten Chunk abwarten
+            yield item
+            pos = pos_end
+        buffer = buffer[pos:]
+
+    if started or buffer.strip():
+        raise APIError({'message': 'JSON-Antwort unvollständig'})
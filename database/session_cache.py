@@ -0,0 +1,73 @@
+"""
+Session Cache - TTL-Cache im Prozess für Session-Lookups
+Schlüssel: (Art, session_id) - z.B. ('session', id) für die Zeile, ('state', id) für die
+Projektion aus session_events, ('active', None) für get_active_session().
+Lokale Writes schreiben durch (update), Änderungen von außen (Peer Link, Event-Tail)
+invalidieren. Wiederholte Reads derselben Session kosten so keinen Round-Trip.
+"""
+
+import time
+from threading import Lock
+
+MISSING = object()   # Unterscheidet "nicht im Cache" von gecachtem None
+
+
+class SessionCache:
+    def __init__(self, ttl=30.0):
+        self.ttl = ttl
+        self.entries = {}   # (kind, session_id) → (expires_at, value)
+        self.lock = Lock()
+
+        # Statistik
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, kind, session_id=None):
+        """Wert oder MISSING (abgelaufen/unbekannt)"""
+        with self.lock:
+            entry = self.entries.get((kind, session_id))
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return MISSING
+
+    def peek(self, kind, session_id=None):
+        """Wert auch nach Ablauf der TTL (für Delta-Abfragen) - zählt nicht in die Statistik"""
+        with self.lock:
+            entry = self.entries.get((kind, session_id))
+            return entry[1] if entry else MISSING
+
+    def put(self, kind, session_id, value):
+        if self.ttl <= 0:
+            return value
+        with self.lock:
+            self.entries[(kind, session_id)] = (time.monotonic() + self.ttl, value)
+        return value
+
+    def update(self, kind, session_id, changes):
+        """Write-Through: Änderungen in eine gecachte Zeile übernehmen (falls vorhanden)"""
+        with self.lock:
+            entry = self.entries.get((kind, session_id))
+            if entry and isinstance(entry[1], dict):
+                entry[1].update(changes)
+
+    def invalidate(self, session_id=None, kind=None):
+        """Einträge einer Session verwerfen (ohne session_id: alle einer Art / alles)"""
+        with self.lock:
+            keys = [key for key in self.entries
+                    if (session_id is None or key[1] == session_id) and (kind is None or key[0] == kind)]
+            for key in keys:
+                del self.entries[key]
+            self.invalidations += len(keys)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            'invalidations': self.invalidations,
+            'entries': len(self.entries),
+        }
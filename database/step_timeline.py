@@ -0,0 +1,94 @@
+"""
+Schritt-Zeitleiste einer Pause als gepackte Spalte (breakdata.step_timeline)
+Statt einer Zeile pro Schritt: Abstände zwischen den Schritten in Millisekunden als
+uint16 (Little Endian), Base64 in einer Textspalte. 600 Schritte ≈ 1,6 KB, ein Insert.
+
+    Delta 0..65534   Schritt nach so vielen ms (der erste relativ zum Pausenstart)
+    Delta 65535      65,535 s ohne Schritt (Lücke > 65 s wird so aufgeteilt)
+
+Decoder + Kennzahlen (Kadenz, aktive Minuten, Tempo) für Auswertungen.
+"""
+
+import base64
+import sys
+from array import array
+
+GAP = 0xFFFF                 # Escape: Lücke ohne Schritt
+ACTIVE_MINUTE_STEPS = 60     # Minute mit >= 60 Schritten zählt als "aktiv"
+
+
+class StepTimeline:
+    def __init__(self, started_at=0.0):
+        self.started_at = started_at    # Pausenstart (Sekunden, gleiche Uhr wie add())
+        self.deltas = array('H')
+        self.last_ms = 0                # Offset des letzten Schritts in ms
+        self.count = 0
+
+    def add(self, timestamp):
+        """Schritt zum Zeitpunkt timestamp (Sekunden) anhängen"""
+        offset = max(self.last_ms, int(round((timestamp - self.started_at) * 1000)))
+        delta = offset - self.last_ms
+        while delta >= GAP:
+            self.deltas.append(GAP)
+            delta -= GAP
+        self.deltas.append(delta)
+        self.last_ms = offset
+        self.count += 1
+
+    def encode(self):
+        """→ Base64-String für breakdata.step_timeline (None ohne Schritte)"""
+        if not self.count:
+            return None
+        data = self.deltas
+        if sys.byteorder != 'little':
+            data = array('H', data)
+            data.byteswap()
+        return base64.b64encode(data.tobytes()).decode('ascii')
+
+    def __len__(self):
+        return self.count
+
+
+def decode(encoded):
+    """Base64-Spalte → Schritt-Offsets in Sekunden ab Pausenstart"""
+    if not encoded:
+        return []
+    deltas = array('H')
+    deltas.frombytes(base64.b64decode(encoded))
+    if sys.byteorder != 'little':
+        deltas.byteswap()
+
+    offsets = []
+    offset_ms = 0
+    for delta in deltas:
+        offset_ms += delta
+        if delta != GAP:
+            offsets.append(offset_ms / 1000)
+    return offsets
+
+
+def steps_per_minute(offsets):
+    """Schritte pro Pausenminute → [Anzahl Minute 0, Minute 1, ...]"""
+    if not offsets:
+        return []
+    minutes = [0] * (int(offsets[-1] // 60) + 1)
+    for offset in offsets:
+        minutes[int(offset // 60)] += 1
+    return minutes
+
+
+def summarize(encoded):
+    """Kennzahlen einer Pause aus der gepackten Zeitleiste"""
+    offsets = decode(encoded)
+    minutes = steps_per_minute(offsets)
+    intervals = sorted(b - a for a, b in zip(offsets, offsets[1:]))
+    median = intervals[len(intervals) // 2] if intervals else None
+    return {
+        'steps': len(offsets),
+        'first_step_s': round(offsets[0], 1) if offsets else None,
+        'last_step_s': round(offsets[-1], 1) if offsets else None,
+        'active_minutes': sum(1 for m in minutes if m >= ACTIVE_MINUTE_STEPS),
+        'peak_cadence': max(minutes) if minutes else 0,             # Schritte/min
+        'median_cadence': round(60 / median) if median else None,   # aus dem typischen Schrittabstand
+        'steps_per_minute': minutes,
+    }
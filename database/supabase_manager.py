@@ -4,13 +4,69 @@ Supabase Database Manager
 Verwaltet Verbindung und Operationen für beide PiTops
 """
 
-from supabase import create_client, Client
 from datetime import datetime
 import config
+import copy
 import uuid
+from database.co2_stats import Co2Stats
+from database.co2_batches import iter_co2_samples
+from database.daily_summary import DailySummary
+from database.session_cache import SessionCache, MISSING
+from services.write_behind import Rejected, Retry
+
+# Zeilen pro Seite bei iter_rows - nicht größer als PostgREST max-rows (Supabase Standard: 1000)
+PAGE_SIZE = 1000
+
+# Tabelle/View existiert nicht (Migration fehlt): Postgres 42P01, PostgREST Schema-Cache PGRST205
+MISSING_RELATION_CODES = ('42P01', 'PGRST205')
+
+# Dauerhafte Fehler: Postgres-Klassen 22 (Daten), 23 (Constraint), 42 (Schema/Rechte), PostgREST Anfrage/Schema
+PERMANENT_ERROR_CLASSES = ('22', '23', '42')
+PERMANENT_POSTGREST_CODES = ('PGRST1', 'PGRST2')
+# Vorübergehend trotz 4xx: Timeout, Rate-Limit, Auth (Key erneuern), Fremdschlüssel (Session
+# des anderen Geräts noch nicht hochgeladen)
+TRANSIENT_STATUS = (401, 403, 408, 429)
+TRANSIENT_CODES = ('23503',)
+
+
+def missing_relation(error):
+    """True wenn der Fehler eine fehlende Tabelle meldet - nur dann Features dauerhaft abschalten,
+    Netzwerk-/Serverfehler sind vorübergehend"""
+    return getattr(error, 'code', None) in MISSING_RELATION_CODES or getattr(error, 'status', None) == 404
+
+
+def permanent_error(error):
+    """True wenn eine Wiederholung nie gelingen wird (4xx, ungültige Daten) - False bei Netzwerk/5xx"""
+    code = str(getattr(error, 'code', None) or '')
+    if code in TRANSIENT_CODES:
+        return False
+    status = getattr(error, 'status', None)
+    if isinstance(status, int):
+        return 400 <= status < 500 and status not in TRANSIENT_STATUS
+    return code[:2] in PERMANENT_ERROR_CLASSES or code.startswith(PERMANENT_POSTGREST_CODES)
+
+
+def write_error(error):
+    """Ergebnis eines fehlgeschlagenen Writes für WriteBehind: Rejected (dauerhaft), Retry (Server
+    lehnt ab, z.B. 5xx/Fremdschlüssel - begrenzt wiederholen) oder False (Netzwerk, Auth, Rate-Limit -
+    unbegrenzt wiederholen, ein Ausfall darf keine Writes verwerfen)"""
+    if permanent_error(error):
+        return Rejected(error)
+    status = getattr(error, 'status', None)
+    if status in TRANSIENT_STATUS:
+        return False
+    if isinstance(status, int) or getattr(error, 'code', None):
+        return Retry(error)
+    return False
+
 
 class SupabaseManager:
     def __init__(self):
+        self.rollups_available = True  # False wenn co2_rollup_session (Migration 0001) fehlt
+        self.batches_available = True  # False wenn co2_batches (Migration 0006) fehlt
+        self.summaries_available = True  # False wenn summary_session (Migration 0007) fehlt
+        self.summary = DailySummary(self)
+        self.cache = SessionCache(config.SESSION_CACHE_TTL)
         if not config.SUPABASE_URL or not config.SUPABASE_KEY:
             print("❌ FEHLER: Supabase Credentials fehlen in .env!")
             print("💡 Bitte SUPABASE_URL und SUPABASE_KEY setzen")
@@ -18,17 +74,22 @@ class SupabaseManager:
             return
         
         try:
-            self.client: Client = create_client(
-                config.SUPABASE_URL,
-                config.SUPABASE_KEY
-            )
-            print(f"✅ Supabase verbunden ({config.DEVICE_ID})")
+            self.client = self._create_client()
+            print(f"✅ Supabase verbunden ({config.DEVICE_ID}, Client: {config.DB_CLIENT})")
             self._test_connection()
             
         except Exception as e:
             print(f"❌ Supabase Verbindungsfehler: {e}")
             self.client = None
     
+    def _create_client(self):
+        """PostgREST Lite (Standard) oder komplettes supabase SDK (DB_CLIENT=supabase)"""
+        if config.DB_CLIENT == 'supabase':
+            from supabase import create_client   # lädt Auth/Storage/Realtime mit - nur auf Wunsch
+            return create_client(config.SUPABASE_URL, config.SUPABASE_KEY)
+        from database.postgrest_lite import PostgrestLite
+        return PostgrestLite(config.SUPABASE_URL, config.SUPABASE_KEY)
+    
     def _test_connection(self):
         """Testet Datenbankverbindung"""
         try:
@@ -41,33 +102,38 @@ class SupabaseManager:
     
     def create_session(self):
         """Erstellt neue Session (nur PiTop 1)"""
+        session = self.new_session()
+        return session['session_id'] if self.insert_session(session) else None
+    
+    def new_session(self):
+        """Session-Zeile mit lokal erzeugter ID (Insert kann später nachgeholt werden)"""
+        return {
+            "session_id": str(uuid.uuid4()),
+            "start_time": datetime.utcnow().isoformat(),
+            "timer_status": "idle",
+            "user_name": config.USER_NAME,
+            "user_weight": config.USER_WEIGHT,
+            "user_height": config.USER_HEIGHT,
+            "device_id": config.DEVICE_ID
+        }
+    
+    def insert_session(self, session):
+        """Schreibt eine Session-Zeile - idempotent (Wiederholung nach Timeout ist harmlos)
+        → True, False/Retry (erneut versuchen) oder Rejected (dauerhaft abgelehnt)"""
         if not self.client:
-            return None
+            return False
         
         try:
-            session_id = str(uuid.uuid4())
-            
-            data = {
-                "session_id": session_id,
-                "start_time": datetime.utcnow().isoformat(),
-                "timer_status": "idle",
-                "user_name": config.USER_NAME,
-                "user_weight": config.USER_WEIGHT,
-                "user_height": config.USER_HEIGHT,
-                "device_id": config.DEVICE_ID
-            }
-            
-            response = self.client.table('sessions').insert(data).execute()
-            
-            if response.data:
-                print(f"✅ Session erstellt: {session_id[:8]}...")
-                return session_id
-            
-            return None
+            self.client.table('sessions')\
+                .upsert(session, on_conflict='session_id', ignore_duplicates=True, returning='minimal')\
+                .execute()
+            print(f"✅ Session erstellt: {session['session_id'][:8]}...")
+            self.cache.put('active', None, dict(session))   # neueste offene Session
+            return True
             
         except Exception as e:
             print(f"❌ Session-Fehler: {e}")
-            return None
+            return write_error(e)
     
     def update_timer_status(self, session_id, status):
         """Aktualisiert Timer-Status (working, work_ended, break, break_ended)"""
@@ -79,6 +145,7 @@ class SupabaseManager:
                 .update({"timer_status": status})\
                 .eq('session_id', session_id)\
                 .execute()
+            self._write_through(session_id, {"timer_status": status})
             
             print(f"📊 Timer Status: {status}")
             return True
@@ -108,6 +175,7 @@ class SupabaseManager:
                 .update({"pause_count": new_count})\
                 .eq('session_id', session_id)\
                 .execute()
+            self._write_through(session_id, {"pause_count": new_count})
             
             print(f"�� Pause Count: {new_count}")
             return new_count
@@ -116,36 +184,257 @@ class SupabaseManager:
             print(f"❌ Pause-Count Fehler: {e}")
             return False
     
-    def end_session(self, session_id, total_work_time, total_pause_time):
-        """Beendet Session"""
+    def end_session(self, session_id, total_work_time, total_pause_time, pause_count=None):
+        """Beendet Session (schreibt die Endsumme einmalig in sessions)"""
         if not self.client or not session_id:
             return False
 
         try:
+            data = {
+                "end_time": datetime.utcnow().isoformat(),
+                "total_work_time": total_work_time,
+                "total_pause_time": total_pause_time,
+                "timer_status": "ended"
+            }
+            if pause_count is not None:
+                data["pause_count"] = pause_count
+            
             response = self.client.table('sessions')\
-                .update({
-                    "end_time": datetime.utcnow().isoformat(),
-                    "total_work_time": total_work_time,
-                    "total_pause_time": total_pause_time,
-                    "timer_status": "ended"
-                })\
+                .update(data)\
                 .eq('session_id', session_id)\
                 .execute()
 
             # Debug: Zeige was geschrieben wurde
             if response.data and len(response.data) > 0:
+                self._write_through(session_id, data, ended=True)
                 updated = response.data[0]
                 print(f"✅ Session beendet: {session_id[:8]}...")
                 print(f"   Arbeitszeit: {updated.get('total_work_time', 'N/A')}s")
                 print(f"   Pausenzeit: {updated.get('total_pause_time', 'N/A')}s")
+                self._update_summaries(session_id)
                 return True
             else:
+                # Keine Zeile mit dieser session_id - Wiederholen ändert daran nichts
                 print(f"⚠️  Session-Update: Keine Daten zurückgegeben")
-                return False
+                return Rejected(f"Session {session_id} nicht gefunden")
 
         except Exception as e:
             print(f"❌ Session-End Fehler: {e}")
+            return write_error(e)
+    
+    def checkpoint_session(self, session_id, total_work_time, total_pause_time, pause_count):
+        """Heartbeat: Zwischensummen + last_seen_at (Session bleibt offen)"""
+        if not self.client or not session_id:
+            return False
+        
+        try:
+            data = {
+                "total_work_time": total_work_time,
+                "total_pause_time": total_pause_time,
+                "pause_count": pause_count,
+                "last_seen_at": datetime.utcnow().isoformat()
+            }
+            self.client.table('sessions')\
+                .update(data, returning='minimal')\
+                .eq('session_id', session_id)\
+                .is_('end_time', 'null')\
+                .execute()
+            self._write_through(session_id, data)
+            return True
+            
+        except Exception as e:
+            print(f"❌ Checkpoint Fehler: {e}")
+            return False
+    
+    def get_open_sessions(self, device_id):
+        """Sessions eines Geräts ohne end_time (laufend oder verwaist)"""
+        if not self.client:
+            return []
+        
+        try:
+            response = self.client.table('sessions')\
+                .select('session_id, start_time, last_seen_at, pause_count, total_work_time, total_pause_time')\
+                .is_('end_time', 'null')\
+                .eq('device_id', device_id)\
+                .order('start_time', desc=True)\
+                .execute()
+            return response.data or []
+            
+        except Exception as e:
+            print(f"❌ Query-Fehler: {e}")
+            return []
+    
+    def close_session(self, session_id, end_time, total_work_time, total_pause_time, pause_count):
+        """Schließt eine verwaiste Session nachträglich (end_time = letztes Lebenszeichen)"""
+        if not self.client or not session_id:
+            return False
+        
+        try:
+            data = {
+                "end_time": end_time,
+                "total_work_time": total_work_time,
+                "total_pause_time": total_pause_time,
+                "pause_count": pause_count,
+                "timer_status": "ended"
+            }
+            response = self.client.table('sessions')\
+                .update(data)\
+                .eq('session_id', session_id)\
+                .is_('end_time', 'null')\
+                .execute()
+            self._write_through(session_id, data, ended=True)
+            if response.data:
+                self._update_summaries(session_id)
+            return bool(response.data)
+            
+        except Exception as e:
+            print(f"❌ Session-Close Fehler: {e}")
+            return False
+    
+    def _update_summaries(self, session_id, if_ended=False):
+        """Tages-Zusammenfassungen fortschreiben - Fehler brechen das Session-Ende nicht ab
+        if_ended: Nachtrag nach dem Session-Ende (z.B. breakdata von PiTop 2)"""
+        if not self.summaries_available:
+            return
+        try:
+            if if_ended:
+                row = self.summary.record_session_if_ended(session_id)
+            else:
+                row = self.summary.record_session(session_id)
+            if row:
+                print(f"📅 Tages-Zusammenfassung {row['day']} aktualisiert")
+        except Exception as e:
+            if not missing_relation(e):
+                print(f"⚠️  Tages-Zusammenfassung fehlgeschlagen ({e}) - Nachtrag: python -m database.daily_summary rebuild")
+                return
+            print(f"⚠️  Tages-Zusammenfassungen nicht verfügbar ({e}) - Nachtrag: python -m database.daily_summary rebuild")
+            self.summaries_available = False
+    
+    def get_period_report(self, period='week', user_name=None, device_id=None, day=None):
+        """Wochen-/Monatsbericht (period='week'|'month') aus den Tages-Zusammenfassungen"""
+        if not self.client:
+            return None
+        
+        try:
+            return self.summary.report(period, user_name=user_name or config.USER_NAME,
+                                       device_id=device_id, day=day)
+        except Exception as e:
+            print(f"❌ Zeitraum-Report Fehler: {e}")
+            return None
+    
+    def get_session(self, session_id):
+        """Session-Zeile (aus dem Cache, solange die TTL läuft)"""
+        row = self.cache.get('session', session_id)
+        if row is not MISSING:
+            return dict(row) if row else None
+        if not self.client or not session_id:
+            return None
+        
+        response = self.client.table('sessions')\
+            .select('*')\
+            .eq('session_id', session_id)\
+            .limit(1)\
+            .execute()
+        row = response.data[0] if response.data else None
+        if row:
+            self.cache.put('session', session_id, row)
+        return dict(row) if row else None
+    
+    def invalidate_session(self, session_id=None):
+        """Änderung von außen (Peer Link, Event-Tail) → gecachte Daten der Session verwerfen"""
+        self.cache.invalidate(session_id)
+        self.cache.invalidate(kind='active')
+    
+    def _write_through(self, session_id, changes, ended=False):
+        """Lokale Updates in den Cache übernehmen statt ihn zu verwerfen"""
+        self.cache.update('session', session_id, changes)
+        active = self.cache.peek('active')
+        if active is not MISSING and active and active.get('session_id') == session_id:
+            if ended:
+                self.cache.put('active', None, None)
+            else:
+                self.cache.update('active', None, changes)
+    
+    # ===== SESSION EVENTS =====
+    
+    def log_session_event(self, session_id, event_type, payload=None):
+        """Hängt ein Event an session_events an (nur INSERT, kein Update) → Event-Dict"""
+        event = self.new_session_event(session_id, event_type, payload)
+        if self.client and session_id:
+            self.insert_session_event(event)
+        return event
+    
+    def new_session_event(self, session_id, event_type, payload=None):
+        """Event-Dict mit Zeitstempeln des Geräts (noch nicht geschrieben)"""
+        from services.session_events import monotonic_ms, boot_id
+        
+        return {
+            "session_id": session_id,
+            "event_type": event_type,
+            "device_id": config.DEVICE_ID,
+            "occurred_at": datetime.utcnow().isoformat() + '+00:00',
+            "monotonic_ms": monotonic_ms(),
+            "boot_id": boot_id(),
+            "payload": payload,
+            "idempotency_key": str(uuid.uuid4())
+        }
+    
+    def insert_session_event(self, event):
+        """Schreibt ein Event → True/False (False = später erneut versuchen)
+        Idempotent über idempotency_key: eine Wiederholung nach Timeout legt kein zweites Event an"""
+        if not self.client:
             return False
+        
+        try:
+            self._insert_once('session_events', event)
+            print(f"📊 Event: {event['event_type']}")
+            
+            # Write-Through in die gecachte Projektion (ohne id - die DB-Kopie wird dedupliziert)
+            state = self.cache.peek('state', event['session_id'])
+            if state is not MISSING:
+                with self.cache.lock:
+                    state.apply(event)
+            return True
+        except Exception as e:
+            print(f"❌ Event-Fehler ({event['event_type']}): {e}")
+            return write_error(e)
+    
+    def get_latest_session_event_id(self, event_type=None):
+        """id des neuesten Events (optional eines Typs) - 0 wenn keins"""
+        if not self.client:
+            return 0
+        
+        try:
+            query = self.client.table('session_events').select('id')
+            if event_type:
+                query = query.eq('event_type', event_type)
+            response = query.order('id', desc=True).limit(1).execute()
+            return response.data[0]['id'] if response.data else 0
+        except Exception as e:
+            print(f"❌ Event-Query Fehler: {e}")
+            return 0
+    
+    def get_session_state(self, session_id):
+        """
+        Projektion einer Session aus ihren Events (Status, Pausen, Zeiten)
+        Gecacht: innerhalb der TTL kein Round-Trip, danach nur Events seit last_event_id
+        """
+        from services.session_events import SessionState
+        
+        state = self.cache.get('state', session_id)
+        if state is MISSING:
+            state = self.cache.peek('state', session_id)
+            if state is MISSING:
+                state = SessionState(session_id)
+            events = list(self.iter_rows('session_events', '*', after_id=state.last_event_id,
+                                         where=lambda q: q.eq('session_id', session_id)))
+            with self.cache.lock:
+                for event in events:
+                    state.apply(event)
+            self.cache.put('state', session_id, state)
+        # Kopie - Aufrufer schreiben die Projektion lokal fort
+        with self.cache.lock:
+            return copy.deepcopy(state)
     
     # ===== LOGGING =====
     
@@ -171,8 +460,24 @@ class SupabaseManager:
             print(f"❌ CO2 Log Fehler: {e}")
             return False
     
-    def log_steps(self, session_id, pause_number, step_count, calories, distance):
-        """Loggt Schritte (PiTop 2)"""
+    def insert_co2_batch(self, batch):
+        """Schreibt einen gepackten CO2-Batch (database/co2_batches.py) → False = erneut versuchen"""
+        if not self.client:
+            return False
+        
+        try:
+            self._insert_once('co2_batches', batch)
+            print(f"💨 CO2-Batch gespeichert: {len(batch['co2_levels'])} Messungen")
+            return True
+            
+        except Exception as e:
+            print(f"❌ CO2 Batch Fehler: {e}")
+            return write_error(e)
+    
+    def log_steps(self, session_id, pause_number, step_count, calories, distance, step_timeline=None,
+                  idempotency_key=None):
+        """Loggt Schritte (PiTop 2) - step_timeline: gepackte Zeitleiste (database/step_timeline.py)
+        idempotency_key: beim Einreihen erzeugt, damit eine Wiederholung keine zweite Zeile anlegt"""
         if not self.client:
             return False
         
@@ -185,14 +490,88 @@ class SupabaseManager:
                 "distance_meters": distance,
                 "device_id": config.DEVICE_ID
             }
+            if step_timeline:
+                data["step_timeline"] = step_timeline
             
-            self.client.table('breakdata').insert(data).execute()
+            if idempotency_key:
+                data["idempotency_key"] = idempotency_key
+                self._insert_once('breakdata', data)
+            else:
+                self.client.table('breakdata').insert(data).execute()
             print(f"💾 Schritte gespeichert: {step_count:,} (Pause {pause_number})")
+            self._update_summaries(session_id, if_ended=True)   # Session schon beendet → Tag nachziehen
             return True
             
         except Exception as e:
             print(f"❌ Steps Log Fehler: {e}")
-            return False
+            return write_error(e)
+    
+    def _insert_once(self, table, row):
+        """INSERT ... ON CONFLICT (idempotency_key) DO NOTHING (Migration 0011)"""
+        if not row.get('idempotency_key'):
+            self.client.table(table).insert(row, returning='minimal').execute()
+            return
+        self.client.table(table)\
+            .upsert(row, on_conflict='idempotency_key', ignore_duplicates=True, returning='minimal')\
+            .execute()
+    
+    def insert_many(self, table, rows, batch_size=500):
+        """Bulk-Insert als mehrzeilige Inserts (eine Anfrage pro Batch) → Anzahl Zeilen
+        Ein fehlgeschlagener Batch bricht ab (Exception) - Aufrufer sollen nicht mit
+        einem halben Bestand weiterladen"""
+        if not self.client:
+            return 0
+        
+        inserted = 0
+        batch = []
+        try:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    self.client.table(table).insert(batch, returning='minimal').execute()
+                    inserted += len(batch)
+                    batch = []
+            
+            if batch:
+                self.client.table(table).insert(batch, returning='minimal').execute()
+                inserted += len(batch)
+            
+            return inserted
+            
+        except Exception as e:
+            print(f"❌ Bulk-Insert Fehler ({table}, nach {inserted} Zeilen): {e}")
+            raise
+    
+    def iter_rows(self, table, columns='*', where=None, after_id=0, page_size=PAGE_SIZE):
+        """
+        Liest beliebig große Ergebnismengen seitenweise (Keyset-Pagination über id)
+        where: Funktion, die Filter an die Query hängt, z.B. lambda q: q.eq('session_id', sid)
+        Generator → Aggregationen laufen mit konstantem Speicher, kein Abschneiden bei max-rows
+        """
+        if not self.client:
+            return
+        
+        if columns != '*' and 'id' not in [c.strip() for c in columns.split(',')]:
+            columns = f'id, {columns}'
+        
+        last_id = after_id
+        while True:
+            query = self.client.table(table).select(columns)
+            if where:
+                query = where(query)
+            query = query.gt('id', last_id).order('id').limit(page_size)
+            
+            # PostgREST Lite dekodiert die Seite Zeile für Zeile beim Eintreffen
+            rows = query.stream() if hasattr(query, 'stream') else (query.execute().data or [])
+            count = 0
+            for row in rows:
+                count += 1
+                last_id = row['id']
+                yield row
+            
+            # Kürzere Seite = Ende (page_size <= max-rows, sonst wäre jede Seite "kurz")
+            if count < page_size:
+                return
     
     # ===== QUERIES (für PiTop 2) =====
     
@@ -201,6 +580,10 @@ class SupabaseManager:
         if not self.client:
             return None
         
+        cached = self.cache.get('active')
+        if cached is not MISSING:
+            return dict(cached) if cached else None
+        
         try:
             response = self.client.table('sessions')\
                 .select('session_id, pause_count, timer_status, user_weight, user_height')\
@@ -210,10 +593,11 @@ class SupabaseManager:
                 .execute()
             
             if response.data and len(response.data) > 0:
-                session = response.data[0]
+                session = self.cache.put('active', None, response.data[0])
                 print(f"📊 Aktive Session: {session['session_id'][:8]}...")
-                return session
+                return dict(session)
             
+            self.cache.put('active', None, None)
             print("ℹ️  Keine aktive Session gefunden")
             return None
             
@@ -222,27 +606,88 @@ class SupabaseManager:
             return None
     
     def get_timer_status(self, session_id):
-        """Holt aktuellen Timer-Status"""
+        """Holt aktuellen Timer-Status (abgeleitet aus session_events)"""
         if not self.client or not session_id:
             return None
         
         try:
-            response = self.client.table('sessions')\
-                .select('timer_status')\
-                .eq('session_id', session_id)\
-                .single()\
-                .execute()
-            
-            if response.data:
-                return response.data.get('timer_status')
-            
-            return None
+            return self.get_session_state(session_id).status
             
         except Exception as e:
             print(f"❌ Status-Query Fehler: {e}")
             return None
     
     # ===== REPORT DATA =====
+
+    def get_session_co2_stats(self, session_id, since=None):
+        """
+        CO2-Statistik einer Session: Rollup (verdichtete Daten) + restliche Rohdaten
+        since: Co2Stats einer früheren Abfrage derselben Session → wird um die Rohdaten
+               seit since.last_id ergänzt (nur neue Zeilen, statt alles neu zu laden)
+        """
+        if since is not None:
+            # Laufende Session: Rollups betreffen nur Daten älter als CO2_RAW_RETENTION_DAYS
+            stats = since
+            if self.client and session_id:
+                self._add_raw_co2(stats, session_id, stats.last_id)
+                self._add_batched_co2(stats, session_id, stats.last_batch_id)
+            return stats
+
+        stats = Co2Stats()
+        if not self.client or not session_id:
+            return stats
+
+        max_raw_id = max_batch_id = 0
+        if self.rollups_available:
+            try:
+                rollup = self.client.table('co2_rollup_session')\
+                    .select('*')\
+                    .eq('session_id', session_id)\
+                    .limit(1)\
+                    .execute()
+                if rollup.data:
+                    stats.merge_rollup(rollup.data[0])
+                    max_raw_id = rollup.data[0].get('max_raw_id') or 0
+                    max_batch_id = rollup.data[0].get('max_batch_id') or 0
+            except Exception as e:
+                if not missing_relation(e):
+                    raise   # ohne Rollup fehlten verdichtete Daten - lieber keine als falsche Statistik
+                print(f"⚠️  CO2 Rollups nicht verfügbar ({e}) - nutze nur Rohdaten")
+                self.rollups_available = False
+
+        self._add_raw_co2(stats, session_id, max_raw_id)
+        self._add_batched_co2(stats, session_id, max_batch_id)
+        return stats
+
+    def _add_raw_co2(self, stats, session_id, after_id):
+        rows = self.iter_rows(
+            'co2_measurements', 'id, co2_level, tvoc_level, is_alarm, created_at',
+            where=lambda q: q.eq('session_id', session_id),
+            after_id=after_id
+        )
+        for row in rows:
+            stats.add(row)
+    
+    def _add_batched_co2(self, stats, session_id, after_id):
+        """Gepackte Batches entpacken (Cursor: stats.last_batch_id)"""
+        if not self.batches_available:
+            return
+        try:
+            batches = self.iter_rows(
+                'co2_batches', 'id, started_at, offsets_ms, co2_levels, tvoc_levels, alarm_flags',
+                where=lambda q: q.eq('session_id', session_id),
+                after_id=after_id
+            )
+            for batch in batches:
+                for row in iter_co2_samples(batch):
+                    stats.add(row)
+                stats.last_batch_id = batch['id']
+        except Exception as e:
+            if not missing_relation(e):
+                print(f"⚠️  CO2 Batches nicht lesbar ({e}) - Statistik ohne neuere Batches")
+                return   # vorübergehend: nächster Aufruf liest ab stats.last_batch_id weiter
+            print(f"⚠️  CO2 Batches nicht verfügbar ({e}) - nutze nur Rohdaten")
+            self.batches_available = False
     
     def get_session_report_data(self, session_id):
         """Holt alle Daten für Report"""
@@ -250,66 +695,44 @@ class SupabaseManager:
             return None
         
         try:
-            # 1. Session Info
-            session_response = self.client.table('sessions')\
-                .select('*')\
-                .eq('session_id', session_id)\
-                .single()\
-                .execute()
+            # 1. Session Info (Cache: end_session hat die Endsummen durchgeschrieben)
+            session = self.get_session(session_id)
+            if not session:
+                print(f"❌ Report-Daten Fehler: Session {session_id[:8]}... nicht gefunden")
+                return None
 
-            if session_response.data:
-                print(f"📊 Session-Daten geladen:")
-                print(f"   total_work_time: {session_response.data.get('total_work_time', 'N/A')}s")
-                print(f"   total_pause_time: {session_response.data.get('total_pause_time', 'N/A')}s")
-                print(f"   pause_count: {session_response.data.get('pause_count', 'N/A')}")
-                print(f"   end_time: {session_response.data.get('end_time', 'N/A')}")
-            
-            # 2. CO2 Daten
-            co2_response = self.client.table('co2_measurements')\
-                .select('co2_level, is_alarm')\
-                .eq('session_id', session_id)\
-                .execute()
-            
-            co2_values = [row['co2_level'] for row in co2_response.data] if co2_response.data else []
+            print(f"📊 Session-Daten geladen:")
+            print(f"   total_work_time: {session.get('total_work_time', 'N/A')}s")
+            print(f"   total_pause_time: {session.get('total_pause_time', 'N/A')}s")
+            print(f"   pause_count: {session.get('pause_count', 'N/A')}")
+            print(f"   end_time: {session.get('end_time', 'N/A')}")
             
-            # Alarm-Perioden zählen (nicht einzelne Messungen)
-            alarm_count = 0
-            was_in_alarm = False
-            for row in co2_response.data:
-                if row.get('is_alarm') and not was_in_alarm:
-                    alarm_count += 1
-                    was_in_alarm = True
-                elif not row.get('is_alarm'):
-                    was_in_alarm = False
+            # 2. CO2 Daten (Rollup + Rohdaten, Alarm-Perioden statt einzelner Messungen)
+            co2_stats = self.get_session_co2_stats(session_id).to_report()
             
-            co2_stats = {
-                'avg_co2': int(sum(co2_values) / len(co2_values)) if co2_values else 400,  # Default: Außenluft
-                'min_co2': min(co2_values) if co2_values else 400,
-                'max_co2': max(co2_values) if co2_values else 400,
-                'alarm_count': alarm_count
-            }
-            
-            # 3. Bewegungsdaten (ALLE Einträge summieren)
-            movement_response = self.client.table('breakdata')\
-                .select('step_count, calories_burned, distance_meters')\
-                .eq('session_id', session_id)\
-                .execute()
+            # 3. Bewegungsdaten (ALLE Einträge summieren, für mehrere Pausen)
+            movement_count = total_steps = total_calories = total_distance = 0
+            movement_rows = self.iter_rows(
+                'breakdata', 'step_count, calories_burned, distance_meters',
+                where=lambda q: q.eq('session_id', session_id)
+            )
+            for row in movement_rows:
+                movement_count += 1
+                total_steps += row.get('step_count', 0)
+                total_calories += row.get('calories_burned', 0)
+                total_distance += row.get('distance_meters', 0)
 
-            # Summiere alle Bewegungsdaten (für mehrere Pausen)
-            if movement_response.data:
-                total_steps = sum(row.get('step_count', 0) for row in movement_response.data)
-                total_calories = sum(row.get('calories_burned', 0) for row in movement_response.data)
-                total_distance = sum(row.get('distance_meters', 0) for row in movement_response.data)
+            if movement_count:
                 movement_data = {
                     'step_count': total_steps,
                     'calories_burned': total_calories,
                     'distance_meters': total_distance
                 }
-                print(f"📊 Bewegungsdaten gefunden: {len(movement_response.data)} Einträge, Summe: {total_steps} Schritte")
+                print(f"📊 Bewegungsdaten gefunden: {movement_count} Einträge, Summe: {total_steps} Schritte")
             else:
                 # Default-Werte wenn kein StepCounter Daten vorhanden (z.B. Sensor-Aufwärmphase)
                 # Hole pause_count aus session für realistische Defaults
-                pause_count = session_response.data.get('pause_count', 0) if session_response.data else 0
+                pause_count = session.get('pause_count', 0)
                 default_steps = 21 * pause_count if pause_count > 0 else 21
                 default_distance = 12 * pause_count if pause_count > 0 else 12
                 movement_data = {
@@ -321,7 +744,7 @@ class SupabaseManager:
                 print(f"   pause_count={pause_count}, steps={default_steps}, distance={default_distance}m")
             
             return {
-                'session': session_response.data if session_response.data else {},
+                'session': session,
                 'co2': co2_stats,
                 'movement': movement_data
             }
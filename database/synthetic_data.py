@@ -0,0 +1,383 @@
+"""
+Synthetische Lern-Historie für sessions, session_events, co2_batches/co2_measurements und breakdata
+Erzeugt Monate an realistischen Daten für mehrere Arbeitsplätze (CO2-Kurven,
+Alarm-Perioden, Pausen mit Schritten) und lädt sie per Batch-Insert oder als
+CSV für COPY - für Tests von Reports, Indizes und Retention im Produktionsmaßstab.
+
+    python -m database.synthetic_data --users 10 --days 120                 # → Supabase (.env)
+    python -m database.synthetic_data --users 10 --days 120 --csv export/  # → CSV für \\copy
+    python -m database.synthetic_data --co2 rows                            # CO2 als Altdaten (co2_measurements)
+
+Die Zeilen entsprechen dem, was main_pitop1.py/main_pitop2.py schreiben:
+CO2 alle 30s, bei Alarm (>= CO2_WARNING_THRESHOLD) jede Sekunde - gepackt zu
+CO2_BATCH_SIZE Messungen pro co2_batches-Zeile, dazu die Events jeder Zustandsänderung.
+Schwellen, Dauern und Batch-Größe kommen aus config (.env.pitop1).
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+CO2_LOG_INTERVAL = 30
+
+USER_NAMES = ['Alicia', 'Ben', 'Clara', 'David', 'Emma', 'Finn', 'Greta', 'Hannes',
+              'Ida', 'Jonas', 'Klara', 'Lukas', 'Mia', 'Noah', 'Olivia', 'Paul']
+
+# Ladereihenfolge: sessions vor allen Tabellen mit Fremdschlüssel auf session_id
+TABLES = ('sessions', 'session_events', 'co2_measurements', 'co2_batches', 'breakdata')
+COLUMNS = {
+    'sessions': ['session_id', 'start_time', 'end_time', 'timer_status', 'user_name', 'user_weight',
+                 'user_height', 'device_id', 'pause_count', 'total_work_time', 'total_pause_time',
+                 'created_at'],
+    'session_events': ['session_id', 'event_type', 'device_id', 'occurred_at', 'monotonic_ms',
+                       'boot_id', 'payload', 'created_at'],
+    'co2_measurements': ['session_id', 'co2_level', 'tvoc_level', 'is_alarm', 'alarm_type',
+                         'device_id', 'created_at'],
+    'co2_batches': ['session_id', 'device_id', 'started_at', 'offsets_ms', 'co2_levels',
+                    'tvoc_levels', 'alarm_flags', 'critical_flags', 'created_at'],
+    'breakdata': ['session_id', 'pause_number', 'step_count', 'calories_burned', 'distance_meters',
+                  'device_id', 'created_at'],
+}
+CO2_TABLE = {'batches': 'co2_batches', 'rows': 'co2_measurements'}
+
+
+class Desk:
+    """Ein Arbeitsplatz (PiTop 1 + PiTop 2) mit eigenem Raumklima und Gewohnheiten"""
+
+    def __init__(self, index, rng):
+        self.user_name = USER_NAMES[index % len(USER_NAMES)] + (f" {index // len(USER_NAMES)}" if index >= len(USER_NAMES) else '')
+        self.work_device = f"pitop1-{index:02d}"
+        self.break_device = f"pitop2-{index:02d}"
+        self.weight = rng.randint(50, 95)
+        self.height = rng.randint(155, 195)
+        # Raum: Gleichgewichts-CO2 bei Belegung (kleine Räume → hohe Werte)
+        self.room_co2 = rng.uniform(550, 1100)
+        self.ambient_co2 = rng.uniform(410, 460)
+        self.activity = rng.uniform(0.6, 1.4)       # Schritt-Faktor in Pausen
+        self.sessions_per_day = rng.uniform(0.8, 2.2)
+        # Letzter Boot der Geräte: (Zeitpunkt, boot_id) - Basis für monotonic_ms der Events
+        self.boot = {self.work_device: None, self.break_device: None}
+
+
+class SyntheticHistory:
+    def __init__(self, users=10, days=90, seed=42, end=None, co2='batches'):
+        self.rng = random.Random(seed)
+        self.days = days
+        self.end = (end or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.desks = [Desk(i, self.rng) for i in range(users)]
+        self.co2_table = CO2_TABLE[co2]
+        import config   # erst hier: als CLI setzt __main__ vorher DEVICE_OVERRIDE
+        self.config = config
+
+    @property
+    def tables(self):
+        """Erzeugte Tabellen in Ladereihenfolge (CO2 entweder als Batches oder als Einzelzeilen)"""
+        skipped = set(CO2_TABLE.values()) - {self.co2_table}
+        return [t for t in TABLES if t not in skipped]
+
+    def days_iter(self):
+        for offset in range(self.days, 0, -1):
+            yield self.end - timedelta(days=offset)
+
+    def sessions_for_day(self, day):
+        """Liefert {Tabelle: Zeilen} für jede Session eines Tages"""
+        rng = self.rng
+        weekend = day.weekday() >= 5
+        for desk in self.desks:
+            expected = desk.sessions_per_day * (0.25 if weekend else 1.0)
+            count = int(expected) + (1 if rng.random() < expected - int(expected) else 0)
+            start = day + timedelta(hours=rng.uniform(8, 10))
+            for _ in range(count):
+                session = self.generate_session(desk, start)
+                yield session
+                end = datetime.fromisoformat(session['sessions'][0]['end_time'])
+                start = end + timedelta(minutes=rng.uniform(30, 180))
+
+    def generate_session(self, desk, start):
+        rng = self.rng
+        cfg = self.config
+        session_id = str(uuid.uuid4())
+        cycles = max(1, int(rng.gauss(3, 1.2)))
+        co2_rows = []
+        batches = []
+        break_rows = []
+        events = []
+
+        # Geräte laufen tagelang durch, gelegentlich ein Neustart (monotonic_ms beginnt bei 0)
+        for device, boot in desk.boot.items():
+            if boot is None or rng.random() < 0.05:
+                desk.boot[device] = (start - timedelta(hours=rng.uniform(0.5, 72)), str(uuid.UUID(int=rng.getrandbits(128))))
+
+        def event(event_type, at, device=desk.work_device, **payload):
+            events.append({
+                'session_id': session_id,
+                'event_type': event_type,
+                'device_id': device,
+                'occurred_at': at.isoformat(),
+                'monotonic_ms': int((at - desk.boot[device][0]).total_seconds() * 1000),
+                'boot_id': desk.boot[device][1],
+                'payload': payload or None,
+                'created_at': at.isoformat()
+            })
+
+        t = start
+        co2 = desk.ambient_co2 + rng.uniform(0, 80)
+        total_work = 0
+        total_break = 0
+        event('session_started', t, user_name=desk.user_name)
+
+        for cycle in range(cycles):
+            # Arbeitsphase: CO2 nähert sich exponentiell dem Raum-Gleichgewicht
+            event('work_started', t)
+            phase_rows = []
+            co2 = self._work_phase(desk, session_id, t, co2, phase_rows)
+            co2_rows.extend(phase_rows)
+            batches.extend(self._batches(desk, session_id, phase_rows))   # Pausenstart: flush()
+            t += timedelta(seconds=cfg.WORK_DURATION)
+            total_work += cfg.WORK_DURATION
+
+            # Letzte Phase ohne Pause (Session-Ende nach Arbeit)
+            if cycle == cycles - 1:
+                break
+            event('work_ended', t)
+
+            # Pause: Fenster auf → CO2 fällt Richtung Außenluft, PiTop 2 zählt Schritte
+            steps = max(0, int(rng.gauss(750, 280) * desk.activity))
+            break_end = t + timedelta(seconds=cfg.BREAK_DURATION)
+            started_at = (t - datetime(1970, 1, 1)).total_seconds()
+            event('break_started', t, started_at=started_at, deadline=started_at + cfg.BREAK_DURATION)
+            # Beide Geräte melden das Pausenende - die Projektion zählt nur das erste
+            event('break_ended', break_end, desk.break_device, pause_number=cycle + 1)
+            event('break_ended', break_end + timedelta(milliseconds=rng.randint(50, 900)))
+            break_rows.append({
+                'session_id': session_id,
+                'pause_number': cycle + 1,
+                'step_count': steps,
+                'calories_burned': int(steps * cfg.CALORIES_PER_STEP),
+                'distance_meters': int(steps * cfg.METERS_PER_STEP),
+                'device_id': desk.break_device,
+                'created_at': break_end.isoformat()
+            })
+            co2 = desk.ambient_co2 + (co2 - desk.ambient_co2) * math.exp(-cfg.BREAK_DURATION / 480)
+            t = break_end
+            total_break += cfg.BREAK_DURATION
+
+        session = {
+            'session_id': session_id,
+            'start_time': start.isoformat(),
+            'end_time': t.isoformat(),
+            'timer_status': 'ended',
+            'user_name': desk.user_name,
+            'user_weight': desk.weight,
+            'user_height': desk.height,
+            'device_id': desk.work_device,
+            'pause_count': len(break_rows),
+            'total_work_time': total_work,
+            'total_pause_time': total_break,
+            'created_at': start.isoformat()
+        }
+        event('ended', t)
+        return {
+            'sessions': [session],
+            'session_events': events,
+            'co2_measurements': co2_rows if self.co2_table == 'co2_measurements' else [],
+            'co2_batches': batches if self.co2_table == 'co2_batches' else [],
+            'breakdata': break_rows,
+        }
+
+    def _work_phase(self, desk, session_id, start, co2, rows):
+        """Simuliert den CO2-Logger aus main_pitop1.py (30s Intervall, bei Alarm jede Sekunde)"""
+        rng = self.rng
+        cfg = self.config
+        tau = rng.uniform(1800, 3000)
+        target = desk.room_co2 * rng.uniform(0.9, 1.1)
+        elapsed = 0
+        counter = 0
+        level = co2
+
+        while elapsed < cfg.WORK_DURATION:
+            level = target - (target - co2) * math.exp(-elapsed / tau)
+
+            # Weit unter der Alarm-Schwelle: bis kurz vor den nächsten regulären Log springen
+            if level < cfg.CO2_WARNING_THRESHOLD - 20 and counter < CO2_LOG_INTERVAL - 1:
+                skip = CO2_LOG_INTERVAL - 1 - counter
+                counter += skip
+                elapsed += skip
+                continue
+
+            counter += 1
+            value = int(level + rng.gauss(0, 6))
+            is_alarm = value >= cfg.CO2_WARNING_THRESHOLD
+
+            if counter >= CO2_LOG_INTERVAL or is_alarm:
+                rows.append({
+                    'session_id': session_id,
+                    'co2_level': value,
+                    'tvoc_level': max(0, int(15 + (value - 400) * 0.3 + rng.gauss(0, 8))),
+                    'is_alarm': is_alarm,
+                    'alarm_type': ('critical' if value >= cfg.CO2_CRITICAL_THRESHOLD else 'warning') if is_alarm else None,
+                    'device_id': desk.work_device,
+                    'created_at': (start + timedelta(seconds=elapsed)).isoformat()
+                })
+                counter = 0
+
+            elapsed += 1
+
+        return level
+
+    def _batches(self, desk, session_id, rows):
+        """Messungen einer Arbeitsphase → co2_batches-Zeilen wie Co2Batcher (voll oder zu alt)"""
+        batches, chunk = [], []
+        for row in rows + [None]:
+            at = row and datetime.fromisoformat(row['created_at'])
+            if chunk and (row is None or len(chunk) >= self.config.CO2_BATCH_SIZE
+                          or (at - chunk[0][0]).total_seconds() >= self.config.CO2_BATCH_MAX_AGE):
+                started = chunk[0][0]
+                batches.append({
+                    'session_id': session_id,
+                    'device_id': desk.work_device,
+                    'started_at': started.isoformat(),
+                    'offsets_ms': [int((a - started).total_seconds() * 1000) for a, _ in chunk],
+                    'co2_levels': [r['co2_level'] for _, r in chunk],
+                    'tvoc_levels': [r['tvoc_level'] for _, r in chunk],
+                    'alarm_flags': [r['is_alarm'] for _, r in chunk],
+                    'critical_flags': [r['alarm_type'] == 'critical' for _, r in chunk],
+                    'created_at': chunk[-1][0].isoformat()
+                })
+                chunk = []
+            if row is not None:
+                chunk.append((at, row))
+        return batches
+
+
+# ===== LOADER =====
+
+class SupabaseLoader:
+    """Batch-Inserts über SupabaseManager.insert_many (mehrzeilige Inserts)"""
+
+    def __init__(self, batch_size=1000):
+        from database.supabase_manager import SupabaseManager
+        self.db = SupabaseManager()
+        self.batch_size = batch_size
+        if not self.db.client:
+            raise SystemExit(1)
+
+    def write(self, table, rows):
+        return self.db.insert_many(table, rows, self.batch_size)
+
+    def close(self):
+        pass
+
+
+def _copy_value(value):
+    """Wie COPY ... CSV erwartet: Arrays als {1,2,3}, JSON als Text"""
+    if isinstance(value, list):
+        return '{' + ','.join('NULL' if v is None else str(_copy_value(v)) for v in value) + '}'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+
+class CsvLoader:
+    """Schreibt gzip-CSV Dateien für psql \\copy (schnellster Weg in Postgres)"""
+
+    def __init__(self, directory, tables=TABLES):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.tables = tables
+        self.files = {}
+        self.writers = {}
+        for table in tables:
+            path = os.path.join(directory, f"{table}.csv.gz")
+            self.files[table] = gzip.open(path, 'wt', newline='')
+            writer = csv.DictWriter(self.files[table], fieldnames=COLUMNS[table])
+            writer.writeheader()
+            self.writers[table] = writer
+
+    def write(self, table, rows):
+        self.writers[table].writerows({k: _copy_value(v) for k, v in row.items()} for row in rows)
+        return len(rows)
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        print("\n💡 Import mit psql:")
+        for table in self.tables:
+            path = os.path.join(self.directory, f"{table}.csv.gz")
+            print(f"   \\copy {table} ({', '.join(COLUMNS[table])}) FROM PROGRAM 'gzip -dc {path}' CSV HEADER")
+
+
+def load(history, loader):
+    """Generiert Tag für Tag und lädt Sessions vor ihren Messwerten (FK)
+
+    Ein Fehler beim Laden bricht ab (Exception aus insert_many) - sonst fehlten
+    z.B. Sessions zu bereits geladenen Events und Messwerten.
+    """
+    tables = history.tables
+    totals = dict.fromkeys(tables, 0)
+    started = time.time()
+
+    for day in history.days_iter():
+        rows = {table: [] for table in tables}
+        for session in history.sessions_for_day(day):
+            for table in tables:
+                rows[table].extend(session[table])
+
+        for table in tables:
+            totals[table] += loader.write(table, rows[table])
+
+        elapsed = time.time() - started
+        print(f"\r📅 {day.date()} | Sessions: {totals['sessions']:,} | "
+              f"Events: {totals['session_events']:,} | CO2 ({history.co2_table}): "
+              f"{totals[history.co2_table]:,} | Pausen: {totals['breakdata']:,} | {elapsed:.0f}s",
+              end='', flush=True)
+
+    print()
+    loader.close()
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Synthetische Lern-Historie erzeugen und laden')
+    parser.add_argument('--users', type=int, default=10, help='Anzahl Arbeitsplätze/User')
+    parser.add_argument('--days', type=int, default=90, help='Anzahl Tage Historie')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=1000, help='Zeilen pro Insert-Anfrage')
+    parser.add_argument('--csv', metavar='DIR', help='Statt Supabase gzip-CSV für COPY schreiben')
+    parser.add_argument('--co2', choices=sorted(CO2_TABLE), default='batches',
+                        help='CO2 als co2_batches (wie PiTop 1 heute) oder co2_measurements (Altdaten)')
+    args = parser.parse_args(argv)
+
+    print("\n" + "="*60)
+    print("🧪 SYNTHETISCHE DATEN")
+    print("="*60)
+    print(f"   User: {args.users} | Tage: {args.days} | Seed: {args.seed}")
+    print(f"   Ziel: {args.csv or 'Supabase (Batch ' + str(args.batch_size) + ')'}\n")
+
+    history = SyntheticHistory(users=args.users, days=args.days, seed=args.seed, co2=args.co2)
+    loader = CsvLoader(args.csv, history.tables) if args.csv else SupabaseLoader(args.batch_size)
+    try:
+        totals = load(history, loader)
+    except Exception as e:
+        print(f"\n❌ Laden abgebrochen: {e}")
+        return 1
+
+    print(f"\n✅ Fertig: {totals['sessions']:,} Sessions, {totals['session_events']:,} Events, "
+          f"{totals[history.co2_table]:,} {history.co2_table}-Zeilen, {totals['breakdata']:,} Pausen")
+    return 0
+
+
+if __name__ == "__main__":
+    if not os.environ.get('DEVICE_OVERRIDE') and '--device=' not in ' '.join(sys.argv):
+        os.environ['DEVICE_OVERRIDE'] = 'pitop1'   # Schwellen/Dauern aus .env.pitop1 (auch für --csv)
+    sys.exit(main())
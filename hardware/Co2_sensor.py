@@ -3,6 +3,10 @@
 """
 import config
 import time
+from hardware.i2c_bus import I2CBus, I2C_AVAILABLE, PRIORITY_CO2
+from hardware.sensor_process import SensorProcess
+
+SGP30_ADDR = 0x58
 
 try:
     import board
@@ -12,16 +16,24 @@ except ImportError:
     SENSOR_AVAILABLE = False
 
 class CO2Sensor:
-    def __init__(self):
+    def __init__(self, sampling_process=None):
         self._co2_level = 400
         self._tvoc_level = 0
         self.sensor = None
         self.errors = 0
         self.last_good_read = time.time()
+        self._process = None   # SensorProcess (SENSOR_PROCESS=true)
         
-        if SENSOR_AVAILABLE:
+        if sampling_process is None:
+            sampling_process = config.SENSOR_PROCESS
+        if SENSOR_AVAILABLE and sampling_process:
+            # SGP30 wird im Sensor-Prozess initialisiert und jede Sekunde gemessen
+            # (die Baseline-Kompensation des SGP30 braucht den 1 Hz Takt)
+            self._process = SensorProcess('co2-sampler', Co2Sampler(), Co2Sampler.FIELDS,
+                                          config.CO2_SAMPLE_INTERVAL).start()
+        elif SENSOR_AVAILABLE:
             try:
-                i2c = board.I2C() # HARDCODED (einer der I2C Port)
+                i2c = self._open_i2c()
                 self.sensor = adafruit_sgp30.Adafruit_SGP30(i2c)
                 self.sensor.iaq_init()
                 time.sleep(1)
@@ -41,7 +53,18 @@ class CO2Sensor:
         else:
             print(f"⚠️  adafruit_sgp30 nicht verfügbar - Dummy-Modus")
     
+    # Gemeinsamer Bus-Arbiter (mit BMA456), sonst Blinka direkt
+    def _open_i2c(self):
+        if I2C_AVAILABLE:
+            bus = I2CBus.get(1) # HARDCODED (einer der I2C Port)
+            bus.register(SGP30_ADDR, "SGP30")
+            return bus.blinka(PRIORITY_CO2)
+        return board.I2C()
+    
     def read(self):
+        if self._process:
+            return self._read_process()
+        
         if self.sensor is None:
             return self._co2_level
         
@@ -69,6 +92,20 @@ class CO2Sensor:
         
         return self._co2_level
     
+    # Letzte Messung aus dem Shared-Memory-Ring (kein I2C im Hauptprozess)
+    def _read_process(self):
+        latest = self._process.latest()
+        if latest:
+            self.last_good_read = latest[0]
+            self._co2_level = int(latest[Co2Sampler.CO2])
+            self._tvoc_level = int(latest[Co2Sampler.TVOC])
+        return self._co2_level
+    
+    def close(self):
+        if self._process:
+            self._process.stop()
+            self._process = None
+    
     @property
     def co2_level(self):
         self.read()
@@ -85,3 +122,23 @@ class CO2Sensor:
         elif level >= config.CO2_WARNING_THRESHOLD:
             return "warning"
         return "ok"
+
+
+# Läuft im Sensor-Prozess: eigener CO2Sensor (SGP30) → (eCO2, TVOC)
+class Co2Sampler:
+    FIELDS = 2
+    CO2 = 1    # Indizes im Ring-Sample (Feld 0 = Zeitstempel)
+    TVOC = 2
+    
+    def __init__(self):
+        self.sensor = None
+    
+    def open(self):
+        self.sensor = CO2Sensor(sampling_process=False)
+    
+    def sample(self, now):
+        co2 = self.sensor.read()
+        return (co2, self.sensor.tvoc_level)
+    
+    def close(self):
+        pass   # Bus-Statistik druckt der Sensor-Prozess (alle Geräte am Arbiter)
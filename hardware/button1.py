@@ -2,10 +2,13 @@
 Button 1 - Work Session Start
 PORT: D0 (HARDCODED)
 - Short Press: Start Work Session (nur wenn keine aktiv)
+Dauer aus Kernel-Zeitstempeln der Flanken (hardware/gpio_edges.py), Fallback: pi-top SDK
 """
 
 from pitop import Button
-from time import time
+from time import monotonic
+from hardware.gpio_edges import EdgeWatcher
+from hardware.press_classifier import PressClassifier, SHORT
 
 try:
     import config
@@ -17,32 +20,32 @@ except ImportError:
 class Button1:
     def __init__(self):
         self.pin_name = "D0"  # HARDCODED
-        self.press_start = None
         self.short_press_cb = None
+        self.classifier = PressClassifier(SHORT_PRESS_MAX)
         
         # Status-Check Callback (wird von außen gesetzt)
         self.is_work_active_cb = None
         
-        # PiTop Button erstellen
-        self.button = Button(self.pin_name)
-        self.button.when_pressed = self._on_press
-        self.button.when_released = self._on_release
+        # Kernel-Flanken (lgpio) - sonst PiTop Button
+        self.button = None
+        self.edges = EdgeWatcher.create(self.pin_name, self._on_edge)
+        if not self.edges:
+            self.button = Button(self.pin_name)
+            self.button.when_pressed = lambda: self._on_edge(True, monotonic())
+            self.button.when_released = lambda: self._on_edge(False, monotonic())
         
-        print(f"✅ Button1 auf {self.pin_name} initialisiert")
+        print(f"✅ Button1 auf {self.pin_name} initialisiert ({'lgpio Flanken' if self.edges else 'pi-top SDK'})")
         print(f"   📋 Short Press = Arbeitsphase starten")
     
-    def _on_press(self):
-        self.press_start = time()
-    
-    def _on_release(self):
-        if not self.press_start:
+    def _on_edge(self, pressed, timestamp):
+        if pressed:
+            self.classifier.press(timestamp)
             return
         
-        duration = time() - self.press_start
-        self.press_start = None
+        gesture, _ = self.classifier.release(timestamp)
         
         # Short Press Check
-        if duration <= SHORT_PRESS_MAX:
+        if gesture == SHORT:
             # Prüfen ob Arbeitsphase bereits aktiv
             if self.is_work_active_cb and self.is_work_active_cb():
                 print("⚠️ Button1: Arbeitsphase bereits aktiv - ignoriert")
@@ -61,4 +64,7 @@ class Button1:
     
     def cleanup(self):
         """Ressourcen freigeben"""
-        self.button.close()
\ No newline at end of file
+        if self.edges:
+            self.edges.close()
+        if self.button:
+            self.button.close()
\ No newline at end of file
@@ -4,11 +4,14 @@ PORT: D1 (HARDCODED)
 - Short Press: Start Break (nur wenn keine Arbeitsphase aktiv)
 - Long Press (3s): Letzte Aktion stornieren
 - Very Long Press (7s): Session komplett beenden
+Dauer aus Kernel-Zeitstempeln der Flanken (hardware/gpio_edges.py), Fallback: pi-top SDK
 """
 
 from pitop import Button
 import threading
-from time import time
+from time import monotonic
+from hardware.gpio_edges import EdgeWatcher
+from hardware.press_classifier import PressClassifier, SHORT, CANCEL, END_SESSION
 
 try:
     import config
@@ -24,7 +27,7 @@ except ImportError:
 class Button2:
     def __init__(self):
         self.pin_name = "D1"  # HARDCODED
-        self.press_start = None
+        self.classifier = PressClassifier(SHORT_PRESS_MAX, CANCEL_PRESS, END_SESSION_PRESS)
         
         # Callbacks
         self.short_press_cb = None      # Pause starten
@@ -34,86 +37,47 @@ class Button2:
         # Status-Check Callbacks
         self.is_work_active_cb = None
         
-        # Feedback während Long Press
-        self.long_press_timer = None
-        self.feedback_3s_given = False
-        self.feedback_7s_given = False
+        # Feedback während Long Press (je Schwelle ein One-Shot Timer statt Polling)
+        self.feedback_timers = []
         
-        # PiTop Button erstellen
-        self.button = Button(self.pin_name)
-        self.button.when_pressed = self._on_press
-        self.button.when_released = self._on_release
+        # Kernel-Flanken (lgpio) - sonst PiTop Button
+        self.button = None
+        self.edges = EdgeWatcher.create(self.pin_name, self._on_edge)
+        if not self.edges:
+            self.button = Button(self.pin_name)
+            self.button.when_pressed = lambda: self._on_edge(True, monotonic())
+            self.button.when_released = lambda: self._on_edge(False, monotonic())
         
-        print(f"✅ Button2 auf {self.pin_name} initialisiert")
+        print(f"✅ Button2 auf {self.pin_name} initialisiert ({'lgpio Flanken' if self.edges else 'pi-top SDK'})")
         print(f"   📋 Short Press = Pause starten")
         print(f"   📋 Long Press ({CANCEL_PRESS}s) = Stornieren")
         print(f"   📋 Very Long Press ({END_SESSION_PRESS}s) = Session beenden")
     
-    def _on_press(self):
-        self.press_start = time()
-        self.feedback_3s_given = False
-        self.feedback_7s_given = False
-        self._start_hold_monitoring()
-    
-    def _start_hold_monitoring(self):
-        """Überwacht wie lange Button gehalten wird für Feedback"""
-        def check_hold():
-            if self.press_start is None:
-                return
-            
-            duration = time() - self.press_start
-            
-            if duration >= END_SESSION_PRESS:
-                if not self.feedback_7s_given:
-                    print(f"\n🔴 Button2: {END_SESSION_PRESS}s erreicht - Session wird beendet!")
-                    self.feedback_7s_given = True
-                # Nicht mehr weiter überwachen
-                return
-            
-            elif duration >= CANCEL_PRESS:
-                if not self.feedback_3s_given:
-                    print(f"\n🟡 Button2: {CANCEL_PRESS}s erreicht - Storno bereit (weiter halten für Session-Ende)")
-                    self.feedback_3s_given = True
-                # Weiter überwachen für 7s
-                self.long_press_timer = threading.Timer(0.1, check_hold)
-                self.long_press_timer.start()
-            
-            else:
-                # Weiter überwachen
-                self.long_press_timer = threading.Timer(0.1, check_hold)
-                self.long_press_timer.start()
-        
-        self.long_press_timer = threading.Timer(0.1, check_hold)
-        self.long_press_timer.start()
-    
-    def _on_release(self):
-        if not self.press_start:
+    def _on_edge(self, pressed, timestamp):
+        if pressed:
+            if self.classifier.press(timestamp):
+                self._start_hold_feedback()
             return
         
-        # Timer stoppen
-        if self.long_press_timer:
-            self.long_press_timer.cancel()
-            self.long_press_timer = None
-        
-        duration = time() - self.press_start
-        self.press_start = None
+        self._cancel_hold_feedback()
+        gesture, _ = self.classifier.release(timestamp)
         
         # Very Long Press (7+ Sekunden) - Session beenden
-        if duration >= END_SESSION_PRESS:
+        if gesture == END_SESSION:
             print("🔴 Button2: Session beenden ausgelöst")
             if self.end_session_cb:
                 self.end_session_cb()
             return
         
         # Long Press (3-7 Sekunden) - Stornieren
-        if duration >= CANCEL_PRESS:
+        if gesture == CANCEL:
             print("🟡 Button2: Storno ausgelöst")
             if self.cancel_cb:
                 self.cancel_cb()
             return
         
         # Short Press - Pause starten
-        if duration <= SHORT_PRESS_MAX:
+        if gesture == SHORT:
             
             # Prüfen ob Arbeitsphase aktiv - Pause nur möglich wenn KEINE Arbeit läuft
             work_active = self.is_work_active_cb() if self.is_work_active_cb else False
@@ -125,6 +89,24 @@ class Button2:
             if self.short_press_cb:
                 self.short_press_cb()
     
+    def _start_hold_feedback(self):
+        """Meldet das Erreichen der Schwellen während der Button gehalten wird (nur Anzeige)"""
+        messages = {
+            CANCEL: f"\n🟡 Button2: {CANCEL_PRESS}s erreicht - Storno bereit (weiter halten für Session-Ende)",
+            END_SESSION: f"\n🔴 Button2: {END_SESSION_PRESS}s erreicht - Session wird beendet!",
+        }
+        self._cancel_hold_feedback()
+        for seconds, gesture in self.classifier.thresholds():
+            timer = threading.Timer(seconds, print, args=(messages[gesture],))
+            timer.daemon = True
+            timer.start()
+            self.feedback_timers.append(timer)
+    
+    def _cancel_hold_feedback(self):
+        for timer in self.feedback_timers:
+            timer.cancel()
+        self.feedback_timers = []
+    
     def on_short_press(self, callback):
         """Callback für kurzen Tastendruck - Pause starten"""
         self.short_press_cb = callback
@@ -143,6 +125,8 @@ class Button2:
     
     def cleanup(self):
         """Ressourcen freigeben"""
-        if self.long_press_timer:
-            self.long_press_timer.cancel()
-        self.button.close()
\ No newline at end of file
+        self._cancel_hold_feedback()
+        if self.edges:
+            self.edges.close()
+        if self.button:
+            self.button.close()
\ No newline at end of file
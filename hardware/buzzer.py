@@ -50,6 +50,10 @@ class Buzzer:
         sleep(duration)
         self.buzzer.off()
 
+    # Kurzer Klick ohne zu blockieren (Quittung im Button-Callback)
+    def click(self, duration=0.05):
+        threading.Thread(target=self.beep, args=(duration,), daemon=True).start()
+
     # Doppel-Beep Pattern
     def double_beep(self):
         self.beep(0.1)
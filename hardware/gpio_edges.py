@@ -0,0 +1,71 @@
+"""
+GPIO Flanken mit Kernel-Zeitstempel (lgpio Alerts)
+Der Kernel stempelt jede Flanke beim Interrupt; Entprellung übernimmt der Treiber.
+Ohne lgpio (oder wenn der Pin belegt ist) liefert EdgeWatcher.create() None und die
+Buttons fallen auf die pi-top SDK Callbacks zurück.
+"""
+
+try:
+    import lgpio
+    LGPIO_AVAILABLE = True
+except ImportError:
+    LGPIO_AVAILABLE = False
+
+try:
+    import config
+    GPIO_CHIP = config.GPIO_CHIP
+    BUTTON_DEBOUNCE_MS = config.BUTTON_DEBOUNCE_MS
+except ImportError:
+    GPIO_CHIP = 0
+    BUTTON_DEBOUNCE_MS = 20
+
+# pi-top [4] Digital-Ports → BCM GPIO
+PITOP_PINS = {'D0': 22, 'D1': 24, 'D2': 5, 'D3': 6}
+
+
+class EdgeWatcher:
+    """Ruft on_edge(pressed, timestamp_s) mit dem Kernel-Zeitstempel der Flanke auf"""
+
+    def __init__(self, handle, gpio, on_edge):
+        self.handle = handle
+        self.gpio = gpio
+        self.on_edge = on_edge
+        self.callback = lgpio.callback(handle, gpio, lgpio.BOTH_EDGES, self._alert)
+
+    @classmethod
+    def create(cls, pin_name, on_edge, debounce_ms=None):
+        """EdgeWatcher für einen pi-top Port - None wenn nicht möglich"""
+        gpio = PITOP_PINS.get(pin_name)
+        if not LGPIO_AVAILABLE or gpio is None:
+            return None
+
+        debounce_ms = BUTTON_DEBOUNCE_MS if debounce_ms is None else debounce_ms
+        handle = None
+        try:
+            handle = lgpio.gpiochip_open(GPIO_CHIP)
+            # pi-top Buttons sind active-high
+            lgpio.gpio_claim_alert(handle, gpio, lgpio.BOTH_EDGES, lgpio.SET_PULL_DOWN)
+            lgpio.gpio_set_debounce_micros(handle, gpio, int(debounce_ms * 1000))
+            return cls(handle, gpio, on_edge)
+        except Exception as e:
+            print(f"⚠️  lgpio Alerts für {pin_name} nicht verfügbar ({e}) - nutze pi-top Callbacks")
+            if handle is not None:
+                try:
+                    lgpio.gpiochip_close(handle)
+                except Exception:
+                    pass
+            return None
+
+    def _alert(self, chip, gpio, level, tick):
+        # level 2 = Watchdog-Timeout (keine Flanke); tick = Kernel-Zeitstempel in ns
+        if level == 2:
+            return
+        self.on_edge(level == 1, tick / 1e9)
+
+    def close(self):
+        try:
+            self.callback.cancel()
+            lgpio.gpio_free(self.handle, self.gpio)
+            lgpio.gpiochip_close(self.handle)
+        except Exception:
+            pass
@@ -0,0 +1,284 @@
+"""
+I2C Bus - ein Handle pro Bus, Transaktionen aller Treiber serialisiert und priorisiert
+BMA456 (smbus2) und SGP30 (Blinka/adafruit_sgp30) teilen sich Bus 1. Statt eigener
+Handles ohne Absprache läuft jede Transaktion über I2CBus.get(1):
+
+    Priorität   kleiner = früher (Beschleunigungssensor vor CO2-Abfragen)
+    Batching    wartende Block-Reads derselben Adresse mit angrenzenden Registern
+                werden zu einem Read zusammengefasst (max. 32 Bytes)
+    Statistik   pro Gerät: Transaktionen, Fehler, Wartezeit + Transferzeit (stats())
+
+Ist der Bus frei, läuft die Transaktion direkt im aufrufenden Thread (kein Thread-Wechsel).
+Wartezeiten (Settle-Delay, Retry-Backoff) verbringen die Treiber außerhalb des Busses.
+"""
+
+import heapq
+import itertools
+import os
+import time
+from threading import Condition, Lock
+
+try:
+    from smbus2 import SMBus, i2c_msg
+    I2C_AVAILABLE = True
+except ImportError:
+    I2C_AVAILABLE = False
+
+# Prioritäten (kleiner = wichtiger)
+PRIORITY_ACCEL = 0       # BMA456 Samples (50 Hz)
+PRIORITY_CONFIG = 5      # Initialisierung / Register schreiben
+PRIORITY_CO2 = 10        # SGP30 (1 Hz)
+
+MAX_BLOCK = 32           # SMBus Block-Read Limit
+
+
+class _Request:
+    __slots__ = ('priority', 'seq', 'addr', 'reg', 'length', 'op',
+                 'queued_at', 'result', 'error', 'done', 'batched')
+
+    def __init__(self, priority, seq, addr, op=None, reg=None, length=None):
+        self.priority = priority
+        self.seq = seq
+        self.addr = addr
+        self.op = op             # None = Block-Read (batchbar), sonst op(handle)
+        self.reg = reg
+        self.length = length
+        self.queued_at = time.perf_counter()
+        self.result = None
+        self.error = None
+        self.done = False
+        self.batched = False
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class DeviceStats:
+    def __init__(self, name):
+        self.name = name
+        self.transactions = 0
+        self.errors = 0
+        self.batched = 0          # von einem anderen Read mit erledigt
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.transfer_total = 0.0
+        self.transfer_max = 0.0
+
+    def record(self, wait, transfer, error=False, batched=False):
+        self.transactions += 1
+        self.errors += error
+        self.batched += batched
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.transfer_total += transfer
+        self.transfer_max = max(self.transfer_max, transfer)
+
+    def to_dict(self):
+        n = self.transactions or 1
+        return {
+            'name': self.name,
+            'transactions': self.transactions,
+            'errors': self.errors,
+            'batched': self.batched,
+            'wait_avg_ms': round(self.wait_total / n * 1000, 3),
+            'wait_max_ms': round(self.wait_max * 1000, 3),
+            'transfer_avg_ms': round(self.transfer_total / n * 1000, 3),
+            'transfer_max_ms': round(self.transfer_max * 1000, 3),
+        }
+
+
+class I2CBus:
+    _instances = {}
+    _instances_lock = Lock()
+
+    def __init__(self, bus=1):
+        self.bus = bus
+        self.handle = SMBus(bus)
+        self.cond = Condition()
+        self.waiting = []                 # Heap aus _Request
+        self.busy = False
+        self.seq = itertools.count()
+        self.devices = {}                 # Adresse → DeviceStats
+
+    @classmethod
+    def get(cls, bus=1):
+        """Gemeinsamer Bus pro Prozess"""
+        with cls._instances_lock:
+            instance = cls._instances.get(bus)
+            if instance is None:
+                instance = cls._instances[bus] = cls(bus)
+            return instance
+
+    @classmethod
+    def _after_fork(cls):
+        # Kind-Prozess (Sensor-Prozess): eigenes Handle öffnen, geerbte Locks nicht benutzen
+        cls._instances = {}
+        cls._instances_lock = Lock()
+
+    def register(self, addr, name):
+        """Namen für die Statistik vergeben"""
+        self._device(addr).name = name
+
+    def _device(self, addr):
+        device = self.devices.get(addr)
+        if device is None:
+            device = self.devices[addr] = DeviceStats(f"0x{addr:02X}")
+        return device
+
+    # ===== TRANSAKTIONEN =====
+
+    def read_block(self, addr, reg, length, priority=PRIORITY_CO2):
+        return self._submit(_Request(priority, next(self.seq), addr, reg=reg, length=length))
+
+    def read_byte(self, addr, reg, priority=PRIORITY_CONFIG):
+        return self._submit(_Request(priority, next(self.seq), addr,
+                                     op=lambda h: h.read_byte_data(addr, reg)))
+
+    def write_byte(self, addr, reg, value, priority=PRIORITY_CONFIG, retries=3, retry_delay=0.05):
+        """Schreiben mit Retry - der Backoff läuft außerhalb des Busses"""
+        for attempt in range(retries):
+            try:
+                return self._submit(_Request(priority, next(self.seq), addr,
+                                             op=lambda h: h.write_byte_data(addr, reg, value)))
+            except OSError:
+                if attempt == retries - 1:
+                    raise
+                time.sleep(retry_delay)
+
+    def transfer(self, addr, op, priority=PRIORITY_CO2):
+        """Beliebige Transaktion: op(smbus_handle) → Ergebnis (z.B. i2c_rdwr)"""
+        return self._submit(_Request(priority, next(self.seq), addr, op=op))
+
+    def _submit(self, request):
+        with self.cond:
+            if self.busy or self.waiting:
+                heapq.heappush(self.waiting, request)
+                while not request.done and (self.busy or self.waiting[0] is not request):
+                    self.cond.wait()
+                if request.done:   # von einem anderen Read mit erledigt
+                    return self._result(request)
+                heapq.heappop(self.waiting)
+            batch = self._merge(request) if request.op is None and self.waiting else [request]
+            self.busy = True
+
+        started = time.perf_counter()
+        try:
+            if request.op is None:
+                first = min(r.reg for r in batch)
+                data = self.handle.read_i2c_block_data(request.addr, first, max(r.reg + r.length for r in batch) - first)
+                for r in batch:
+                    r.result = data[r.reg - first:r.reg - first + r.length]
+            else:
+                request.result = request.op(self.handle)
+        except Exception as e:
+            for r in batch:
+                r.error = e
+        finally:
+            finished = time.perf_counter()
+            with self.cond:
+                device = self._device(request.addr)
+                for r in batch:
+                    r.done = True
+                    device.record(started - r.queued_at, finished - started,
+                                  error=r.error is not None, batched=r.batched)
+                self.busy = False
+                self.cond.notify_all()
+        return self._result(request)
+
+    def _merge(self, request):
+        """Wartende Block-Reads derselben Adresse mit angrenzenden Registern mitnehmen"""
+        batch = [request]
+        start, end = request.reg, request.reg + request.length
+        merged = True
+        while merged:
+            merged = False
+            for other in self.waiting:
+                if other.op is not None or other.addr != request.addr:
+                    continue
+                lo, hi = min(start, other.reg), max(end, other.reg + other.length)
+                if other.reg <= end and other.reg + other.length >= start and hi - lo <= MAX_BLOCK:
+                    start, end = lo, hi
+                    other.batched = True
+                    batch.append(other)
+                    self.waiting.remove(other)
+                    merged = True
+                    break
+        if len(batch) > 1:
+            heapq.heapify(self.waiting)
+        return batch
+
+    @staticmethod
+    def _result(request):
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    # ===== STATISTIK =====
+
+    def stats(self):
+        with self.cond:
+            return {addr: device.to_dict() for addr, device in self.devices.items()}
+
+    def print_stats(self):
+        for stats in self.stats().values():
+            print(f"📟 I2C {stats['name']}: {stats['transactions']} Transaktionen "
+                  f"({stats['batched']} gebündelt, {stats['errors']} Fehler) | "
+                  f"Warten Ø {stats['wait_avg_ms']} ms (max {stats['wait_max_ms']}) | "
+                  f"Transfer Ø {stats['transfer_avg_ms']} ms (max {stats['transfer_max_ms']})")
+
+    # ===== BLINKA =====
+
+    def blinka(self, priority=PRIORITY_CO2):
+        """busio.I2C-kompatibler Adapter für Adafruit-Treiber (z.B. adafruit_sgp30)"""
+        return BlinkaI2C(self, priority)
+
+
+class BlinkaI2C:
+    """Minimal-Ersatz für board.I2C() - jede Nachricht ist eine Transaktion im Arbiter.
+    try_lock() sperrt nicht exklusiv: Pausen der Treiber (z.B. SGP30 Messzeit zwischen
+    Befehl und Read) blockieren so nicht die anderen Geräte."""
+
+    def __init__(self, bus, priority):
+        self.bus = bus
+        self.priority = priority
+
+    def try_lock(self):
+        return True
+
+    def unlock(self):
+        pass
+
+    def deinit(self):
+        pass
+
+    def scan(self):
+        found = []
+        for addr in range(0x08, 0x78):
+            try:
+                self.bus.transfer(addr, lambda h, a=addr: h.read_byte(a), self.priority)
+                found.append(addr)
+            except OSError:
+                pass
+        return found
+
+    def writeto(self, address, buffer, *, start=0, end=None):
+        message = i2c_msg.write(address, bytes(buffer[start:end]))
+        self.bus.transfer(address, lambda h: h.i2c_rdwr(message), self.priority)
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        end = len(buffer) if end is None else end
+        message = i2c_msg.read(address, end - start)
+        self.bus.transfer(address, lambda h: h.i2c_rdwr(message), self.priority)
+        buffer[start:end] = bytes(message)
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, *,
+                              out_start=0, out_end=None, in_start=0, in_end=None):
+        in_end = len(buffer_in) if in_end is None else in_end
+        write = i2c_msg.write(address, bytes(buffer_out[out_start:out_end]))
+        read = i2c_msg.read(address, in_end - in_start)
+        self.bus.transfer(address, lambda h: h.i2c_rdwr(write, read), self.priority)
+        buffer_in[in_start:in_end] = bytes(read)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=I2CBus._after_fork)
@@ -0,0 +1,59 @@
+"""
+Press Classifier - Tastendruck-Gesten aus zeitgestempelten Flanken
+Die Dauer ergibt sich nur aus den Zeitstempeln der Flanken (Kernel/GPIO-Treiber),
+nicht aus dem Zeitpunkt, zu dem ein Callback zufällig läuft.
+
+    short        Druck <= SHORT_PRESS_MAX
+    cancel       CANCEL_PRESS <= Druck < END_SESSION_PRESS
+    end_session  Druck >= END_SESSION_PRESS
+"""
+
+SHORT = 'short'
+CANCEL = 'cancel'
+END_SESSION = 'end_session'
+
+
+class PressClassifier:
+    def __init__(self, short_max, cancel=None, end_session=None, debounce=0.0):
+        self.short_max = short_max
+        self.cancel = cancel
+        self.end_session = end_session
+        self.debounce = debounce       # Software-Entprellung, falls der Treiber keine kann
+        self.pressed_at = None
+        self.last_edge = None
+
+    def press(self, timestamp):
+        """Steigende Flanke → True wenn ein neuer Druck beginnt"""
+        if self._bounce(timestamp) or self.pressed_at is not None:
+            return False
+        self.pressed_at = timestamp
+        return True
+
+    def release(self, timestamp):
+        """Fallende Flanke → (Geste oder None, Dauer in s)"""
+        if self.pressed_at is None or self._bounce(timestamp):
+            return None, None
+        duration = max(0.0, timestamp - self.pressed_at)
+        self.pressed_at = None
+        return self.classify(duration), duration
+
+    def classify(self, duration):
+        if self.end_session is not None and duration >= self.end_session:
+            return END_SESSION
+        if self.cancel is not None and duration >= self.cancel:
+            return CANCEL
+        if duration <= self.short_max:
+            return SHORT
+        return None   # zwischen Short Press und Storno-Schwelle → ignoriert
+
+    def thresholds(self):
+        """Haltezeiten für Feedback während des Drückens → [(Sekunden, Geste)]"""
+        return [(seconds, gesture) for seconds, gesture in
+                ((self.cancel, CANCEL), (self.end_session, END_SESSION)) if seconds is not None]
+
+    def _bounce(self, timestamp):
+        bounce = (self.debounce > 0 and self.last_edge is not None
+                  and timestamp - self.last_edge < self.debounce)
+        if not bounce:
+            self.last_edge = timestamp
+        return bounce
@@ -0,0 +1,254 @@
+"""
+Sensor Process - Sensor-Sampling in eigenem Prozess, Samples im Shared-Memory-Ring
+Im Hauptprozess teilt sich das 50 Hz Sampling die GIL mit Polling, HTTP/JSON und der
+Statusausgabe - Samples fallen aus, Schritte gehen verloren. Der Worker-Prozess macht
+nur I2C + Auswertung mit fester Taktung; der Hauptprozess liest die Samples ohne Kopie
+direkt aus dem Ring (multiprocessing.shared_memory).
+
+    Ring:  [head: uint64][Slot 0: float64 × fields][Slot 1] ...
+    head = Anzahl geschriebener Samples (genau ein Schreiber), Slot = head % capacity
+    Feld 0 jedes Samples ist der Zeitstempel (time.time()), danach die Werte des Samplers
+
+Sampler: Objekt mit open(), sample(now) → Tupel oder None, close() - läuft im Worker.
+
+Alle Sampler eines Programms teilen sich einen Worker-Prozess (SensorHost, ein Thread
+pro Sampler) und damit einen I2C-Arbiter (hardware/i2c_bus.py) - Priorität und
+Bündelung gelten über alle Geräte am Bus. Kommt ein Sampler dazu (beim Programmstart),
+startet der Worker mit allen Samplern neu; die Ringe bleiben erhalten.
+"""
+
+import multiprocessing
+import os
+import signal
+import time
+from multiprocessing import shared_memory
+from threading import Lock, Thread
+
+from hardware.i2c_bus import I2CBus
+
+HEADER = 8           # head (uint64)
+TIMESTAMP = 0        # Index des Zeitstempels in jedem Sample
+
+
+def _context():
+    """fork wenn möglich (schnell, erbt Treiber/Patches), sonst spawn"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+
+
+class SensorRing:
+    """Ringpuffer fester Größe im Shared Memory - ein Schreiber, beliebig viele Leser"""
+
+    def __init__(self, fields, capacity=1024, name=None):
+        self.fields = fields
+        self.capacity = capacity
+        self.owner = name is None
+        size = HEADER + capacity * fields * 8
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self._head = self.shm.buf[:HEADER].cast('Q')
+        self.data = self.shm.buf[HEADER:size].cast('d')
+        if self.owner:
+            self._head[0] = 0
+
+    def __reduce__(self):
+        # spawn: im Worker per Name wieder anhängen
+        return SensorRing, (self.fields, self.capacity, self.shm.name)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def head(self):
+        return self._head[0]
+
+    # ===== SCHREIBEN (Worker) =====
+
+    def append(self, values):
+        head = self._head[0]
+        start = (head % self.capacity) * self.fields
+        for i, value in enumerate(values):
+            self.data[start + i] = value
+        self._head[0] = head + 1   # erst nach dem Slot veröffentlichen
+
+    # ===== LESEN (Hauptprozess) =====
+
+    def slot(self, index):
+        """Sample Nr. index als memoryview auf den Ring (ohne Kopie)"""
+        start = (index % self.capacity) * self.fields
+        return self.data[start:start + self.fields]
+
+    def latest(self):
+        """Letztes Sample oder None"""
+        head = self.head
+        return self.slot(head - 1) if head else None
+
+    def read_since(self, cursor):
+        """Samples seit cursor → (neuer cursor, [memoryview]); nach Überlauf nur die noch gültigen.
+        Die Views gelten, bis der Schreiber den Ring einmal umrundet hat."""
+        head = self.head
+        first = max(cursor, head - self.capacity + 1)   # Slot head % capacity wird gerade beschrieben
+        return head, [self.slot(i) for i in range(first, head)]
+
+    def close(self, unlink=None):
+        for view in (self._head, self.data):
+            view.release()
+        try:
+            self.shm.close()
+        except BufferError:
+            pass   # Leser halten noch Views - Mapping verschwindet mit dem Prozess
+        if self.owner if unlink is None else unlink:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class SensorHost:
+    """Ein Worker-Prozess für alle Sampler - ein Bus-Handle und ein Arbiter für alle Geräte"""
+
+    _shared = None
+    _shared_lock = Lock()
+
+    def __init__(self):
+        self.ctx = _context()
+        self.members = []               # SensorProcess
+        self.restart_event = None       # gesetzt = laufender Worker soll für einen Neustart enden
+        self.process = None
+        self.lock = Lock()
+
+    @classmethod
+    def shared(cls):
+        """Gemeinsamer Host pro Programm"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process else None
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def add(self, member):
+        """Sampler aufnehmen - der Worker startet mit allen (noch laufenden) Samplern neu"""
+        with self.lock:
+            self.members = [m for m in self.members if not m.stop_event.is_set()] + [member]
+            self._stop_worker()
+            self.restart_event = self.ctx.Event()
+            members = [(m.name, m.sampler, m.ring, m.interval, m.active, m.stop_event) for m in self.members]
+            self.process = self.ctx.Process(
+                target=_host, name='sensor-process', daemon=True,
+                args=(members, self.restart_event)
+            )
+            self.process.start()
+
+    def remove(self, member, timeout=2.0):
+        """Sampler beenden (sein Thread endet) - der Worker endet mit dem letzten"""
+        with self.lock:
+            if member in self.members:
+                self.members.remove(member)
+            if not self.members:
+                self._stop_worker(timeout)
+
+    def _stop_worker(self, timeout=2.0):
+        if not self.process:
+            return
+        self.restart_event.set()
+        self.process.join(timeout=timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process = None
+
+
+class SensorProcess:
+    def __init__(self, name, sampler, fields, interval, capacity=1024, host=None):
+        """fields = Anzahl Werte pro sample() (ohne Zeitstempel), interval in Sekunden"""
+        self.host = host or SensorHost.shared()
+        ctx = self.host.ctx
+        self.name = name
+        self.sampler = sampler
+        self.interval = interval
+        self.ring = SensorRing(fields + 1, capacity)
+        self.active = ctx.Event()       # gesetzt = Worker sampelt
+        self.stop_event = ctx.Event()
+        self.started = False
+
+    def start(self, active=True):
+        if active:
+            self.active.set()
+        self.host.add(self)
+        self.started = True
+        print(f"🧵 {self.name}: im Sensor-Prozess (PID {self.host.pid}, {1 / self.interval:.0f} Hz)")
+        return self
+
+    def resume(self):
+        self.active.set()
+
+    def pause(self):
+        self.active.clear()
+
+    @property
+    def alive(self):
+        return self.started and not self.stop_event.is_set() and self.host.alive
+
+    def latest(self):
+        return self.ring.latest()
+
+    def stop(self, timeout=2.0):
+        self.stop_event.set()
+        self.active.set()   # pausierten Sampler aufwecken
+        if self.started:
+            self.host.remove(self, timeout)
+            self.started = False
+        self.ring.close()
+
+
+def _host(members, restart_event):
+    """Worker-Prozess: ein Thread pro Sampler, alle am selben I2CBus-Arbiter"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # Ctrl+C: Hauptprozess beendet uns per stop()
+    parent = os.getppid()
+    threads = [
+        Thread(target=_run, name=name, daemon=True,
+               args=(sampler, ring, interval, active, stop_event, restart_event, parent))
+        for name, sampler, ring, interval, active, stop_event in members
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for bus in I2CBus._instances.values():
+        bus.print_stats()
+
+
+def _run(sampler, ring, interval, active, stop_event, restart_event, parent):
+    """Sampler-Thread: feste Taktung per Deadline - Verzögerungen werden nicht nachgeholt"""
+    try:
+        sampler.open()
+        next_at = time.monotonic()
+        while not stop_event.is_set() and not restart_event.is_set() and os.getppid() == parent:
+            if not active.is_set():
+                active.wait(0.5)
+                next_at = time.monotonic()
+                continue
+
+            now = time.time()
+            try:
+                values = sampler.sample(now)
+            except Exception:
+                values = None
+            if values is not None:
+                ring.append((now, *values))
+
+            next_at += interval
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_at = time.monotonic()
+    finally:
+        sampler.close()
+        ring.close(unlink=False)
@@ -4,13 +4,14 @@ PORT: I2C (einer der I2C Port)
 """
 
 import time
-from threading import Thread
+from threading import Thread, Lock
 
-try:
-    from smbus2 import SMBus
-    I2C_AVAILABLE = True
-except ImportError:
-    I2C_AVAILABLE = False
+import config
+from database.step_timeline import StepTimeline
+from hardware.i2c_bus import I2CBus, I2C_AVAILABLE, PRIORITY_ACCEL
+from hardware.sensor_process import SensorProcess
+
+if not I2C_AVAILABLE:
     print("⚠️  smbus2 nicht installiert - pip install smbus2")
 
 # BMA456 Konstanten
@@ -27,9 +28,120 @@ REG_PWR_CONF = 0x7C
 REG_PWR_CTRL = 0x7D
 REG_CMD = 0x7E
 
+# Power-Modi: (PWR_CONF, PWR_CTRL, ACC_CONF) - None = Register unverändert
+# PWR_CONF 0x03 = Advanced Power Save + FIFO Self-Wakeup, PWR_CTRL 0x04 = Accelerometer an
+POWER_MODES = {
+    "active":    (0x00, 0x04, 0xA8),   # 100 Hz, Performance-Filter (Schrittzählung)
+    "low_power": (0x03, 0x04, 0x05),   # 12.5 Hz, Averaging, Advanced Power Save
+    "suspend":   (0x03, 0x00, None),   # Accelerometer aus
+}
+POWER_WRITE_DELAY = 0.00045  # Datenblatt: 450µs zwischen Writes bei Advanced Power Save
+
+# Schritt-Erkennung (Peak Detection) ohne Hardware-Zugriff,
+# damit sie auch mit simulierten Daten gebenchmarkt werden kann
+class StepDetector:
+    def __init__(self, step_threshold=0.12, min_step_interval=0.35,
+                 history_size=5, baseline_window=100):
+        # Schritt-Erkennung
+        self.step_threshold = step_threshold        # Abweichung von Baseline
+        self.min_step_interval = min_step_interval  # Min Zeit zwischen Schritten
+        self.last_step_time = 0
+        self.peak_detected = False
+        
+        # Glättung
+        self.mag_history = []
+        self.history_size = history_size
+        self.smoothed = 1.0
+        
+        # Dynamische Baseline
+        self.baseline_samples = []
+        self.baseline_window = baseline_window
+        self.baseline = 1.0
+        self.deviation = 0.0
+    
+    # Verarbeitet ein Sample (x, y, z in g) - True wenn Schritt erkannt
+    def update(self, accel, current_time):
+        x, y, z = accel
+        magnitude = (x**2 + y**2 + z**2) ** 0.5
+        
+        # Baseline tracken
+        self.baseline_samples.append(magnitude)
+        if len(self.baseline_samples) > self.baseline_window:
+            self.baseline_samples.pop(0)
+        self.baseline = sum(self.baseline_samples) / len(self.baseline_samples)
+        
+        # Glätten
+        self.mag_history.append(magnitude)
+        if len(self.mag_history) > self.history_size:
+            self.mag_history.pop(0)
+        self.smoothed = sum(self.mag_history) / len(self.mag_history)
+        
+        self.deviation = self.smoothed - self.baseline
+        
+        # Peak Detection
+        if self.deviation > self.step_threshold:
+            self.peak_detected = True
+        elif self.peak_detected and self.deviation < self.step_threshold * 0.3:
+            self.peak_detected = False
+            if current_time - self.last_step_time > self.min_step_interval:
+                self.last_step_time = current_time
+                return True
+        
+        return False
+
+
+# Rohdaten (6 Bytes ab REG_ACC_X_LSB) → Beschleunigung in g
+def decode_acceleration(data, acc_range):
+    # 16-bit signed, Little Endian
+    x_raw = (data[1] << 8) | data[0]
+    y_raw = (data[3] << 8) | data[2]
+    z_raw = (data[5] << 8) | data[4]
+    
+    # Two's complement für signed
+    if x_raw > 32767: x_raw -= 65536
+    if y_raw > 32767: y_raw -= 65536
+    if z_raw > 32767: z_raw -= 65536
+    
+    # Angepasste Skalierung!
+    # BMA456: 16-bit signed, Full Scale = ±range
+    # Bei ±4g: 32768 LSB = 4g → 1g = 8192 LSB
+    # scale = range / 32768
+    scale = acc_range / 32768.0
+    
+    return (x_raw * scale, y_raw * scale, z_raw * scale)
+
+
+# Läuft im Sensor-Prozess: BMA456 lesen + Schritte erkennen → (x, y, z, Schritte gesamt)
+class StepSampler:
+    FIELDS = 4
+    STEPS = 4   # Index der Schrittsumme im Ring-Sample (Feld 0 = Zeitstempel)
+    
+    def __init__(self, i2c_addr, acc_range):
+        self.i2c_addr = i2c_addr
+        self.acc_range = acc_range
+        self.bus = None
+        self.detector = None
+        self.steps = 0
+    
+    def open(self):
+        self.bus = I2CBus.get(1)   # Bus-Handle des Sensor-Prozesses
+        self.bus.register(self.i2c_addr, "BMA456")
+        self.detector = StepDetector()
+    
+    def sample(self, now):
+        data = self.bus.read_block(self.i2c_addr, REG_ACC_X_LSB, 6, PRIORITY_ACCEL)
+        accel = decode_acceleration(data, self.acc_range)
+        if self.detector.update(accel, now):
+            self.steps += 1
+        return (*accel, self.steps)
+    
+    def close(self):
+        pass   # Bus-Statistik druckt der Sensor-Prozess (alle Geräte am Arbiter)
+
+
 # Step Counter für Grove BMA456
 class StepCounter:
-    def __init__(self):
+    def __init__(self, sampling_process=None):
         self._steps = 0
         self.running = False
         self._thread = None
@@ -37,27 +149,44 @@ class StepCounter:
         self.i2c_addr = None
         self._debug = False
         self._acc_range = 4  # ±4g default
+        self._process = None   # SensorProcess (SENSOR_PROCESS=true)
+        self._baseline = 0     # Schrittsumme des Prozesses beim Start/Reset
+        self._cursor = 0       # Ring-Position bis zu der Schritte in die Zeitleiste übernommen sind
+        self._last_total = 0
+        self._lock = Lock()
+        self.timeline = StepTimeline(time.time())   # Zeitstempel jedes Schritts (delta-kodiert)
+        self.power_mode = None # active / low_power / suspend (POWER_MODES)
         
         if not I2C_AVAILABLE:
             print("⚠️  Step Counter im Dummy-Modus (smbus2 fehlt)")
             return
         
         self._init_bma456()
+        self.set_power_mode(config.STEP_IDLE_POWER)   # bis zur ersten Pause schlafen
+        
+        if sampling_process is None:
+            sampling_process = config.SENSOR_PROCESS
+        if sampling_process and self.sensor_type == "BMA456":
+            self._process = SensorProcess(
+                'step-sampler', StepSampler(self.i2c_addr, self._acc_range),
+                StepSampler.FIELDS, 1.0 / config.STEP_SAMPLE_RATE
+            ).start(active=False)
 
     # Sucht und initialisiert BMA456
     def _init_bma456(self):
         try:
+            bus = I2CBus.get(1)
             for addr in [BMA456_ADDR_LOW, BMA456_ADDR_HIGH]:
                 try:
-                    with SMBus(1) as bus:
-                        chip_id = bus.read_byte_data(addr, REG_CHIP_ID)
-                        
-                        if chip_id == BMA456_CHIP_ID:
-                            self.i2c_addr = addr
-                            self.sensor_type = "BMA456"
-                            print(f"✅ BMA456 gefunden auf 0x{addr:02X} (Chip ID: 0x{chip_id:02X})")
-                            self._configure_sensor()
-                            return
+                    chip_id = bus.read_byte(addr, REG_CHIP_ID)
+                    
+                    if chip_id == BMA456_CHIP_ID:
+                        self.i2c_addr = addr
+                        self.sensor_type = "BMA456"
+                        bus.register(addr, "BMA456")
+                        print(f"✅ BMA456 gefunden auf 0x{addr:02X} (Chip ID: 0x{chip_id:02X})")
+                        self._configure_sensor()
+                        return
                 except OSError:
                     pass
             
@@ -68,21 +197,40 @@ class StepCounter:
             print(f"⚠️  I2C Fehler: {e}")
             self.sensor_type = "Dummy"
     
-    # Sicheres I2C Schreiben mit Retry
-    def _i2c_write(self, reg, value):
-        for attempt in range(3):
-            try:
-                with SMBus(1) as bus:
-                    bus.write_byte_data(self.i2c_addr, reg, value)
-                time.sleep(0.02)  # 20ms Pause nach jedem Schreiben
-                return True
-            except OSError as e:
-                if attempt < 2:
-                    time.sleep(0.05)
-                else:
-                    print(f"⚠️  I2C Write Fehler Reg 0x{reg:02X}: {e}")
-                    return False
-        return False
+    # Sicheres I2C Schreiben mit Retry (Backoff + Pause laufen außerhalb des Busses)
+    def _i2c_write(self, reg, value, settle=0.02):
+        try:
+            I2CBus.get(1).write_byte(self.i2c_addr, reg, value, retries=3, retry_delay=0.05)
+        except OSError as e:
+            print(f"⚠️  I2C Write Fehler Reg 0x{reg:02X}: {e}")
+            return False
+        time.sleep(settle)  # Standard: 20ms Pause nach jedem Schreiben
+        return True
+    
+    # Power State Machine: active während der Pause, sonst STEP_IDLE_POWER
+    def set_power_mode(self, mode):
+        if mode not in POWER_MODES:
+            print(f"⚠️  Unbekannter Power-Modus '{mode}' - bleibe {self.power_mode}")
+            return False
+        if not self.i2c_addr or mode == self.power_mode:
+            return True
+        
+        pwr_conf, pwr_ctrl, acc_conf = POWER_MODES[mode]
+        if mode == "active":
+            # Aufwachen: erst Power Save aus, dann Filter/ODR, zuletzt Accelerometer an
+            writes = [(REG_PWR_CONF, pwr_conf), (REG_ACC_CONF, acc_conf), (REG_PWR_CTRL, pwr_ctrl)]
+        else:
+            # Schlafen: Accelerometer runterfahren, Power Save zuletzt
+            writes = [(REG_ACC_CONF, acc_conf), (REG_PWR_CTRL, pwr_ctrl), (REG_PWR_CONF, pwr_conf)]
+        
+        started = time.perf_counter()
+        for reg, value in writes:
+            if value is not None and not self._i2c_write(reg, value, settle=POWER_WRITE_DELAY):
+                self.power_mode = None   # Zustand unbekannt → nächster Wechsel schreibt alles
+                return False
+        self.power_mode = mode
+        print(f"🔋 BMA456: {mode} ({(time.perf_counter() - started) * 1000:.1f} ms)")
+        return True
     
     # Konfiguriert BMA456 mit korrektem Timing
     def _configure_sensor(self):
@@ -115,6 +263,7 @@ class StepCounter:
             if not self._i2c_write(REG_ACC_RANGE, 0x01):
                 return
             self._acc_range = 4
+            self.power_mode = "active"
             
             time.sleep(0.05)
             print(f"✅ BMA456 konfiguriert (100Hz, ±{self._acc_range}g)")
@@ -128,31 +277,9 @@ class StepCounter:
             return None
         
         try:
-            with SMBus(1) as bus:
-                data = bus.read_i2c_block_data(self.i2c_addr, REG_ACC_X_LSB, 6)
-                
-                # 16-bit signed, Little Endian
-                x_raw = (data[1] << 8) | data[0]
-                y_raw = (data[3] << 8) | data[2]
-                z_raw = (data[5] << 8) | data[4]
-                
-                # Two's complement für signed
-                if x_raw > 32767: x_raw -= 65536
-                if y_raw > 32767: y_raw -= 65536
-                if z_raw > 32767: z_raw -= 65536
-                
-                # Angepasste Skalierung!
-                # BMA456: 16-bit signed, Full Scale = ±range
-                # Bei ±4g: 32768 LSB = 4g → 1g = 8192 LSB
-                # scale = range / 32768
-                scale = self._acc_range / 32768.0
-                
-                x = x_raw * scale
-                y = y_raw * scale
-                z = z_raw * scale
-                
-                return (x, y, z)
-                
+            data = I2CBus.get(1).read_block(self.i2c_addr, REG_ACC_X_LSB, 6, PRIORITY_ACCEL)
+            return decode_acceleration(data, self._acc_range)
+            
         except Exception:
             return None
     
@@ -161,8 +288,16 @@ class StepCounter:
         
         self._steps = 0
         self.running = True
+        self.set_power_mode("active")
+        self.timeline = StepTimeline(time.time())
         
-        if self.sensor_type == "BMA456":
+        if self._process:
+            with self._lock:
+                self._cursor = self._process.ring.head
+                self._last_total = self._baseline = self._process_total()
+            self._process.resume()
+            print("🚶 Step Counter (BMA456, Sensor-Prozess) gestartet")
+        elif self.sensor_type == "BMA456":
             self._thread = Thread(target=self._count_steps_loop, daemon=True)
             self._thread.start()
             print("🚶 Step Counter (BMA456) gestartet")
@@ -172,59 +307,26 @@ class StepCounter:
     # Verbesserte Schrittzählung
     def _count_steps_loop(self):
         
-        # Glättung
-        mag_history = []
-        history_size = 5
+        detector = StepDetector()
         
-        # Dynamische Baseline
-        baseline_samples = []
-        baseline_window = 100
-        baseline = 1.0
-        
-        # Schritt-Erkennung
-        step_threshold = 0.12      # Abweichung von Baseline
-        min_step_interval = 0.35   # Min Zeit zwischen Schritten
-        last_step_time = 0
-        peak_detected = False
-        
-        print(f"📊 Schritt-Erkennung (Threshold: ±{step_threshold}g)")
+        print(f"📊 Schritt-Erkennung (Threshold: ±{detector.step_threshold}g)")
         
         while self.running:
             try:
                 accel = self._read_acceleration()
                 
                 if accel:
-                    x, y, z = accel
-                    magnitude = (x**2 + y**2 + z**2) ** 0.5
-                    
-                    # Baseline tracken
-                    baseline_samples.append(magnitude)
-                    if len(baseline_samples) > baseline_window:
-                        baseline_samples.pop(0)
-                    baseline = sum(baseline_samples) / len(baseline_samples)
-                    
-                    # Glätten
-                    mag_history.append(magnitude)
-                    if len(mag_history) > history_size:
-                        mag_history.pop(0)
-                    smoothed = sum(mag_history) / len(mag_history)
-                    
-                    deviation = smoothed - baseline
-                    current_time = time.time()
+                    now = time.time()
+                    step = detector.update(accel, now)
                     
                     if self._debug:
-                        print(f"M:{smoothed:.2f} B:{baseline:.2f} D:{deviation:+.3f}")
+                        print(f"M:{detector.smoothed:.2f} B:{detector.baseline:.2f} D:{detector.deviation:+.3f}")
                     
-                    # Peak Detection
-                    if deviation > step_threshold:
-                        peak_detected = True
-                    elif peak_detected and deviation < step_threshold * 0.3:
-                        if current_time - last_step_time > min_step_interval:
-                            self._steps += 1
-                            last_step_time = current_time
-                            if self._debug:
-                                print(f"  → STEP #{self._steps}")
-                        peak_detected = False
+                    if step:
+                        self._steps += 1
+                        self.timeline.add(now)
+                        if self._debug:
+                            print(f"  → STEP #{self._steps}")
                 
                 time.sleep(0.02)
                 
@@ -235,26 +337,56 @@ class StepCounter:
     def stop(self):
         
         self.running = False
+        if self._process:
+            self._process.pause()
         if self._thread:
             self._thread.join(timeout=1.0)
             self._thread = None
-        steps = self._steps
+        steps = self.read()
+        self.set_power_mode(config.STEP_IDLE_POWER)
         print(f"⏹️  Step Counter gestoppt: {steps} Schritte")
         return steps
     
+    # Schrittsumme aus dem Shared-Memory-Ring (letztes Sample, ohne Kopie)
+    def _process_total(self):
+        latest = self._process.latest()
+        return int(latest[StepSampler.STEPS]) if latest else 0
+    
+    # Neue Ring-Samples durchgehen: jeder Anstieg der Schrittsumme → Zeitstempel in die Zeitleiste
+    def _collect_steps(self):
+        with self._lock:
+            self._cursor, samples = self._process.ring.read_since(self._cursor)
+            for sample in samples:
+                total = int(sample[StepSampler.STEPS])
+                for _ in range(total - self._last_total):
+                    self.timeline.add(sample[0])
+                self._last_total = max(self._last_total, total)
+            return self._last_total
+    
     def read(self):
+        if self._process:
+            self._steps = self._collect_steps() - self._baseline
         return self._steps
     
     def reset(self):
         self._steps = 0
+        if self._process:
+            self._baseline = self._collect_steps()
+        self.timeline = StepTimeline(time.time())
         print("🔄 Step Counter zurückgesetzt")
     
     def get_count(self):
-        return self._steps
+        return self.read()
     
     @property
     def current_steps(self):
-        return self._steps
+        return self.read()
+    
+    # Sensor-Prozess beenden (Shared Memory freigeben)
+    def close(self):
+        if self._process:
+            self._process.stop()
+            self._process = None
     
     # Debug: Rohdaten
     def get_raw_acceleration(self):
@@ -283,6 +415,7 @@ if __name__ == "__main__":
     counter = StepCounter()
     
     if counter.sensor_type == "BMA456":
+        counter.set_power_mode("active")
         print("\n📊 Rohdaten (5s) - Sensor ruhig halten:")
         print("-"*50)
         
@@ -308,6 +441,7 @@ if __name__ == "__main__":
             print(f"   [{i+1:2d}s] Schritte: {counter.read()}")
         
         final = counter.stop()
+        counter.close()
         print(f"\n✅ Ergebnis: {final} Schritte")
     else:
         print("❌ Sensor nicht gefunden")
\ No newline at end of file
@@ -19,8 +19,17 @@ from threading import Thread, Event
 import config
 from hardware import Button1, Button2, LED, Buzzer, CO2Sensor
 from services.timer_service import TimerService
+from services.session_events import (SessionEvents, SESSION_STARTED, WORK_STARTED, WORK_ENDED,
+                                     BREAK_STARTED, BREAK_ENDED, CANCELLED, ENDED, boot_id)
 from services.discord_templates import NotificationService
+from services.checkpoint import SessionCheckpoint, close_orphaned_sessions, phase_elapsed, state_from_checkpoint
+from services.command_queue import CommandQueue
+from services.peer_link import PeerLink
+from services.write_behind import WriteBehind
+from services.local_store import LocalStore
+from services.clock_sync import ClockSync, wall_clock_synchronized
 from database.supabase_manager import SupabaseManager
+from database.co2_batches import Co2Batcher
 
 # ============================================================
 # GPIO CLEANUP - Ressourcen vor Start freigeben
@@ -73,6 +82,18 @@ class LearningSession:
         self.notify = NotificationService()
         self.db = SupabaseManager()
         self.timer = TimerService(self.db, self.notify)
+        self.store = LocalStore().open()                # Checkpoint + Write-Queue lokal (Group Commit)
+        self.writer = WriteBehind('supabase', store=self.store, target=self.db,
+                                  max_attempts=config.WRITE_BEHIND_MAX_ATTEMPTS,
+                                  max_age=config.WRITE_BEHIND_MAX_AGE).start()   # DB-Writes im Hintergrund
+        self.co2_batches = Co2Batcher(self.db, writer=self.writer)   # CO2 gepackt statt Zeile pro Messung
+        self.peer = PeerLink.from_config()               # Events direkt an PiTop 2 (LAN)
+        if self.peer:
+            ClockSync(self.peer)                         # beantwortet Uhren-Pings von PiTop 2
+            self.peer = self.peer.start()
+        self.events = SessionEvents(self.db, peer=self.peer, writer=self.writer)
+        self.checkpoint = SessionCheckpoint(db=self.db, store=self.store)   # Wiederaufnahme nach Absturz
+        self.commands = CommandQueue('buttons').start()   # Button-Aktionen laufen im Worker
         
         # State Machine
         # IDLE = Bereit für neue Session
@@ -87,6 +108,9 @@ class LearningSession:
         # Timer Control
         self.timer_stop_event = Event()
         self.timer_thread = None
+        self.phase_started_at = None   # Wanduhr-Start der laufenden Phase (Events, PiTop 2)
+        self.phase_started_mono = None # monotoner Start - Timer laufen unabhängig von NTP-Sprüngen
+        self.last_checkpoint = 0.0
         
         # Action History für Storno
         self.action_history = []
@@ -108,13 +132,17 @@ class LearningSession:
         self.button1.set_work_active_check(self._is_work_active)
         self.button2.set_work_active_check(self._is_work_active)
         
+        # Alle Aktionen über die Command Queue: GPIO-Callback quittiert nur (Klick)
+        # und kehrt sofort zurück, DB/Discord laufen im Worker
+        command = lambda cb: self.commands.wrap(cb, ack=self.buzzer.click)
+        
         # Button 1: Arbeitsphase starten (wenn IDLE oder WORK_DONE)
-        self.button1.on_short_press(self._on_button1_press)
+        self.button1.on_short_press(command(self._on_button1_press))
         
         # Button 2: Pause, Storno, Session beenden
-        self.button2.on_short_press(self._start_break)
-        self.button2.on_cancel(self._cancel_last_action)
-        self.button2.on_end_session(self._end_session)
+        self.button2.on_short_press(command(self._start_break))
+        self.button2.on_cancel(command(self._cancel_last_action))
+        self.button2.on_end_session(command(self._end_session))
     
     def _is_work_active(self):
         """Prüft ob gerade eine Arbeitsphase läuft"""
@@ -157,14 +185,24 @@ class LearningSession:
         
         # CO2 Counter zurücksetzen
         self.co2_log_counter = 0
+        self.phase_started_at = time.time()
+        self.phase_started_mono = time.monotonic()
         
         # Session in DB erstellen (nur wenn noch keine existiert)
         if not self.session_id:
-            self.session_id = self.db.create_session()
+            # ID lokal erzeugen - der Insert läuft im Hintergrund (auch bei Internet-Ausfall)
+            session = self.db.new_session()
+            self.session_id = session['session_id']
+            if self.db.client:
+                self.writer.submit('session', self.db.insert_session, session)
             self.timer.set_session_id(self.session_id)
+            self.events.emit(self.session_id, SESSION_STARTED, user_name=config.USER_NAME)
             # Discord nur bei erster Arbeitsphase
             self.notify.send_session_start()
         
+        self.events.emit(self.session_id, WORK_STARTED)
+        self._save_checkpoint()
+        
         # UI Feedback
         self.buzzer.beep(0.2)
         
@@ -175,9 +213,9 @@ class LearningSession:
     def _run_work_timer(self):
         """⏱️ Work Timer: 30 Minuten (läuft im separaten Thread)"""
         
-        start_time = time.time()
+        start_time = self.phase_started_mono
         
-        while time.time() - start_time < WORK_DURATION:
+        while time.monotonic() - start_time < WORK_DURATION:
             # Prüfen ob Timer gestoppt werden soll (Storno/Session Ende)
             if self.timer_stop_event.is_set():
                 print("\n⚠️ Timer wurde gestoppt")
@@ -188,7 +226,7 @@ class LearningSession:
                 print("\n⚠️ Arbeitsphase wurde unterbrochen")
                 return
             
-            elapsed = time.time() - start_time
+            elapsed = time.monotonic() - start_time
             remaining = WORK_DURATION - elapsed
             
             # CO2 während Arbeit überwachen
@@ -215,12 +253,15 @@ class LearningSession:
         
         # Speichere Arbeitszeit
         self.total_work_time += WORK_DURATION
+        self.events.emit(self.session_id, WORK_ENDED)
         
         # Buzzer Signal
         self.buzzer.long_beep(1.0)
         
         # State auf WORK_DONE - wartet auf User-Entscheidung
         self.state = "WORK_DONE"
+        self.phase_started_at = None
+        self._save_checkpoint()
         
         print("\n🎯 WÄHLE DEINE NÄCHSTE AKTION:")
         print("  ┌─────────────────────────────────────────────┐")
@@ -260,6 +301,8 @@ class LearningSession:
         print("\n📡 Signalisiere Break an PiTop 2...")
         
         self.state = "BREAK"
+        self.phase_started_at = time.time()
+        self.phase_started_mono = time.monotonic()
         
         # Timer-Stop Event zurücksetzen
         self.timer_stop_event.clear()
@@ -270,45 +313,33 @@ class LearningSession:
             'time': time.time()
         })
         
+        # break_started Event ZUERST (Peer Link → PiTop 2 sofort, Supabase im Hintergrund)
+        # started_at/deadline: PiTop 2 plant das Pausenende gegen diese Zeiten (services/clock_sync.py)
+        self.events.emit(self.session_id, BREAK_STARTED, started_at=self.phase_started_at,
+                         deadline=self.phase_started_at + BREAK_DURATION)
+        print("✅ Event: break_started (PiTop 2 sollte jetzt reagieren)")
+        self._save_checkpoint()
+        self.co2_batches.flush()   # Arbeitsphase komplett in der DB
+        
         # UI Feedback
         self.buzzer.beep(0.2)
         
         # Discord
         self.notify.send_work_finished()
-
-        # DB: Pause Count erhöhen
-        self.db.increment_pause_count(self.session_id)
-
-        # DB-Status update
-        self._update_break_status('break')
         
         # Break-Timer in separatem Thread starten
         break_thread = Thread(target=self._run_break_timer, daemon=True)
         break_thread.start()
     
-    def _update_break_status(self, status):
-        if not self.db.client or not self.session_id:
-            return
-        
-        try:
-            self.db.client.table('sessions').update({
-                'timer_status': status
-            }).eq('session_id', self.session_id).execute()
-            
-            print(f"✅ DB Status: {status} (PiTop 2 sollte jetzt reagieren)")
-        
-        except Exception as e:
-            print(f"⚠️ Status-Update Fehler: {e}")
-    
     def _run_break_timer(self):
         """⏱️ Break Timer: 10 Minuten (läuft im separaten Thread)"""
         
         print(f"\n⏱️ Break-Timer: {BREAK_DURATION // 60} Minuten")
         print("👣 PiTop 2 zählt jetzt Schritte...\n")
         
-        start_time = time.time()
+        start_time = self.phase_started_mono
         
-        while time.time() - start_time < BREAK_DURATION:
+        while time.monotonic() - start_time < BREAK_DURATION:
             # Prüfen ob Timer gestoppt werden soll
             if self.timer_stop_event.is_set():
                 print("\n⚠️ Break wurde gestoppt")
@@ -319,7 +350,7 @@ class LearningSession:
                 print("\n⚠️ Pause wurde unterbrochen")
                 return
             
-            elapsed = time.time() - start_time
+            elapsed = time.monotonic() - start_time
             remaining = BREAK_DURATION - elapsed
             
             # Fortschritt anzeigen
@@ -328,7 +359,8 @@ class LearningSession:
             print(f"\r⏱️ Pause: {remaining_min:02d}:{remaining_sec:02d} verbleibend   ", 
                   end='', flush=True)
             
-            sleep(1)
+            # Bis auf die Deadline genau (PiTop 2 endet zur selben Zeit)
+            sleep(min(1, max(0, remaining)))
         
         # Timer regulär abgelaufen
         if self.state == "BREAK":
@@ -348,13 +380,15 @@ class LearningSession:
         self.buzzer.beep(0.1)
         
         # Update DB
-        self._update_break_status('work_ready')
+        self.events.emit(self.session_id, BREAK_ENDED)
         
         # Discord
         self.notify.send_break_finished()
         
         # State auf IDLE - bereit für nächste Aktion
         self.state = "IDLE"
+        self.phase_started_at = None
+        self._save_checkpoint()
         
         print("\n🎯 WÄHLE DEINE NÄCHSTE AKTION:")
         print("  ┌─────────────────────────────────────────────┐")
@@ -384,6 +418,7 @@ class LearningSession:
         
         last_action = self.action_history.pop()
         action_type = last_action['type']
+        self.events.emit(self.session_id, CANCELLED, action=action_type)
         
         if action_type == 'work_start':
             print("↩️ Arbeitsphase storniert")
@@ -396,8 +431,9 @@ class LearningSession:
         elif action_type == 'break_start':
             print("↩️ Pause storniert")
             self.state = "WORK_DONE"
-            self._update_break_status('work_ready')
         
+        self.phase_started_at = None
+        self._save_checkpoint()
         self.buzzer.beep(0.1)
         
         print(f"✅ Storno abgeschlossen - Status: {self.state}")
@@ -441,12 +477,14 @@ class LearningSession:
         
         # Report aus DB holen
         if self.session_id:
-            # 1. ZUERST Session in DB beenden (Daten schreiben)
-            self.db.end_session(
-                self.session_id,
-                self.total_work_time,
-                self.total_break_time
-            )
+            # 1. ZUERST Session in DB beenden (Event + Endsumme in sessions)
+            state = self.events.emit(self.session_id, ENDED)
+            self.co2_batches.flush()   # Report braucht alle Messungen
+            if self.db.client:
+                self.writer.submit('end_session', self.db.end_session, self.session_id,
+                                   self.total_work_time, self.total_break_time, state.pause_count)
+                if not self.writer.flush(timeout=10):
+                    print(f"⚠️ {self.writer.pending} DB-Write(s) noch offen - Report evtl. unvollständig")
 
             # 2. DANN Report holen (mit aktuellen Daten aus DB)
             report_data = self.db.get_session_report_data(self.session_id)
@@ -457,7 +495,9 @@ class LearningSession:
                 self.notify.send_session_report(report_data)
         
         # Reset für neue Session
+        self.checkpoint.clear()
         self.session_id = None
+        self.phase_started_at = None
         self.total_work_time = 0
         self.total_break_time = 0
         self.co2_log_counter = 0
@@ -469,6 +509,102 @@ class LearningSession:
         print("👉 Drücke Button 1 um neue Session zu starten")
         print("="*60 + "\n")
     
+    # ═══════════════════════════════════════════════════════════════
+    # CHECKPOINT / WIEDERAUFNAHME
+    # ═══════════════════════════════════════════════════════════════
+    
+    def _save_checkpoint(self):
+        """Zustand lokal sichern - bei jedem Zustandswechsel (kein Polling)"""
+        if not self.session_id:
+            self.checkpoint.clear()
+            return
+        
+        state = self.events.state(self.session_id)
+        running = self.phase_started_at and self.phase_started_mono is not None
+        self.last_checkpoint = time.monotonic()
+        self.checkpoint.save(
+            session_id=self.session_id,
+            state=self.state,
+            phase_started_at=self.phase_started_at,
+            phase_elapsed=self.last_checkpoint - self.phase_started_mono if running else None,
+            phase_event=state.phase_start if state else None,
+            work_duration=WORK_DURATION,
+            break_duration=BREAK_DURATION,
+            total_work_time=self.total_work_time,
+            total_break_time=self.total_break_time,
+            pause_count=state.pause_count if state else 0,
+            action_history=self.action_history,
+            timer=self.timer.get_session_stats()
+        )
+    
+    def _resume_session(self):
+        """Laufende Session aus dem Checkpoint fortsetzen, verwaiste Sessions schließen"""
+        data = self.checkpoint.load()
+        session_id = data.get('session_id') if data else None
+        
+        state = None
+        if session_id:
+            # Nachgeholte Writes aus dem Local Store zuerst hochladen - sonst fehlen der Projektion
+            # aus der DB die Events vor dem Absturz (z.B. session_ended)
+            if not self.writer.flush(timeout=10):
+                print(f"⚠️  {self.writer.pending} DB-Write(s) noch offen - Session-Stand evtl. unvollständig")
+            state = self.events.resume(session_id, fallback=lambda: state_from_checkpoint(data))
+            # Pausen, deren Events noch in der Queue hängen, stehen schon im Checkpoint
+            state.pause_count = max(state.pause_count, data.get('pause_count', 0))
+        
+        if state and state.is_ended:
+            print(f"ℹ️  Checkpoint-Session {session_id[:8]}... ist bereits beendet")
+            self.checkpoint.clear()
+            session_id = None
+        
+        # Offene Sessions dieses Geräts, die nicht fortgesetzt werden → mit Summen schließen
+        close_orphaned_sessions(self.db, keep_session_id=session_id)
+        
+        if not session_id:
+            return False
+        
+        self.session_id = session_id
+        self.state = data['state']
+        elapsed = phase_elapsed(data)
+        if elapsed is not None:
+            # Start aus den verstrichenen Sekunden zurückrechnen - nicht aus der (evtl. falschen) Wanduhr
+            self.phase_started_mono = time.monotonic() - elapsed
+            self.phase_started_at = time.time() - elapsed
+            if data.get('boot_id') != boot_id() and wall_clock_synchronized() is False:
+                print("ℹ️  Systemuhr nach Neustart noch nicht synchronisiert - Ausfallzeit zählt nicht zur Phase")
+        self.total_work_time = data.get('total_work_time', 0)
+        self.total_break_time = data.get('total_break_time', 0)
+        self.action_history = data.get('action_history', [])
+        self.timer.set_session_id(session_id)
+        self.timer.restore_session_stats(data.get('timer', {}))
+        
+        print("\n" + "="*60)
+        print(f"♻️  SESSION FORTGESETZT: {session_id[:8]}... (Status: {self.state})")
+        print("="*60)
+        
+        # Laufende Phase mit Restzeit fortsetzen (oder sofort abschließen, wenn abgelaufen)
+        if self.state == "WORKING":
+            remaining = WORK_DURATION - elapsed
+            if remaining > 0:
+                print(f"⏱️ Arbeitsphase läuft weiter: noch {int(remaining // 60)} Min")
+                self.timer_stop_event.clear()
+                self.timer_thread = Thread(target=self._run_work_timer, daemon=True)
+                self.timer_thread.start()
+            else:
+                self._work_timer_finished()
+        
+        elif self.state == "BREAK":
+            remaining = BREAK_DURATION - elapsed
+            if remaining > 0:
+                print(f"⏱️ Pause läuft weiter: noch {int(remaining // 60)} Min")
+                self.timer_stop_event.clear()
+                Thread(target=self._run_break_timer, daemon=True).start()
+            else:
+                self._break_timer_finished()
+        
+        self.checkpoint.heartbeat(force=True)
+        return True
+    
     # ═══════════════════════════════════════════════════════════════
     # CO2 MONITORING
     # ═══════════════════════════════════════════════════════════════
@@ -489,12 +625,13 @@ class LearningSession:
             should_log = (self.co2_log_counter >= CO2_LOG_INTERVAL) or is_alarm
             
             if self.session_id and co2_level and should_log:
-                self.db.log_co2(
-                    session_id=self.session_id,
-                    co2_level=co2_level,
+                # Gepackt: ein Insert pro CO2_BATCH_SIZE Messungen (database/co2_batches.py)
+                self.co2_batches.add(
+                    self.session_id,
+                    co2_level,
                     tvoc_level=tvoc_level,
                     is_alarm=is_alarm,
-                    alarm_type=alarm_status if is_alarm else None
+                    is_critical=alarm_status == "critical"
                 )
                 self.co2_log_counter = 0
                 print(f"\n💨 CO2 geloggt: {co2_level} ppm")
@@ -556,13 +693,20 @@ class LearningSession:
         print("   Nach Timer-Ablauf STOPPT das System!")
         print("   Du musst Button drücken für nächste Aktion.")
         
-        print("\n" + "="*60)
-        print("👉 Starte Session mit Button 1!")
-        print("="*60 + "\n")
+        if not self._resume_session():
+            print("\n" + "="*60)
+            print("👉 Starte Session mit Button 1!")
+            print("="*60 + "\n")
         
         try:
             while True:
                 # Hauptschleife - Buttons werden via Callbacks verarbeitet
+                # Heartbeat: Zwischensummen alle CHECKPOINT_HEARTBEAT_INTERVAL s in sessions
+                self.checkpoint.heartbeat()
+                # Laufende Phase: verstrichene Zeit regelmäßig lokal sichern (Restzeit ohne Wanduhr)
+                if (self.phase_started_mono is not None and self.state in ("WORKING", "BREAK")
+                        and time.monotonic() - self.last_checkpoint >= config.CHECKPOINT_SAVE_INTERVAL):
+                    self._save_checkpoint()
                 sleep(0.5)
         
         except KeyboardInterrupt:
@@ -579,9 +723,22 @@ class LearningSession:
         
         self.led.off()
         self.buzzer.off()
+        self.co2.close()
         self.timer.stop_event.set()
         self.button1.cleanup()
         self.button2.cleanup()
+        self.commands.stop()
+        self.co2_batches.flush()
+        self.writer.stop()
+        self.store.close()
+        store = self.store.stats()
+        print(f"💾 Local Store: {store['records']} Records in {store['commits']} Commits "
+              f"(max. {store['max_commit_ms']} ms fsync, {store['compactions']}× kompaktiert)")
+        
+        cache = self.db.cache.stats()
+        print(f"🗃️ Session-Cache: {cache['hits']} Treffer / {cache['misses']} Fehlschläge")
+        if self.peer:
+            self.peer.close()
         
         print("✅ Cleanup abgeschlossen\n")
 
@@ -13,12 +13,19 @@ if '--device=' not in ' '.join(sys.argv):
 
 import signal
 import time
+import uuid
 from datetime import datetime
-from threading import Thread
+from threading import Thread, Lock
 import config
 from hardware import StepCounter
 from services.discord_templates import NotificationService
 from database.supabase_manager import SupabaseManager
+from services.session_events import EventTail, BREAK_ENDED
+from services.peer_link import PeerLink
+from services.clock_sync import ClockSync, deadline_to_monotonic
+from services.write_behind import WriteBehind
+from services.local_store import LocalStore
+from database.step_timeline import summarize as summarize_steps
 
 # ============================================================
 # GPIO CLEANUP - Ressourcen vor Start freigeben
@@ -63,6 +70,10 @@ class BreakStation:
         # Services
         self.notify = NotificationService()
         self.db = SupabaseManager()
+        self.store = LocalStore().open()                # Pausen-Daten lokal (Group Commit)
+        self.writer = WriteBehind('supabase', store=self.store, target=self.db,
+                                  max_attempts=config.WRITE_BEHIND_MAX_ATTEMPTS,
+                                  max_age=config.WRITE_BEHIND_MAX_AGE).start()   # Upload mit Wiederholung
         
         # State
         self.state = "IDLE"
@@ -71,14 +82,29 @@ class BreakStation:
         self.pause_start_time = None
         self.user_name = "User"
         
-        # Polling
+        # Polling (Session-Events per Cursor)
         self.polling_active = True
         self.polling_thread = None
-        self.last_session_id = None
+        self.events = EventTail(self.db)
+        self.events_lock = Lock()   # Projektion wird von Polling + Peer Link fortgeschrieben
+        self.last_break = None   # break_started Event der zuletzt gestarteten Pause
+        
+        # Peer Link: Events direkt von PiTop 1 (LAN), Supabase-Polling bleibt Fallback
+        self.peer = PeerLink.from_config()
+        self.clock = None   # Uhren-Offset zu PiTop 1 (für die Pausen-Deadline)
+        if self.peer:
+            self.peer.on_message(self._on_peer_message)
+            clock = ClockSync(self.peer)
+            self.peer = self.peer.start()
+            self.clock = clock.start() if self.peer else None
         
         # Break kann von außen abgebrochen werden
         self.break_cancelled = False
         
+        # CO2-Statistik der laufenden Session (Cursor: nur neue Messungen nachladen)
+        self.co2_cache = None
+        self.co2_cache_session = None
+        
         print(f"✅ Initialisierung abgeschlossen\n")
     
     # ═══════════════════════════════════════════════════════════════
@@ -87,13 +113,14 @@ class BreakStation:
     
     def start_polling(self):
         print("⏳ Starte Datenbank-Polling...")
-        print("   → Suche nach timer_status='break' alle 1 Sekunde\n")
+        print("   → Liest neue Session-Events (break_started) jede Sekunde\n")
         
         self.polling_thread = Thread(target=self._polling_loop, daemon=True)
         self.polling_thread.start()
     
     def _polling_loop(self):
         poll_interval = 1
+        started = False
         
         while self.polling_active:
             try:
@@ -101,43 +128,17 @@ class BreakStation:
                     time.sleep(poll_interval)
                     continue
                 
-                result = self.db.client.table('sessions')\
-                    .select('session_id, pause_count, user_name, timer_status')\
-                    .order('start_time', desc=True)\
-                    .limit(1)\
-                    .execute()
-                
-                if not result.data:
-                    time.sleep(poll_interval)
-                    continue
-                
-                session = result.data[0]
-                session_id = session['session_id']
-                status = session.get('timer_status', 'idle')
+                # Beim Start nur die neueste Session nachspielen (laufende Pause erkennen)
+                if not started:
+                    self.events.start_at_latest_session()
+                    started = True
                 
-                # BREAK SIGNAL
-                if status == 'break' and session_id != self.last_session_id:
-                    self.last_session_id = session_id
-                    
-                    self.session_id = session_id
-                    self.pause_number = session.get('pause_count', 0) + 1
-                    self.user_name = session.get('user_name', 'User')
-                    
-                    print(f"\n✅ BREAK-SIGNAL ERKANNT!")
-                    print(f"   Session: {session_id[:8]}...")
-                    print(f"   User: {self.user_name}")
-                    print(f"   Pause #{self.pause_number}\n")
-                    
-                    self._start_break(self.user_name)
-                    
-                    self.last_session_id = None
-                
-                # SESSION BEENDET - Reset
-                elif status in ['ended', 'cancelled']:
-                    if self.state == "BREAK":
-                        print("\n⚠️ Session wurde von PiTop 1 beendet!")
-                        self.break_cancelled = True
-                    self.last_session_id = None
+                # Nur neue Events seit dem Cursor (INSERT-only, keine Status-Zeile);
+                # schon per Peer Link angekommene Events zählen nicht doppelt
+                with self.events_lock:
+                    for event, _ in self.events.poll():
+                        self.db.invalidate_session(event['session_id'])   # Cache: Änderung von außen
+                    self._check_session(self.events.projection.latest)
                 
                 time.sleep(poll_interval)
             
@@ -147,6 +148,44 @@ class BreakStation:
                 print(f"⚠️ Polling Fehler: {e}")
                 time.sleep(poll_interval)
     
+    def _on_peer_message(self, kind, body):
+        """Event direkt von PiTop 1 (Millisekunden statt Poll-Intervall + WAN)"""
+        if kind != 'session_event':
+            return
+        with self.events_lock:
+            self.events.projection.apply(body)
+            self.db.invalidate_session(body['session_id'])
+            self._check_session(self.events.projection.latest)
+    
+    def _check_session(self, session):
+        """Zustand nach allen neuen Events auswerten (nicht jedes alte Event)"""
+        if not session:
+            return
+        
+        # BREAK SIGNAL
+        if session.status == 'break' and self.last_break != session.break_id and self.state != "BREAK":
+            self.last_break = session.break_id
+            
+            self.session_id = session.session_id
+            self.pause_number = session.pause_count
+            self.user_name = session.user_name or 'User'
+            
+            print(f"\n✅ BREAK-SIGNAL ERKANNT!")
+            print(f"   Session: {self.session_id[:8]}...")
+            print(f"   User: {self.user_name}")
+            print(f"   Pause #{self.pause_number}\n")
+            
+            # Pause im eigenen Thread - Polling/Peer Link laufen weiter
+            self.state = "BREAK"
+            self.break_cancelled = False
+            deadline = ((session.phase_start or {}).get('payload') or {}).get('deadline')
+            Thread(target=self._start_break, args=(self.user_name, deadline), daemon=True).start()
+        
+        # SESSION BEENDET
+        elif session.is_ended and self.state == "BREAK":
+            print("\n⚠️ Session wurde von PiTop 1 beendet!")
+            self.break_cancelled = True
+    
     # ═══════════════════════════════════════════════════════════════
     # CO2 DATA FROM DB
     # ═══════════════════════════════════════════════════════════════
@@ -157,32 +196,22 @@ class BreakStation:
             return None
         
         try:
-            result = self.db.client.table('co2_measurements')\
-                .select('co2_level, tvoc_level, is_alarm')\
-                .eq('session_id', self.session_id)\
-                .execute()
+            # Neue Session → Cache verwerfen, sonst nur Messungen seit der letzten Pause holen
+            if self.co2_cache_session != self.session_id:
+                self.co2_cache = None
+                self.co2_cache_session = self.session_id
             
-            if not result.data:
-                print("ℹ️  Keine CO2-Daten gefunden")
-                return None
+            known = self.co2_cache.count if self.co2_cache else 0
+            co2 = self.db.get_session_co2_stats(self.session_id, since=self.co2_cache)
+            self.co2_cache = co2
             
-            co2_values = [row['co2_level'] for row in result.data if row['co2_level']]
-            tvoc_values = [row['tvoc_level'] for row in result.data if row.get('tvoc_level')]
-            alarm_count = sum(1 for row in result.data if row.get('is_alarm'))
-            
-            if not co2_values:
+            if not co2.count:
+                print("ℹ️  Keine CO2-Daten gefunden")
                 return None
             
-            stats = {
-                'avg_co2': int(sum(co2_values) / len(co2_values)),
-                'min_co2': min(co2_values),
-                'max_co2': max(co2_values),
-                'avg_tvoc': int(sum(tvoc_values) / len(tvoc_values)) if tvoc_values else 0,
-                'alarm_count': alarm_count,
-                'measurement_count': len(co2_values)
-            }
+            stats = co2.to_break_stats()
             
-            print(f"📊 CO2-Daten geladen: {len(co2_values)} Messungen")
+            print(f"📊 CO2-Daten geladen: {co2.count} Messungen (+{co2.count - known} neu)")
             return stats
         
         except Exception as e:
@@ -193,7 +222,13 @@ class BreakStation:
     # BREAK SESSION
     # ═══════════════════════════════════════════════════════════════
     
-    def _start_break(self, user_name):
+    def _start_break(self, user_name, deadline=None):
+        # Pausenende: Deadline von PiTop 1 (per Clock Sync in lokale Zeit umgerechnet),
+        # ohne Deadline volle Dauer ab jetzt
+        end_at = time.monotonic() + BREAK_DURATION
+        if deadline:
+            end_at = min(end_at, deadline_to_monotonic(deadline, self.clock))
+        
         print("="*60)
         print(f"☕ PAUSE #{self.pause_number} GESTARTET ({BREAK_DURATION // 60} Min)")
         print("="*60)
@@ -202,25 +237,21 @@ class BreakStation:
         print(f"👣 Schrittzähler aktiv\n")
         
         self.state = "BREAK"
-        self.break_cancelled = False
         self.pause_start_time = time.time()
         
         # Schrittzähler starten
         print("🎯 Starte Schrittzähler...\n")
         self.steps.start()
         
-        # 10 Minuten Timer
-        start_time = time.time()
-        
+        # Timer bis zur gemeinsamen Deadline
         try:
-            while time.time() - start_time < BREAK_DURATION:
+            while time.monotonic() < end_at:
                 # Check ob Break von PiTop 1 abgebrochen wurde
                 if self.break_cancelled:
                     print("\n\n⚠️ Break wurde extern abgebrochen!")
                     break
                 
-                elapsed = time.time() - start_time
-                remaining = BREAK_DURATION - elapsed
+                remaining = end_at - time.monotonic()
                 
                 steps = self.steps.read()
                 
@@ -230,7 +261,7 @@ class BreakStation:
                 print(f"\r⏱️ {remaining_min:02d}:{remaining_sec:02d} verbleibend | 👣 {steps:,} Schritte", 
                       end='', flush=True)
                 
-                time.sleep(1)
+                time.sleep(min(1, max(0, end_at - time.monotonic())))
             
             if not self.break_cancelled:
                 print(f"\n\n⏰ PAUSE ABGELAUFEN!")
@@ -260,6 +291,10 @@ class BreakStation:
         print(f"\n👣 Schritte:     {steps:,}")
         print(f"🔥 Kalorien:     ~{calories} kcal")
         print(f"📏 Distanz:      ~{distance}m")
+        if steps:
+            pacing = summarize_steps(self.steps.timeline.encode())
+            print(f"🏃 Kadenz:       ~{pacing['median_cadence'] or 0} Schritte/min "
+                  f"(aktive Minuten: {pacing['active_minutes']})")
         
         # CO2-Stats anzeigen
         if co2_stats:
@@ -280,8 +315,8 @@ class BreakStation:
             # Discord mit CO2-Daten
             self._send_break_notification(user_name, steps, calories, distance, co2_stats)
             
-            # Status update
-            self._update_session_status('work_ready')
+            # Pausenende als Event (pause_count ergibt sich aus break_started)
+            self.db.log_session_event(self.session_id, BREAK_ENDED, {'pause_number': self.pause_number})
         else:
             print("⚠️ Break wurde abgebrochen - keine Daten gespeichert")
         
@@ -296,39 +331,11 @@ class BreakStation:
             print("⚠️ Kann Break-Daten nicht speichern")
             return
 
-        try:
-            # Verwende die zentrale db.log_steps() Funktion
-            success = self.db.log_steps(
-                session_id=self.session_id,
-                pause_number=self.pause_number,
-                step_count=steps,
-                calories=calories,
-                distance=distance
-            )
-
-            if success:
-                print("✅ Break-Daten in DB gespeichert")
-            else:
-                print("⚠️ Break-Daten-Speicherung fehlgeschlagen")
-
-        except Exception as e:
-            print(f"❌ DB-Fehler: {e}")
-    
-    def _update_session_status(self, status):
-        if not self.db.client or not self.session_id:
-            return
-        
-        try:
-            # Auch pause_count erhöhen
-            self.db.client.table('sessions').update({
-                'timer_status': status,
-                'pause_count': self.pause_number
-            }).eq('session_id', self.session_id).execute()
-            
-            print(f"📊 Session Status: {status}")
-        
-        except Exception as e:
-            print(f"⚠️ Status-Update Fehler: {e}")
+        # Erst im Local Store protokolliert, dann im Hintergrund hochgeladen (mit Wiederholung) -
+        # Internet- oder Stromausfall kostet keine Pause mehr
+        self.writer.submit('breakdata', self.db.log_steps, self.session_id, self.pause_number,
+                           steps, calories, distance, self.steps.timeline.encode(), str(uuid.uuid4()))
+        print("✅ Break-Daten gesichert (Upload im Hintergrund)")
     
     def _send_break_notification(self, user_name, steps, calories, distance, co2_stats=None):
         """📱 Discord-Benachrichtigung mit CO2-Daten"""
@@ -412,7 +419,7 @@ class BreakStation:
         
         print("\n💡 FUNKTIONSWEISE:")
         print("   1. 🔄 Pollt DB (jede Sekunde)")
-        print("   2. ✅ Erkennt timer_status='break'")
+        print("   2. ✅ Erkennt break_started Event")
         print("   3. 🏃 Startet Schrittzähler")
         print(f"   4. ⏱️ Läuft {BREAK_DURATION // 60} Minuten")
         print("   5. 💨 Holt CO2-Daten aus DB")
@@ -440,13 +447,22 @@ class BreakStation:
         print("\n\n🛑 Break Station wird gestoppt...")
         
         self.polling_active = False
+        if self.clock:
+            self.clock.stop()
+        if self.peer:
+            self.peer.close()
         
         if self.state == "BREAK":
             self.steps.stop()
+        self.steps.close()
         
         if self.polling_thread and self.polling_thread.is_alive():
             self.polling_thread.join(timeout=2)
         
+        self.writer.flush(timeout=5)
+        self.writer.stop()
+        self.store.close()
+        
         print("✅ Cleanup abgeschlossen\n")
 
 
@@ -0,0 +1,221 @@
+"""
+Session Checkpoints - Wiederaufnahme nach Absturz/Neustart
+Lokal: bei jedem Zustandswechsel (Phase, Startzeit, Summen) ein Record im Local Store
+(services/local_store.py, Group Commit statt fsync pro Wechsel) - ohne Store wie
+bisher als atomare JSON-Datei.
+DB: Heartbeat mit Zwischensummen in sessions (last_seen_at), damit verwaiste
+Sessions beim nächsten Start mit korrekten Summen geschlossen werden können.
+
+Restzeit nach Neustart ohne Wanduhr: der Checkpoint hält die verstrichenen Sekunden
+der Phase (phase_elapsed) + monotone Zeit und boot_id. Gleicher Boot → monotone Zeit,
+neuer Boot → Wanduhr nur wenn per NTP gestellt, sonst zählt die Ausfallzeit nicht.
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import config
+from services.clock_sync import wall_clock_synchronized
+from services.session_events import ENDED, SessionState, boot_id
+
+CHECKPOINT_VERSION = 1
+STORE_KEY = 'checkpoint'
+
+# Zustand von main_pitop1 → Status der Projektion (services/session_events.py)
+PROJECTION_STATUS = {'IDLE': 'idle', 'WORKING': 'working', 'WORK_DONE': 'work_ended', 'BREAK': 'break'}
+
+
+class SessionCheckpoint:
+    def __init__(self, path=None, db=None, heartbeat_interval=None, store=None):
+        self.path = path or config.CHECKPOINT_FILE
+        self.db = db
+        self.store = store      # LocalStore - sonst eigene Datei mit fsync pro save()
+        self.heartbeat_interval = heartbeat_interval or config.CHECKPOINT_HEARTBEAT_INTERVAL
+        self.last_heartbeat = 0
+        self.data = None
+
+    # ===== LOKAL =====
+
+    def save(self, **state):
+        """Store: ein Record (fsync im nächsten Group Commit), sonst atomar per tmp + fsync + rename"""
+        data = {'version': CHECKPOINT_VERSION, 'device_id': config.DEVICE_ID,
+                'saved_at': time.time(), 'saved_monotonic': time.monotonic(), 'boot_id': boot_id(),
+                **state}
+        if self.store:
+            try:
+                self.store.put(STORE_KEY, data)
+            except (TypeError, ValueError) as e:
+                print(f"⚠️  Checkpoint Fehler: {e}")
+                return False
+            self.data = data
+            return True
+
+        tmp_path = f"{self.path}.tmp"
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.data = data
+            return True
+        except OSError as e:
+            print(f"⚠️  Checkpoint Fehler: {e}")
+            return False
+
+    def load(self):
+        """Letzter Checkpoint (oder None wenn keiner/unlesbar/anderes Gerät)"""
+        data = self.store.get(STORE_KEY) if self.store else None
+        if data is None:
+            # Ohne Store bzw. Checkpoint-Datei aus der Zeit vor dem Local Store
+            data = self._load_file()
+            if data is None:
+                return None
+            if self.store:
+                self.store.put(STORE_KEY, data)
+                self._remove_file()
+
+        if data.get('version') != CHECKPOINT_VERSION or data.get('device_id') != config.DEVICE_ID:
+            return None
+        self.data = data
+        return data
+
+    def _load_file(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Checkpoint unlesbar ({e}) - wird ignoriert")
+            return None
+
+    def clear(self):
+        self.data = None
+        if self.store:
+            self.store.delete(STORE_KEY)
+        self._remove_file()
+
+    def _remove_file(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    # ===== DB HEARTBEAT =====
+
+    def heartbeat(self, force=False):
+        """Zwischensummen + last_seen_at in sessions (höchstens alle heartbeat_interval s)"""
+        if not self.db or not self.data or not self.data.get('session_id'):
+            return False
+        now = time.time()
+        if not force and now - self.last_heartbeat < self.heartbeat_interval:
+            return False
+        self.last_heartbeat = now
+
+        totals = current_totals(self.data, now)
+        return self.db.checkpoint_session(self.data['session_id'], **totals)
+
+
+def phase_elapsed(data, synchronized=None):
+    """Verstrichene Sekunden der laufenden Phase (None wenn keine läuft)
+
+    phase_elapsed vom Speichern + Zeit seitdem: im selben Boot monoton, nach einem
+    Neustart per Wanduhr nur wenn sie synchronisiert ist - sonst zählt die Ausfallzeit
+    nicht (lieber eine etwas längere Phase als eine Restzeit aus einer falschen Uhr).
+    """
+    if not data.get('phase_started_at'):
+        return None
+    elapsed = data.get('phase_elapsed')
+    if elapsed is None:
+        # Checkpoint von vor phase_elapsed: nur die Wanduhr
+        return max(0, time.time() - data['phase_started_at'])
+    if data.get('boot_id') == boot_id() and data.get('saved_monotonic') is not None:
+        elapsed += time.monotonic() - data['saved_monotonic']
+    else:
+        if synchronized is None:
+            synchronized = wall_clock_synchronized()
+        if synchronized is not False:   # unbekannt (kein Linux): Wanduhr wie bisher
+            elapsed += max(0, time.time() - data.get('saved_at', time.time()))
+    return max(0, elapsed)
+
+
+def current_totals(data, now=None):
+    """Summen inkl. der laufenden Phase bis jetzt"""
+    work = data.get('total_work_time', 0)
+    pause = data.get('total_break_time', 0)
+    elapsed = phase_elapsed(data)
+    if elapsed is not None:
+        if data.get('state') == 'WORKING':
+            work += int(min(elapsed, data.get('work_duration') or elapsed))
+        elif data.get('state') == 'BREAK':
+            pause += int(min(elapsed, data.get('break_duration') or elapsed))
+    return {'total_work_time': work, 'total_pause_time': pause, 'pause_count': data.get('pause_count', 0)}
+
+
+def state_from_checkpoint(data):
+    """Projektion aus dem lokalen Checkpoint - wenn die DB beim Start nicht erreichbar ist"""
+    state = SessionState(data['session_id'])
+    state.status = PROJECTION_STATUS.get(data.get('state'), 'idle')
+    state.pause_count = data.get('pause_count', 0)
+    state.total_work_time = data.get('total_work_time', 0)
+    state.total_pause_time = data.get('total_break_time', 0)
+    state.phase_start = data.get('phase_event')   # work_started/break_started der laufenden Phase
+    return state
+
+
+def _seconds(value):
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def close_orphaned_sessions(db, keep_session_id=None):
+    """
+    Schließt offene Sessions dieses Geräts (end_time null), die nicht fortgesetzt werden.
+    Summen aus den Session-Events; eine offene Phase zählt bis zum letzten Heartbeat.
+    """
+    closed = 0
+    if not db.client:
+        return closed
+    for session in db.get_open_sessions(config.DEVICE_ID):
+        session_id = session['session_id']
+        if session_id == keep_session_id:
+            continue
+
+        try:
+            state = db.get_session_state(session_id)
+        except Exception as e:
+            print(f"⚠️  Verwaiste Session {session_id[:8]}... nicht lesbar ({e}) - nächster Start versucht es erneut")
+            continue
+        last_seen = session.get('last_seen_at') or state.last_event_at or session.get('start_time')
+        work, pause = state.total_work_time, state.total_pause_time
+
+        # Offene Phase bis zum letzten Lebenszeichen zählen
+        if state.phase_start and last_seen:
+            phase_started = _seconds(state.phase_start.get('occurred_at'))
+            seen = _seconds(last_seen)
+            if phase_started and seen and seen > phase_started:
+                if state.status == 'working':
+                    work += int(seen - phase_started)
+                else:
+                    pause += int(seen - phase_started)
+
+        # Ohne Events (ältere Sessions): Heartbeat-Summen übernehmen
+        work = max(work, session.get('total_work_time') or 0)
+        pause = max(pause, session.get('total_pause_time') or 0)
+        pause_count = max(state.pause_count, session.get('pause_count') or 0)
+
+        if db.close_session(session_id, last_seen, work, pause, pause_count):
+            db.log_session_event(session_id, ENDED, {'reason': 'orphaned'})   # PiTop 2 / Projektion
+            print(f"🧹 Verwaiste Session geschlossen: {session_id[:8]}... "
+                  f"(Arbeit {work // 60} Min, Pause {pause // 60} Min, {pause_count} Pausen)")
+            closed += 1
+    return closed
@@ -0,0 +1,101 @@
+"""
+Clock Sync - Uhren-Offset zum Peer per Ping/Pong (NTP-Verfahren)
+PiTop 1 ist die Zeit-Autorität für Pausen (started_at/deadline im break_started Event).
+PiTop 2 schätzt den Offset seiner Uhr zu PiTop 1 und rechnet die Deadline in eine
+lokale monotone Zeit um - beide Geräte beenden die Pause zum selben Zeitpunkt.
+
+    offset = ((t1 - t0) + (t2 - t3)) / 2      Uhr des Peers - eigene Uhr
+    delay  = (t3 - t0) - (t2 - t1)            Round-Trip ohne Bearbeitungszeit
+"""
+
+import ctypes
+import time
+from collections import deque
+from threading import Thread, Event
+
+try:
+    import config
+    CLOCK_SYNC_INTERVAL = config.CLOCK_SYNC_INTERVAL
+except ImportError:
+    CLOCK_SYNC_INTERVAL = 60
+
+BURST_SIZE = 8           # Pings pro Messung
+BURST_SPACING = 0.1      # Sekunden zwischen den Pings einer Messung
+TIME_ERROR = 5           # adjtimex(): Uhr nicht synchronisiert (STA_UNSYNC)
+
+
+def wall_clock_synchronized():
+    """Ist die Systemuhr per NTP gestellt? (Linux adjtimex, wie timedatectl) → True/False, None = unbekannt
+
+    Der Pi hat keine Echtzeituhr - direkt nach dem Boot steht die Uhr auf dem letzten
+    gespeicherten Stand, bis NTP sie korrigiert.
+    """
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        timex = ctypes.create_string_buffer(256)   # struct timex mit modes = 0: nur lesen
+        result = libc.adjtimex(timex)
+    except (OSError, AttributeError):
+        return None
+    if result < 0:
+        return None
+    return result != TIME_ERROR
+
+
+class ClockSync:
+    def __init__(self, peer, window=BURST_SIZE * 2):
+        self.peer = peer
+        self.samples = deque(maxlen=window)   # (delay, offset)
+        self.offset = 0.0                     # ohne Messung: Uhren per NTP gleich angenommen
+        self.delay = None
+        self.stop_event = Event()
+        self.thread = None
+        peer.on_message(self.handle)          # vor peer.start() registrieren
+
+    @property
+    def synced(self):
+        return self.delay is not None
+
+    def handle(self, kind, body):
+        received = time.time()
+        if kind == 'clock_ping':
+            self.peer.send('clock_pong', {'t0': body['t0'], 't1': received, 't2': time.time()})
+        elif kind == 'clock_pong':
+            t0, t1, t2, t3 = body['t0'], body['t1'], body['t2'], received
+            delay = (t3 - t0) - (t2 - t1)
+            if delay < 0:
+                return
+            self.samples.append((delay, ((t1 - t0) + (t2 - t3)) / 2))
+            # Kürzester Round-Trip = geringste Asymmetrie → genauester Offset
+            self.delay, self.offset = min(self.samples)
+
+    def ping(self):
+        self.peer.send('clock_ping', {'t0': time.time()})
+
+    def start(self, interval=None):
+        """Misst regelmäßig (Burst aus BURST_SIZE Pings alle interval Sekunden)"""
+        interval = interval or CLOCK_SYNC_INTERVAL
+        self.stop_event.clear()
+        self.thread = Thread(target=self._loop, args=(interval,), name='clock-sync', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _loop(self, interval):
+        while not self.stop_event.is_set():
+            for _ in range(BURST_SIZE):
+                self.ping()
+                if self.stop_event.wait(BURST_SPACING):
+                    return
+            self.stop_event.wait(interval)
+
+    def remote_now(self):
+        """Aktuelle Zeit auf der Uhr des Peers"""
+        return time.time() + self.offset
+
+
+def deadline_to_monotonic(deadline, clock=None):
+    """Deadline (Wanduhr von PiTop 1) → lokale time.monotonic() Deadline"""
+    remote_now = clock.remote_now() if clock else time.time()
+    return time.monotonic() + (deadline - remote_now)
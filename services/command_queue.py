@@ -0,0 +1,86 @@
+"""
+Command Queue - Button-Callbacks entkoppelt von Netzwerk-I/O
+Die gpiozero-Callbacks legen nur einen Befehl in die Queue (+ sofortiges Quittungs-
+Signal) und kehren zurück. Ein Worker-Thread arbeitet die Befehle der Reihe nach ab -
+DB-Writes und Discord blockieren so nie die Druckerkennung der Buttons.
+"""
+
+import queue
+import time
+from threading import Thread
+
+# Befehle, die länger als das warten, werden als Rückstau gemeldet
+LAG_WARNING = 2.0
+
+
+class CommandQueue:
+    def __init__(self, name='commands'):
+        self.name = name
+        self.queue = queue.Queue()
+        self.thread = None
+
+        # Statistik
+        self.processed = 0
+        self.failed = 0
+        self.max_wait = 0.0
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return self
+        self.thread = Thread(target=self._worker, name=self.name, daemon=True)
+        self.thread.start()
+        return self
+
+    def submit(self, name, callback, *args):
+        """Befehl einreihen - kehrt sofort zurück"""
+        self.queue.put((name, callback, args, time.monotonic()))
+
+    def wrap(self, callback, name=None, ack=None):
+        """
+        Callback für einen Button-Treiber: ack() läuft sofort im GPIO-Thread
+        (muss nicht-blockierend sein), callback() später im Worker
+        """
+        name = name or getattr(callback, '__name__', 'command')
+
+        def enqueue():
+            if ack:
+                ack()
+            self.submit(name, callback)
+        return enqueue
+
+    def join(self):
+        """Wartet bis alle eingereihten Befehle abgearbeitet sind"""
+        self.queue.join()
+
+    def stop(self, timeout=2.0):
+        if self.thread and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(timeout=timeout)
+        self.thread = None
+
+    @property
+    def pending(self):
+        return self.queue.qsize()
+
+    def _worker(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                name, callback, args, queued_at = item
+
+                wait = time.monotonic() - queued_at
+                self.max_wait = max(self.max_wait, wait)
+                if wait > LAG_WARNING:
+                    print(f"\n⚠️  {self.name}: '{name}' wartete {wait:.1f}s (Rückstau: {self.pending})")
+
+                try:
+                    callback(*args)
+                    self.processed += 1
+                except Exception as e:
+                    # Ein fehlerhafter Befehl darf den Worker nicht beenden
+                    self.failed += 1
+                    print(f"\n❌ {self.name}: '{name}' fehlgeschlagen: {e}")
+            finally:
+                self.queue.task_done()
@@ -0,0 +1,307 @@
+"""
+Digest - Wochen-/Monatsberichte aller Nutzer in einem Durchlauf
+Statt pro Session drei Abfragen und einem Webhook-Request nacheinander:
+
+    Daten       ein seitenweiser Read von summary_user_day für den ganzen Zeitraum
+                (database/daily_summary.py) → Bericht pro Nutzer
+    Rendern     MessageTemplates.period_report() pro Nutzer, bis zu 10 Embeds
+                (max. 6000 Zeichen) pro Webhook-Nachricht
+    Versand     ThreadPool mit begrenzter Parallelität; Rate-Limits pro Webhook aus
+                den X-RateLimit-* Headern, bei 429 Wartezeit aus retry_after
+
+Per cron/systemd-Timer, z.B. sonntags 18 Uhr:
+
+    python -m services.digest week
+    python -m services.digest month --day 2025-03-01 --dry-run
+
+Webhook pro Nutzer: DIGEST_WEBHOOKS_FILE (JSON {user_name: url}), sonst DISCORD_WEBHOOK_URL.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Lock
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from database.daily_summary import build_report, period_range
+from services.discord_templates import MessageTemplates
+
+MAX_EMBEDS = 10            # Discord: Embeds pro Nachricht
+MAX_EMBED_CHARS = 6000     # Discord: Zeichen aller Embeds einer Nachricht
+MAX_ATTEMPTS = 5
+PAGE_SIZE = 1000
+
+
+def load_webhooks(path):
+    """DIGEST_WEBHOOKS_FILE → {user_name: webhook_url}"""
+    if not path:
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def to_embed(template, footer="Learning Assistant"):
+    """MessageTemplates-Dict → Discord Embed"""
+    embed = {
+        "title": template['title'],
+        "description": template['description'],
+        "color": template['color'],
+        "timestamp": datetime.utcnow().isoformat(),
+        "footer": {"text": footer},
+    }
+    if template.get('fields'):
+        embed['fields'] = template['fields']
+    return embed
+
+
+def _embed_chars(embed):
+    return (len(embed.get('title', '')) + len(embed.get('description', ''))
+            + len(embed['footer']['text'])
+            + sum(len(f['name']) + len(f['value']) for f in embed.get('fields', [])))
+
+
+def pack_messages(embeds):
+    """[Embed] → [[Embed]] mit höchstens MAX_EMBEDS Embeds / MAX_EMBED_CHARS Zeichen"""
+    messages, current, chars = [], [], 0
+    for embed in embeds:
+        size = _embed_chars(embed)
+        if current and (len(current) >= MAX_EMBEDS or chars + size > MAX_EMBED_CHARS):
+            messages.append(current)
+            current, chars = [], 0
+        current.append(embed)
+        chars += size
+    if current:
+        messages.append(current)
+    return messages
+
+
+class RateLimiter:
+    """Discord Rate-Limits pro Webhook (Bucket) + globales Limit"""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.buckets = {}          # url → [remaining, reset_at (monotonic)]
+        self.global_until = 0.0
+
+        # Statistik
+        self.waited = 0.0
+
+    def acquire(self, url):
+        """Wartet bis ein Request auf url erlaubt ist und reserviert ihn"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                bucket = self.buckets.get(url)
+                if bucket and bucket[1] <= now:
+                    bucket = self.buckets[url] = None
+                wait = self.global_until - now
+                if bucket and bucket[0] <= 0:
+                    wait = max(wait, bucket[1] - now)
+                if wait <= 0:
+                    if bucket:
+                        bucket[0] -= 1
+                    return
+                self.waited += wait
+            time.sleep(wait)
+
+    def update(self, url, response):
+        """X-RateLimit-Remaining / -Reset-After der Antwort übernehmen"""
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset_after = response.headers.get('X-RateLimit-Reset-After')
+        if remaining is None or reset_after is None:
+            return
+        with self.lock:
+            bucket = self.buckets.get(url)
+            reset_at = time.monotonic() + float(reset_after)
+            # Parallele Requests: die kleinste gemeldete Restmenge gilt
+            if bucket is None or reset_at > bucket[1] + 0.05:
+                self.buckets[url] = [int(remaining), reset_at]
+            else:
+                bucket[0] = min(bucket[0], int(remaining))
+
+    def block(self, url, retry_after, is_global=False):
+        """429: Bucket (oder alle Webhooks) für retry_after Sekunden sperren"""
+        with self.lock:
+            until = time.monotonic() + retry_after
+            if is_global:
+                self.global_until = max(self.global_until, until)
+            else:
+                self.buckets[url] = [0, until]
+
+
+class WebhookSender:
+    """Paralleler Versand mit begrenzter Parallelität und Wiederholung"""
+
+    def __init__(self, workers=4, max_attempts=MAX_ATTEMPTS, timeout=10):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.limiter = RateLimiter()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Statistik
+        self.sent = 0
+        self.failed = 0
+        self.rate_limited = 0
+        self.stats_lock = Lock()
+
+    def send_all(self, messages):
+        """[(url, payload)] → Anzahl erfolgreich versendeter Nachrichten"""
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='digest') as pool:
+            results = list(pool.map(lambda message: self.send(*message), messages))
+        return sum(results)
+
+    def send(self, url, payload):
+        for attempt in range(self.max_attempts):
+            self.limiter.acquire(url)
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+            except requests.RequestException as e:
+                print(f"⚠️  Digest Versand: {e} (Versuch {attempt + 1}/{self.max_attempts})")
+                time.sleep(min(2 ** attempt, 30))
+                continue
+
+            self.limiter.update(url, response)
+            if response.status_code == 429:
+                self._count('rate_limited')
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = {}
+                retry_after = float(body.get('retry_after') or response.headers.get('Retry-After') or 1)
+                self.limiter.block(url, retry_after, is_global=bool(body.get('global')))
+                continue
+            if response.status_code >= 500:
+                time.sleep(min(2 ** attempt, 30))
+                continue
+            if response.status_code < 300:
+                self._count('sent')
+                return True
+            print(f"⚠️  Discord-Fehler: {response.status_code} {response.text[:200]}")
+            break
+
+        self._count('failed')
+        return False
+
+    def _count(self, name):
+        with self.stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def close(self):
+        self.session.close()
+
+
+class Digest:
+    def __init__(self, db, webhooks=None, default_webhook=None, sender=None):
+        import config
+        self.db = db
+        self.webhooks = webhooks if webhooks is not None else load_webhooks(config.DIGEST_WEBHOOKS_FILE)
+        self.default_webhook = default_webhook if default_webhook is not None else config.DISCORD_WEBHOOK_URL
+        self.sender = sender or WebhookSender(config.DIGEST_WORKERS)
+        self.timezone = config.SUMMARY_TIMEZONE
+
+    def collect(self, period='week', day=None):
+        """Berichte aller Nutzer mit Sessions im Zeitraum → {user_name: report}"""
+        start, end = period_range(period, day, self.timezone)
+        days_by_user = {}
+        offset = 0
+        while True:
+            rows = self.db.client.table('summary_user_day')\
+                .select('*')\
+                .gte('day', start.isoformat())\
+                .lte('day', end.isoformat())\
+                .order('user_name')\
+                .order('day')\
+                .limit(PAGE_SIZE)\
+                .offset(offset)\
+                .execute().data or []
+            for row in rows:
+                days_by_user.setdefault(row['user_name'], []).append(row)
+            if len(rows) < PAGE_SIZE:
+                break
+            offset += PAGE_SIZE
+
+        return {
+            user: build_report(period, start, end, 'user_name', user, days)
+            for user, days in days_by_user.items()
+        }
+
+    def render(self, reports):
+        """Berichte → [(webhook_url, payload)], Nutzer ohne Webhook werden übersprungen"""
+        embeds_by_url = {}
+        skipped = 0
+        for user, report in sorted(reports.items()):
+            if not report['session_count']:
+                continue
+            url = self.webhooks.get(user) or self.default_webhook
+            if not url:
+                skipped += 1
+                continue
+            embed = to_embed(MessageTemplates.period_report(user, report), footer="Learning Assistant · Digest")
+            embeds_by_url.setdefault(url, []).append(embed)
+        if skipped:
+            print(f"⚠️  Digest: {skipped} Nutzer ohne Webhook übersprungen")
+
+        return [(url, {"embeds": embeds})
+                for url, embeds in embeds_by_url.items()
+                for embeds in pack_messages(embeds)]
+
+    def run(self, period='week', day=None, dry_run=False):
+        started = time.perf_counter()
+        reports = self.collect(period, day)
+        collected = time.perf_counter()
+        messages = self.render(reports)
+        rendered = time.perf_counter()
+
+        print(f"📅 Digest {period}: {len(reports)} Nutzer → {len(messages)} Nachrichten "
+              f"(Daten {collected - started:.2f} s, Rendern {rendered - collected:.2f} s)")
+        if dry_run:
+            for url, payload in messages:
+                for embed in payload['embeds']:
+                    print(f"   {embed['title']}")
+            return {'users': len(reports), 'messages': len(messages), 'sent': 0, 'failed': 0}
+
+        sent = self.sender.send_all(messages)
+        elapsed = time.perf_counter() - rendered
+        print(f"✅ Digest versendet: {sent}/{len(messages)} Nachrichten in {elapsed:.1f} s "
+              f"({self.sender.rate_limited}× Rate-Limit, {self.sender.limiter.waited:.1f} s Wartezeit über alle Threads)")
+        return {'users': len(reports), 'messages': len(messages),
+                'sent': sent, 'failed': self.sender.failed}
+
+
+def main(argv=None):
+    import config
+    from database.supabase_manager import SupabaseManager
+
+    parser = argparse.ArgumentParser(description='Wochen-/Monats-Digest für alle Nutzer an Discord')
+    parser.add_argument('period', choices=['week', 'month'])
+    parser.add_argument('--day', help='Tag im gewünschten Zeitraum (YYYY-MM-DD, Standard: heute)')
+    parser.add_argument('--workers', type=int, default=config.DIGEST_WORKERS,
+                        help='Parallele Webhook-Requests (Standard: DIGEST_WORKERS)')
+    parser.add_argument('--dry-run', action='store_true', help='Nur rendern, nichts versenden')
+    args = parser.parse_args(argv)
+
+    db = SupabaseManager()
+    if not db.client:
+        return 1
+    sender = WebhookSender(args.workers)
+    try:
+        result = Digest(db, sender=sender).run(args.period, day=args.day, dry_run=args.dry_run)
+    finally:
+        sender.close()
+    return 0 if not result['failed'] else 1
+
+
+if __name__ == "__main__":
+    if not os.environ.get('DEVICE_OVERRIDE') and '--device=' not in ' '.join(sys.argv):
+        os.environ['DEVICE_OVERRIDE'] = 'pitop1'
+    sys.exit(main())
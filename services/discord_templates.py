@@ -141,6 +141,78 @@ class MessageTemplates:
             ]
         }
     
+    # ===== 4. WOCHEN-/MONATS-DIGEST =====
+    
+    @staticmethod
+    def period_report(user_name, report):
+        """
+        Wochen- oder Monatsbericht (services/digest.py)
+        
+        Args:
+            user_name: Benutzer-Name
+            report: Dict aus database.daily_summary.build_report()
+        """
+        label = "Wochen" if report.get('period') == 'week' else "Monats"
+        start = datetime.fromisoformat(report['start']).strftime('%d.%m.')
+        end = datetime.fromisoformat(report['end']).strftime('%d.%m.%Y')
+        
+        # ===== ZEITEN =====
+        work_mins = report.get('work_seconds', 0) // 60
+        work_time_str = f"{work_mins // 60}h {work_mins % 60}min" if work_mins >= 60 else f"{work_mins}min"
+        break_mins = report.get('pause_seconds', 0) // 60
+        
+        # ===== CO2 =====
+        avg_co2 = report.get('avg_co2')
+        if avg_co2 is None:
+            co2_rating = "➖ Keine Messungen"
+        elif avg_co2 < 600:
+            co2_rating = "💚 Ausgezeichnet"
+        elif avg_co2 < 800:
+            co2_rating = "💛 Gut"
+        elif avg_co2 < 1000:
+            co2_rating = "🧡 Mäßig"
+        else:
+            co2_rating = "❤️ Schlecht"
+        
+        # ===== BEWEGUNG =====
+        steps = report.get('step_count', 0)
+        distance_km = report.get('distance_meters', 0) / 1000
+        
+        description = (
+            f"**⏰ ZEITÜBERSICHT**\n"
+            f"📅 Aktive Tage: **{report.get('active_days', 0)}**\n"
+            f"🎓 Sessions: **{report.get('session_count', 0)}**\n"
+            f"🕐 Gesamte Lernzeit: **{work_time_str}**\n"
+            f"☕ Pausen: **{report.get('pause_count', 0)}** ({break_mins} min)\n\n"
+            
+            f"**🌡️ LUFTQUALITÄT**\n"
+            f"{co2_rating}\n"
+            f"📊 Ø Durchschnitt: **{avg_co2 or '-'} ppm**\n"
+            f"📈 Maximum: **{report.get('co2_max') or '-'} ppm**\n"
+            f"⚠️ Co2 Alarm: **{report.get('alarm_count', 0)}x**\n\n"
+            
+            f"**👣 BEWEGUNG IN PAUSEN**\n"
+            f"🚶 Schritte: **{steps:,}** (Ø {report.get('avg_steps_per_day', 0):,} pro Tag)\n"
+            f"🔥 Kalorien: **{report.get('calories_burned', 0):.0f} kcal**\n"
+            f"📏 Distanz: **{distance_km:.2f} km**\n\n"
+            
+            f"{MessageTemplates._get_motivation(report.get('avg_steps_per_day', 0))}"
+        )
+        
+        return {
+            "title": f"📅 {label}-Report für {user_name} ({start} – {end})",
+            "description": description,
+            "color": 3447003,  # Blau
+            "emoji": "📅",
+            "fields": [
+                {
+                    "name": "🎯 Zusammenfassung",
+                    "value": f"**{work_time_str}** gelernt | **{report.get('session_count', 0)}** Sessions | **{steps:,}** Schritte",
+                    "inline": False
+                }
+            ]
+        }
+    
     # ===== CO2 ALERTS (Optional - nur bei kritischen Werten) =====
     
     @staticmethod
@@ -0,0 +1,291 @@
+"""
+Local Store - SD-Karten-schonende lokale Persistenz (append-only Log, Group Commit)
+Checkpoint und Write-Queue der PiTops schreiben nicht mehr jeweils eine Datei mit
+fsync pro Zustandswechsel, sondern Records in ein gemeinsames Log:
+
+    Record      Länge (u32) | CRC32 (u32) | Typ (u8) | JSON-Payload
+    PUT / DEL   Schlüssel → Wert (z.B. 'checkpoint')
+    APPEND/ACK  Einträge einer dauerhaften Queue (z.B. Write-Behind), ACK pro seq
+
+put()/append() kodieren den Record im Thread des Aufrufers und hängen ihn an einen
+Puffer (Lock + Liste, einige µs). Ein Hintergrund-Thread schreibt alle
+LOCAL_STORE_COMMIT_MS ms bzw. ab LOCAL_STORE_COMMIT_RECORDS Records alles mit einem
+write + fsync (Group Commit). Stromausfall: verloren ist höchstens das letzte
+Commit-Intervall - ein halb geschriebener Record am Ende fällt beim Öffnen über
+Länge/CRC auf und wird abgeschnitten.
+
+Kompaktierung im selben Thread: ist das Log größer als COMPACT_MIN_BYTES und zu mehr
+als der Hälfte überholt, wird der aktuelle Stand als neues Log geschrieben
+(tmp + fsync + rename) - selten statt bei jedem Checkpoint.
+"""
+
+import json
+import os
+import struct
+import time
+import zlib
+from threading import Event, Lock, Thread
+
+import config
+
+HEADER = struct.Struct('<IIB')      # Länge, CRC32 (über Typ + Payload), Typ
+PUT, DELETE, APPEND, ACK = 1, 2, 3, 4
+COMPACT_MIN_BYTES = 256 * 1024
+MAX_RECORD_BYTES = 16 * 1024 * 1024
+
+
+def encode(kind, payload):
+    """Typ + JSON-Payload → Record-Bytes (TypeError wenn nicht als JSON darstellbar)"""
+    body = json.dumps(payload, separators=(',', ':')).encode()
+    return HEADER.pack(len(body), zlib.crc32(bytes([kind]) + body), kind) + body
+
+
+def decode(data, offset=0):
+    """Records ab offset → (typ, payload), bricht beim ersten unvollständigen/defekten ab"""
+    while offset + HEADER.size <= len(data):
+        length, crc, kind = HEADER.unpack_from(data, offset)
+        end = offset + HEADER.size + length
+        if length > MAX_RECORD_BYTES or end > len(data):
+            return
+        body = data[offset + HEADER.size:end]
+        if zlib.crc32(bytes([kind]) + body) != crc:
+            return
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return
+        yield kind, payload, end
+        offset = end
+
+
+class LocalStore:
+    def __init__(self, path=None, commit_ms=None, commit_records=None):
+        self.path = path or config.LOCAL_STORE_FILE
+        commit_ms = config.LOCAL_STORE_COMMIT_MS if commit_ms is None else commit_ms
+        self.commit_interval = commit_ms / 1000
+        self.commit_records = commit_records or config.LOCAL_STORE_COMMIT_RECORDS
+
+        self.lock = Lock()             # Zustand + Puffer (kurz gehalten)
+        self.file_lock = Lock()        # Datei: Commit / Kompaktierung
+        self.wakeup = Event()
+        self.pending = []              # kodierte Records, noch nicht geschrieben
+        self.values = {}               # Schlüssel → Wert
+        self.queues = {}               # stream → {seq: Wert} (Einfügereihenfolge = seq)
+        self.sequences = {}            # stream → letzte vergebene seq
+        self.live = {}                 # ('v', key) / ('q', stream, seq) → Record-Bytes (für Kompaktierung)
+        self.live_bytes = 0
+        self.file = None
+        self.file_bytes = 0
+        self.thread = None
+        self.running = False
+
+        # Statistik
+        self.commits = 0
+        self.records_written = 0
+        self.compactions = 0
+        self.max_commit_ms = 0.0
+        self.truncated_bytes = 0
+
+    # ===== ÖFFNEN / SCHLIESSEN =====
+
+    def open(self):
+        """Log einlesen, defekten Rest abschneiden, Commit-Thread starten"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        try:
+            os.remove(self.path + '.compact')   # abgebrochene Kompaktierung
+        except FileNotFoundError:
+            pass
+
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b''
+        valid = 0
+        for kind, payload, end in decode(data):
+            self._apply(kind, payload, data[valid:end])
+            valid = end
+
+        self.file = open(self.path, 'ab')
+        if valid < len(data):
+            self.truncated_bytes = len(data) - valid
+            self.file.truncate(valid)
+            print(f"⚠️  Local Store: {self.truncated_bytes} Bytes am Ende unvollständig - abgeschnitten")
+        self.file_bytes = valid
+
+        self.running = True
+        self.thread = Thread(target=self._run, name='local-store', daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        """Commit-Thread stoppen und alles Offene schreiben"""
+        if not self.file:
+            return
+        self.running = False
+        self.wakeup.set()
+        if self.thread:
+            self.thread.join(timeout=2)
+        self.sync()
+        self.file.close()
+        self.file = None
+
+    # ===== SCHLÜSSEL → WERT =====
+
+    def put(self, key, value):
+        self._submit(PUT, [key, value])
+
+    def get(self, key, default=None):
+        with self.lock:
+            return self.values.get(key, default)
+
+    def delete(self, key):
+        with self.lock:
+            if key not in self.values:
+                return
+        self._submit(DELETE, key)
+
+    # ===== DAUERHAFTE QUEUES =====
+
+    def append(self, stream, value):
+        """Eintrag anhängen → seq (für ack)"""
+        with self.lock:   # seq-Vergabe und Reihenfolge im Log atomar
+            seq = self.sequences.get(stream, 0) + 1
+            payload = [stream, seq, value]
+            record = encode(APPEND, payload)
+            self._add_locked(APPEND, payload, record)
+        return seq
+
+    def ack(self, stream, seq):
+        """Eintrag erledigt - fällt bei der nächsten Kompaktierung weg"""
+        self._submit(ACK, [stream, seq])
+
+    def items(self, stream):
+        """Offene Einträge → [(seq, Wert)] in Reihenfolge"""
+        with self.lock:
+            return list(self.queues.get(stream, {}).items())
+
+    # ===== COMMIT =====
+
+    def sync(self):
+        """Sofort schreiben + fsync (z.B. Session-Ende, Shutdown) → True wenn alles auf der Karte ist"""
+        return self._commit()
+
+    def _submit(self, kind, payload):
+        record = encode(kind, payload)   # außerhalb des Locks
+        with self.lock:
+            self._add_locked(kind, payload, record)
+
+    def _add_locked(self, kind, payload, record):
+        self._apply(kind, payload, record)
+        self.pending.append(record)
+        if len(self.pending) >= self.commit_records:
+            self.wakeup.set()
+
+    def _apply(self, kind, payload, record):
+        """Record auf den Zustand anwenden (beim Schreiben und beim Einlesen)"""
+        if kind == PUT:
+            key, value = payload
+            self.values[key] = value
+            self._set_live(('v', key), record)
+        elif kind == DELETE:
+            self.values.pop(payload, None)
+            self._set_live(('v', payload), None)
+        elif kind == APPEND:
+            stream, seq, value = payload
+            self.queues.setdefault(stream, {})[seq] = value
+            self.sequences[stream] = max(self.sequences.get(stream, 0), seq)
+            self._set_live(('q', stream, seq), record)
+        elif kind == ACK:
+            stream, seq = payload
+            self.queues.get(stream, {}).pop(seq, None)
+            self._set_live(('q', stream, seq), None)
+
+    def _set_live(self, key, record):
+        previous = self.live.pop(key, None)
+        if previous is not None:
+            self.live_bytes -= len(previous)
+        if record is not None:
+            self.live[key] = record
+            self.live_bytes += len(record)
+
+    def _run(self):
+        while self.running:
+            self.wakeup.wait(self.commit_interval)
+            self.wakeup.clear()
+            self._commit()
+            if self.file_bytes > COMPACT_MIN_BYTES and self.live_bytes * 2 < self.file_bytes:
+                self.compact()
+
+    def _commit(self):
+        with self.file_lock:
+            with self.lock:
+                batch, self.pending = self.pending, []
+            if not batch:
+                return True
+            data = b''.join(batch)
+            started = time.perf_counter()
+            try:
+                self.file.write(data)
+                self.file.flush()
+                os.fsync(self.file.fileno())
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Local Store Fehler: {e}")
+                with self.lock:
+                    self.pending = batch + self.pending   # nächster Commit versucht es erneut
+                return False
+            self.file_bytes += len(data)
+            self.commits += 1
+            self.records_written += len(batch)
+            self.max_commit_ms = max(self.max_commit_ms, (time.perf_counter() - started) * 1000)
+            return True
+
+    def compact(self):
+        """Aktuellen Stand als neues Log schreiben (tmp + fsync + rename)"""
+        with self.file_lock:
+            with self.lock:
+                records = list(self.live.values())
+                self.pending = []     # schon im Stand enthalten
+            data = b''.join(records)
+            tmp_path = self.path + '.compact'
+            try:
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+                _fsync_directory(self.path)
+            except OSError as e:
+                print(f"⚠️  Local Store Kompaktierung fehlgeschlagen: {e}")
+                with self.lock:
+                    self.pending = records + self.pending   # Stand beim nächsten Commit anhängen
+                return False
+            self.file.close()
+            self.file = open(self.path, 'ab')
+            self.file_bytes = len(data)
+            self.compactions += 1
+            return True
+
+    def stats(self):
+        with self.lock:
+            pending = len(self.pending)
+        return {
+            'file_bytes': self.file_bytes, 'live_bytes': self.live_bytes, 'pending': pending,
+            'commits': self.commits, 'records': self.records_written,
+            'compactions': self.compactions, 'max_commit_ms': round(self.max_commit_ms, 2),
+        }
+
+
+def _fsync_directory(path):
+    """Rename dauerhaft machen (Verzeichniseintrag)"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
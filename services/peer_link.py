@@ -0,0 +1,178 @@
+"""
+Peer Link - direkte LAN-Verbindung zwischen den gepaarten PiTops
+UDP Multicast (TTL 1, bleibt im lokalen Netz) statt Umweg über Supabase: PiTop 1
+schickt jedes Session-Event sofort an PiTop 2, Supabase wird parallel im Hintergrund
+geschrieben und bleibt Fallback (PiTop 2 pollt weiter).
+
+Pairing: beide Geräte kennen die DEVICE_ID des anderen (PEER_DEVICE_ID) und ein
+gemeinsames Geheimnis (PEER_SECRET). Jede Nachricht ist per HMAC-SHA256 signiert -
+fremde oder manipulierte Pakete werden verworfen.
+"""
+
+import hashlib
+import hmac
+import itertools
+import json
+import socket
+import struct
+import uuid
+from collections import deque
+from threading import Thread
+
+import config
+
+PROTOCOL_VERSION = 1
+SEND_REPEAT = 2          # UDP kann Pakete verlieren - jede Nachricht doppelt senden
+SEEN_WINDOW = 256        # Duplikat-Erkennung (boot, seq)
+MAX_PACKET = 8192
+
+
+class PeerLink:
+    def __init__(self, device_id, peer_id, secret, group=None, port=None):
+        self.device_id = device_id
+        self.peer_id = peer_id
+        self.secret = secret.encode()
+        self.group = group or config.PEER_GROUP
+        self.port = port or config.PEER_PORT
+
+        self.boot = uuid.uuid4().hex[:8]   # neue Sequenz nach jedem Neustart
+        self.seq = itertools.count(1)   # next() ist atomar - send() läuft aus mehreren Threads
+        self.seen = deque(maxlen=SEEN_WINDOW)
+        self.handlers = []
+
+        self.send_sock = None
+        self.recv_sock = None
+        self.thread = None
+        self.running = False
+
+        # Statistik
+        self.sent = 0
+        self.received = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_config(cls):
+        """PeerLink aus .env (PEER_DEVICE_ID + PEER_SECRET) - None wenn nicht gepaart"""
+        if not config.PEER_DEVICE_ID:
+            return None
+        if not config.PEER_SECRET:
+            print("⚠️  PEER_DEVICE_ID ohne PEER_SECRET - Peer Link deaktiviert")
+            return None
+        return cls(config.DEVICE_ID, config.PEER_DEVICE_ID, config.PEER_SECRET)
+
+    # ===== SETUP =====
+
+    def start(self):
+        """Sockets öffnen; Empfang nur wenn Handler registriert sind"""
+        try:
+            self.send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+            self.send_sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+            self.send_sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+
+            if self.handlers:
+                self.recv_sock = self._open_receiver()
+                self.running = True
+                self.thread = Thread(target=self._listen, name='peer-link', daemon=True)
+                self.thread.start()
+        except OSError as e:
+            print(f"⚠️  Peer Link nicht verfügbar ({e}) - nur Supabase")
+            self.close()
+            return None
+
+        print(f"🔗 Peer Link: {self.device_id} ↔ {self.peer_id} ({self.group}:{self.port})")
+        return self
+
+    def _open_receiver(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, 'SO_REUSEPORT'):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(('', self.port))
+        membership = struct.pack('4sl', socket.inet_aton(self.group), socket.INADDR_ANY)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        sock.settimeout(1.0)
+        return sock
+
+    def on_message(self, handler):
+        """handler(kind, body) - läuft im Empfangs-Thread"""
+        self.handlers.append(handler)
+
+    def close(self):
+        self.running = False
+        for sock in (self.send_sock, self.recv_sock):
+            if sock:
+                try:
+                    sock.close()
+                except OSError:
+                    pass
+        self.send_sock = self.recv_sock = None
+
+    # ===== SENDEN =====
+
+    def send(self, kind, body):
+        """Nachricht an den Peer (non-blocking, fire-and-forget)"""
+        if not self.send_sock:
+            return False
+        message = {'v': PROTOCOL_VERSION, 'from': self.device_id, 'to': self.peer_id,
+                   'boot': self.boot, 'seq': next(self.seq), 'kind': kind, 'body': body}
+        packet = self._sign(json.dumps(message, separators=(',', ':')).encode())
+        try:
+            for _ in range(SEND_REPEAT):
+                self.send_sock.sendto(packet, (self.group, self.port))
+            self.sent += 1
+            return True
+        except OSError as e:
+            print(f"⚠️  Peer Link Sendefehler: {e}")
+            return False
+
+    # ===== EMPFANGEN =====
+
+    def _listen(self):
+        while self.running:
+            try:
+                packet, _ = self.recv_sock.recvfrom(MAX_PACKET)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            message = self._verify(packet)
+            if message is None:
+                continue
+
+            key = (message['boot'], message['seq'])
+            if key in self.seen:
+                continue
+            self.seen.append(key)
+            self.received += 1
+
+            for handler in self.handlers:
+                try:
+                    handler(message['kind'], message['body'])
+                except Exception as e:
+                    print(f"⚠️  Peer Link Handler Fehler: {e}")
+
+    def _sign(self, data):
+        signature = hmac.new(self.secret, data, hashlib.sha256).hexdigest().encode()
+        return data + b'\n' + signature
+
+    def _verify(self, packet):
+        """Signatur + Pairing prüfen → Nachricht oder None"""
+        data, _, signature = packet.rpartition(b'\n')
+        expected = hmac.new(self.secret, data, hashlib.sha256).hexdigest().encode()
+        if not data or not hmac.compare_digest(signature, expected):
+            self.rejected += 1
+            return None
+        try:
+            message = json.loads(data)
+        except ValueError:
+            self.rejected += 1
+            return None
+
+        # Eigene Pakete (Multicast Loopback) und fremde Paare ignorieren
+        if message.get('from') != self.peer_id or message.get('to') != self.device_id:
+            return None
+        if message.get('v') != PROTOCOL_VERSION:
+            self.rejected += 1
+            return None
+        return message
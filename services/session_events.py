@@ -0,0 +1,280 @@
+"""
+Session Events - append-only Log statt In-Place Status-Updates
+Jede Zustandsänderung ist ein INSERT in session_events (work_started, break_started,
+cancelled, ended, ...). Status, Pausenanzahl und Zeiten werden per Projektion
+inkrementell aus den Events abgeleitet - PiTop 2 liest die Events per Cursor mit.
+Schema: database/migrations/0003_session_events.sql
+"""
+
+import time
+import uuid
+from datetime import datetime
+
+BOOT_ID_FILE = '/proc/sys/kernel/random/boot_id'
+_boot_id = None
+
+# ===== EVENT TYPES =====
+SESSION_STARTED = 'session_started'
+WORK_STARTED = 'work_started'
+WORK_ENDED = 'work_ended'          # Arbeitstimer abgelaufen
+BREAK_STARTED = 'break_started'
+BREAK_ENDED = 'break_ended'        # Pausentimer abgelaufen (PiTop 1 und/oder PiTop 2)
+CANCELLED = 'cancelled'            # Storno der letzten Aktion (payload: action)
+ENDED = 'ended'                    # Session beendet
+
+EVENT_TYPES = (SESSION_STARTED, WORK_STARTED, WORK_ENDED, BREAK_STARTED,
+               BREAK_ENDED, CANCELLED, ENDED)
+
+# Abgeleiteter Status (entspricht den bisherigen sessions.timer_status Werten)
+STATUS_AFTER = {
+    SESSION_STARTED: 'idle',
+    WORK_STARTED: 'working',
+    WORK_ENDED: 'work_ended',
+    BREAK_STARTED: 'break',
+    BREAK_ENDED: 'work_ready',
+    ENDED: 'ended',
+}
+
+
+def event_key(event):
+    """Identität eines Events unabhängig von der DB-id (Peer Link + DB, Wiederholungen)"""
+    return (event.get('device_id'), event.get('boot_id'), event.get('monotonic_ms'), event['event_type'])
+
+
+def _timestamp(event):
+    """Wanduhr-Zeitpunkt eines Events in Sekunden (Unix)"""
+    occurred_at = event.get('occurred_at') or event.get('created_at')
+    if not occurred_at:
+        return None
+    return datetime.fromisoformat(occurred_at.replace('Z', '+00:00')).timestamp()
+
+
+def _elapsed(start, end):
+    """Dauer zwischen zwei Events - monotone ms nur innerhalb desselben Boots desselben Geräts
+
+    Nach einem Neustart beginnt time.monotonic() neu - ohne gleiche boot_id (ältere Events
+    haben keine) zählt die Wanduhr.
+    """
+    if (start.get('device_id') == end.get('device_id')
+            and start.get('boot_id') and start.get('boot_id') == end.get('boot_id')
+            and start.get('monotonic_ms') is not None and end.get('monotonic_ms') is not None):
+        return max(0, end['monotonic_ms'] - start['monotonic_ms']) // 1000
+    begin, finish = _timestamp(start), _timestamp(end)
+    if begin is None or finish is None:
+        return 0
+    return max(0, int(finish - begin))
+
+
+class SessionState:
+    """Projektion einer Session - wird Event für Event fortgeschrieben"""
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.status = 'idle'
+        self.pause_count = 0
+        self.total_work_time = 0
+        self.total_pause_time = 0
+        self.started_at = None
+        self.ended_at = None
+        self.user_name = None
+        self.break_id = None       # event_key des break_started Events der aktuellen/letzten Pause
+        self.last_event_id = 0
+        self.last_event_at = None
+        self.phase_start = None    # work_started / break_started Event der laufenden Phase
+        self.seen = set()          # event_keys - jedes Event zählt nur einmal
+
+    @property
+    def is_ended(self):
+        return self.status == 'ended'
+
+    def apply(self, event):
+        kind = event['event_type']
+        self.last_event_id = max(self.last_event_id, event.get('id') or 0)
+        
+        # Schon per Peer Link (oder doppelt geschrieben) angekommen
+        key = event_key(event)
+        if key in self.seen:
+            return
+        self.seen.add(key)
+        self.last_event_at = event.get('occurred_at') or self.last_event_at
+
+        if kind == SESSION_STARTED:
+            self.started_at = event.get('occurred_at')
+            self.user_name = (event.get('payload') or {}).get('user_name')
+
+        elif kind == WORK_STARTED:
+            self._close_phase(event)
+            self.started_at = self.started_at or event.get('occurred_at')
+            self.phase_start = event
+
+        elif kind == WORK_ENDED:
+            self._close_phase(event)
+
+        elif kind == BREAK_STARTED:
+            self._close_phase(event)
+            self.pause_count += 1
+            self.break_id = key
+            self.phase_start = event
+
+        elif kind == BREAK_ENDED:
+            # PiTop 1 und PiTop 2 melden beide das Pausenende - nur das erste zählt
+            if self.status != 'break':
+                return
+            self._close_phase(event)
+
+        elif kind == CANCELLED:
+            action = (event.get('payload') or {}).get('action')
+            if action == 'break_start' and self.status == 'break':
+                self.pause_count -= 1
+                self.phase_start = None
+                self.status = 'work_ended'
+                return
+            if action == 'work_start' and self.status == 'working':
+                self.phase_start = None
+                self.status = 'idle'
+                return
+            self._close_phase(event)
+            self.status = 'idle'
+            return
+
+        elif kind == ENDED:
+            self._close_phase(event)
+            self.ended_at = event.get('occurred_at')
+
+        self.status = STATUS_AFTER.get(kind, self.status)
+
+    def _close_phase(self, event):
+        if not self.phase_start:
+            return
+        elapsed = _elapsed(self.phase_start, event)
+        if self.phase_start['event_type'] == WORK_STARTED:
+            self.total_work_time += elapsed
+        else:
+            self.total_pause_time += elapsed
+        self.phase_start = None
+
+    def to_dict(self):
+        return {
+            'session_id': self.session_id,
+            'timer_status': self.status,
+            'pause_count': self.pause_count,
+            'total_work_time': self.total_work_time,
+            'total_pause_time': self.total_pause_time,
+            'start_time': self.started_at,
+            'end_time': self.ended_at,
+        }
+
+
+class SessionProjection:
+    """Zustand aller Sessions aus einem Event-Stream (inkrementell)"""
+
+    def __init__(self):
+        self.sessions = {}
+        self.latest_session_id = None
+        self.last_event_id = 0
+
+    def apply(self, event):
+        session_id = event['session_id']
+        state = self.sessions.get(session_id)
+        if state is None:
+            state = self.sessions[session_id] = SessionState(session_id)
+        state.apply(event)
+        if event['event_type'] in (SESSION_STARTED, WORK_STARTED) and not state.is_ended:
+            self.latest_session_id = session_id
+        self.last_event_id = max(self.last_event_id, event.get('id') or 0)
+        return state
+
+    def get(self, session_id):
+        return self.sessions.get(session_id)
+
+    @property
+    def latest(self):
+        return self.sessions.get(self.latest_session_id)
+
+
+class SessionEvents:
+    """Schreibt Events (INSERT) und hält die lokale Projektion aktuell (Schreiber-Seite)"""
+
+    def __init__(self, db, peer=None, writer=None):
+        self.db = db
+        self.peer = peer        # PeerLink: Event sofort an PiTop 2 (LAN)
+        self.writer = writer    # WriteBehind: Supabase im Hintergrund
+        self.projection = SessionProjection()
+
+    def emit(self, session_id, event_type, **payload):
+        if not session_id:
+            return None
+        event = self.db.new_session_event(session_id, event_type, payload or None)
+        if self.peer:
+            self.peer.send('session_event', event)
+
+        if self.writer and self.db.client:
+            self.writer.submit(event_type, self.db.insert_session_event, event)
+        elif self.db.client:
+            self.db.insert_session_event(event)
+
+        # Lokal sofort anwenden - auch wenn der Insert fehlschlug, bleibt der Zustand konsistent
+        return self.projection.apply(event)
+
+    def state(self, session_id):
+        return self.projection.get(session_id)
+
+    def resume(self, session_id, fallback=None):
+        """Projektion einer laufenden Session aus der DB übernehmen (nach Neustart)
+        fallback: Funktion → SessionState (z.B. aus dem Checkpoint), wenn die DB nicht erreichbar ist"""
+        try:
+            if not self.db.client:
+                raise ConnectionError('keine DB-Verbindung')
+            state = self.db.get_session_state(session_id)
+        except Exception as e:
+            if fallback is None:
+                raise
+            print(f"⚠️  Session-Stand nicht aus der DB lesbar ({e}) - nutze lokalen Checkpoint")
+            state = fallback()
+        self.projection.sessions[session_id] = state
+        self.projection.latest_session_id = session_id
+        return state
+
+
+class EventTail:
+    """Liest neue Events per Cursor (id) und schreibt die Projektion fort (Leser-Seite, PiTop 2)"""
+
+    def __init__(self, db, after_id=0):
+        self.db = db
+        self.cursor = after_id
+        self.projection = SessionProjection()
+
+    def start_at_latest_session(self):
+        """Cursor vor das letzte session_started setzen → laufende Session wird nachgespielt"""
+        latest = self.db.get_latest_session_event_id(SESSION_STARTED)
+        self.cursor = max(0, latest - 1) if latest else self.db.get_latest_session_event_id()
+        return self.cursor
+
+    def poll(self):
+        """Neue Events → [(event, state)]"""
+        changes = []
+        for event in self.db.iter_rows('session_events', '*', after_id=self.cursor):
+            changes.append((event, self.projection.apply(event)))
+            self.cursor = event['id']
+        return changes
+
+
+def monotonic_ms():
+    """Monotone Gerätezeit - Dauern bleiben korrekt, auch wenn NTP die Uhr verstellt"""
+    return int(time.monotonic() * 1000)
+
+
+def boot_id():
+    """Kennung des aktuellen Boots (Linux: Kernel boot_id) - monotonic_ms gilt nur innerhalb davon
+
+    Ohne /proc eine Kennung pro Prozess: strenger als nötig, Dauern über einen
+    Programm-Neustart hinweg laufen dann über die Wanduhr.
+    """
+    global _boot_id
+    if _boot_id is None:
+        try:
+            with open(BOOT_ID_FILE) as f:
+                _boot_id = f.read().strip()
+        except OSError:
+            _boot_id = str(uuid.uuid4())
+    return _boot_id
@@ -7,6 +7,7 @@ import time
 from threading import Thread, Event
 from enum import Enum
 import config
+from services.session_events import WORK_STARTED, WORK_ENDED, BREAK_STARTED, BREAK_ENDED, CANCELLED
 
 class TimerMode(Enum):
     IDLE = "idle"
@@ -51,9 +52,9 @@ class TimerService:
         self.is_running = True
         self.stop_event.clear()
         
-        # Timer Status in DB setzen
+        # Timer Status als Event in DB
         if self.session_id:
-            self.db_manager.update_timer_status(self.session_id, "working")
+            self.db_manager.log_session_event(self.session_id, WORK_STARTED)
         
         print("\n" + "="*50)
         print("🟦 ARBEITSZEIT GESTARTET: 30 Minuten")
@@ -76,10 +77,9 @@ class TimerService:
         self.is_running = True
         self.stop_event.clear()
         
-        # Pause Count erhöhen in DB
+        # Pause als Event in DB (Pausenanzahl ergibt sich aus den Events)
         if self.session_id:
-            self.db_manager.increment_pause_count(self.session_id)
-            self.db_manager.update_timer_status(self.session_id, "break")
+            self.db_manager.log_session_event(self.session_id, BREAK_STARTED)
         
         print("\n" + "="*50)
         print("🟩 PAUSENZEIT GESTARTET: 10 Minuten")
@@ -102,7 +102,7 @@ class TimerService:
         
         # Timer Status zurücksetzen
         if self.session_id:
-            self.db_manager.update_timer_status(self.session_id, "idle")
+            self.db_manager.log_session_event(self.session_id, CANCELLED, {'action': 'timer_reset'})
     
     def get_session_stats(self):
         """Gibt Session-Statistiken zurück"""
@@ -113,6 +113,13 @@ class TimerService:
             'break_sessions_count': self.break_sessions_count
         }
     
+    def restore_session_stats(self, stats):
+        """Statistiken aus einem Checkpoint übernehmen (Neustart mitten in der Session)"""
+        self.total_work_time = stats.get('total_work_time', 0)
+        self.total_break_time = stats.get('total_break_time', 0)
+        self.work_sessions_count = stats.get('work_sessions_count', 0)
+        self.break_sessions_count = stats.get('break_sessions_count', 0)
+    
     def reset_session_stats(self):
         """Setzt Statistiken zurück (neue Session)"""
         self.total_work_time = 0
@@ -168,7 +175,7 @@ class TimerService:
             
             # Timer Status setzen
             if self.session_id:
-                self.db_manager.update_timer_status(self.session_id, "work_ended")
+                self.db_manager.log_session_event(self.session_id, WORK_ENDED)
             
             # Discord Benachrichtigung (KEIN Buzzer!)
             self.notification_service.send_work_finished()
@@ -180,7 +187,7 @@ class TimerService:
             
             # Timer Status setzen
             if self.session_id:
-                self.db_manager.update_timer_status(self.session_id, "break_ended")
+                self.db_manager.log_session_event(self.session_id, BREAK_ENDED)
             
             # Discord Benachrichtigung (KEIN Buzzer!)
             self.notification_service.send_break_finished()
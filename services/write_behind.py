@@ -0,0 +1,193 @@
+"""
+Write-Behind - DB-Writes im Hintergrund, in Reihenfolge, mit Wiederholung
+Der lokale Ablauf (Peer-Link, Timer, Buttons) wartet nie auf Supabase. Fällt das
+Internet aus, bleiben die Writes in der Queue und werden danach nachgeholt.
+Mit Local Store (services/local_store.py) wird jeder Write als Methodenname + Argumente
+mitprotokolliert und erst nach Erfolg quittiert - nach Neustart/Stromausfall holt
+start() offene Writes nach - mindestens einmal, Duplikate verhindert die DB-Methode
+(Upsert über session_id bzw. idempotency_key, Update von end_session).
+
+Ein Write liefert True (geschrieben), False (vorübergehend, z.B. Netzwerk → der Kopf
+der Queue wird wiederholt), Retry (Server lehnt ab, evtl. vorübergehend, z.B. 5xx oder
+Fremdschlüssel → wiederholt, aber höchstens max_attempts Versuche und max_age Sekunden)
+oder Rejected (dauerhaft abgelehnt, z.B. 4xx → wird im Stream <name>.dead abgelegt statt
+die Queue für immer zu blockieren).
+"""
+
+import queue
+import time
+from threading import Thread
+
+RETRY_MIN = 1.0
+RETRY_MAX = 30.0
+MAX_ATTEMPTS = 20       # Retry-Ergebnisse: erst ablegen wenn beide Grenzen erreicht sind
+MAX_AGE = 3600.0
+
+
+class Rejected:
+    """Ergebnis eines Writes, der nie gelingen wird - falsy wie False, aber ohne Wiederholung"""
+
+    def __init__(self, error):
+        self.error = error
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return f"Rejected({self.error!r})"
+
+
+class Retry:
+    """Ergebnis eines Writes, den der Server (noch) ablehnt - wird wiederholt, nach
+    max_attempts Versuchen und max_age Sekunden aber abgelegt wie Rejected"""
+
+    def __init__(self, error):
+        self.error = error
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return f"Retry({self.error!r})"
+
+
+class WriteBehind:
+    def __init__(self, name='write-behind', store=None, target=None, max_attempts=MAX_ATTEMPTS, max_age=MAX_AGE):
+        self.name = name
+        self.store = store      # LocalStore: Queue übersteht Neustart/Stromausfall
+        self.target = target    # Objekt, dessen Methoden protokolliert werden (SupabaseManager)
+        self.max_attempts = max_attempts   # Grenzen für Retry - False (Netzwerk) bleibt unbegrenzt
+        self.max_age = max_age
+        self.queue = queue.Queue()
+        self.thread = None
+        self.dead_letters = []  # ohne Local Store: abgelehnte Writes nur im Speicher
+
+        # Statistik
+        self.written = 0
+        self.retries = 0
+        self.rejected = 0
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return self
+        self._restore()
+        self.thread = Thread(target=self._worker, name=self.name, daemon=True)
+        self.thread.start()
+        return self
+
+    def submit(self, label, write, *args):
+        """write(*args) → True bei Erfolg, False = später erneut versuchen, Rejected = ablegen"""
+        self.queue.put((label, write, args, self._journal(label, write, args)))
+
+    def _journal(self, label, write, args):
+        """Write im Local Store protokollieren → seq (None = nur im Speicher)"""
+        if not self.store or getattr(write, '__self__', None) is not self.target:
+            return None
+        try:
+            return self.store.append(self.name, [label, write.__name__, list(args)])
+        except (TypeError, ValueError):
+            return None   # Argumente nicht als JSON darstellbar
+
+    def _restore(self):
+        """Offene Writes aus dem Local Store (vorheriger Lauf) zuerst einreihen"""
+        if not self.store:
+            return
+        restored = 0
+        for seq, (label, method, args) in self.store.items(self.name):
+            write = getattr(self.target, method, None)
+            if not callable(write):
+                # Methode gibt es nicht mehr (z.B. nach einem Update umbenannt) - ablegen statt abstürzen
+                self._dead_letter(label, method, args, f"unbekannte Methode {method}")
+                self.store.ack(self.name, seq)
+                continue
+            self.queue.put((label, write, tuple(args), seq))
+            restored += 1
+        if restored:
+            print(f"📼 {self.name}: {restored} DB-Write(s) aus dem lokalen Log werden nachgeholt")
+        if self.dead:
+            print(f"🪦 {self.name}: {self.dead} abgelehnte(r) DB-Write(s) in {self.dead_stream}")
+
+    @property
+    def dead_stream(self):
+        return f"{self.name}.dead"
+
+    @property
+    def dead(self):
+        """Anzahl abgelegter (dauerhaft abgelehnter) Writes - mit Local Store auch aus früheren Läufen"""
+        if self.store:
+            return len(self.store.items(self.dead_stream)) + len(self.dead_letters)
+        return len(self.dead_letters)
+
+    @property
+    def pending(self):
+        return self.queue.unfinished_tasks   # eingereiht + gerade in Arbeit
+
+    def flush(self, timeout=10.0):
+        """Wartet bis alles geschrieben ist → False wenn nach timeout noch Writes offen sind"""
+        deadline = time.monotonic() + timeout
+        while self.pending and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return not self.pending
+
+    def stop(self, timeout=2.0):
+        if self.thread and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(timeout=timeout)
+        self.thread = None
+        if self.pending:
+            where = "im lokalen Log, beim nächsten Start" if self.store else "verloren"
+            print(f"⚠️  {self.name}: {self.pending} DB-Write(s) nicht geschrieben ({where})")
+        if self.rejected:
+            print(f"🪦 {self.name}: {self.rejected} DB-Write(s) abgelehnt ({self.dead_stream})")
+
+    def _worker(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            label, write, args, seq = item
+
+            # Kopf der Queue wiederholen bis er geschrieben ist (Reihenfolge bleibt erhalten)
+            delay = RETRY_MIN
+            attempts, first_failure = 0, None
+            while True:
+                try:
+                    ok = write(*args)
+                except Exception as e:
+                    print(f"❌ {self.name}: {label} fehlgeschlagen: {e}")
+                    ok = False
+                if isinstance(ok, Retry):
+                    # z.B. Session existiert nie → nicht die ganze Queue für immer blockieren
+                    attempts += 1
+                    first_failure = first_failure or time.monotonic()
+                    if attempts >= self.max_attempts and time.monotonic() - first_failure >= self.max_age:
+                        ok = Rejected(f"{ok.error} (aufgegeben nach {attempts} Versuchen)")
+                if isinstance(ok, Rejected):
+                    self._dead_letter(label, getattr(write, '__name__', repr(write)), args, ok.error)
+                    break
+                if ok is not False and not isinstance(ok, Retry):
+                    break
+                self.retries += 1
+                print(f"🔁 {self.name}: {label} - neuer Versuch in {delay:.0f}s ({self.queue.qsize()} wartend)")
+                time.sleep(delay)
+                delay = min(delay * 2, RETRY_MAX)
+
+            if seq is not None:
+                self.store.ack(self.name, seq)
+            if not isinstance(ok, Rejected):
+                self.written += 1
+            self.queue.task_done()
+
+    def _dead_letter(self, label, method, args, error):
+        """Abgelehnten Write ablegen (Local Store: Stream <name>.dead) - die Queue läuft weiter"""
+        self.rejected += 1
+        entry = [label, method, list(args), str(error)]
+        print(f"🪦 {self.name}: {label} dauerhaft abgelehnt ({error}) - abgelegt in {self.dead_stream}")
+        if self.store:
+            try:
+                self.store.append(self.dead_stream, entry)
+                return
+            except (TypeError, ValueError):
+                pass   # Argumente nicht als JSON darstellbar
+        self.dead_letters.append(entry)
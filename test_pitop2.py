@@ -1,8 +1,8 @@
 """
 🧪 TEST MODE - pi-top 2
 Schnelldurchlauf: 10s Pause
-DB speichert hochgerechnete Werte (x60)
-Holt CO2-Daten aus DB für Report
+Startet main_pitop2 mit verkürzter Pause - Break-Signal kommt wie im Produktivbetrieb per
+Peer Link bzw. EventTail (session_events), CO2-Daten für den Report aus der DB
 """
 
 import os
@@ -13,434 +13,12 @@ if '--device=' not in ' '.join(sys.argv):
     os.environ['DEVICE_OVERRIDE'] = 'pitop2'
 
 import signal
-import time
-from datetime import datetime
-from threading import Thread
-import config
-from hardware import StepCounter
-from services.discord_templates import NotificationService
-from database.supabase_manager import SupabaseManager
-
-# ============================================================
-# GPIO CLEANUP - Ressourcen vor Start freigeben
-# ============================================================
-print("🧹 Bereinige GPIO-Pins vor Start...")
-try:
-    from gpiozero import Device
-    Device.close()
-except Exception as e:
-    pass
-
-try:
-    import lgpio
-    # Alle GPIO-Handles schließen
-    for handle in range(10):
-        try:
-            lgpio.gpiochip_close(handle)
-        except:
-            pass
-except:
-    pass
-
-print("✅ GPIO-Cleanup abgeschlossen\n")
+import main_pitop2
 
 # TEST MODE CONFIGURATION
-TEST_BREAK_DURATION = 10     # 10 Sekunden (statt 600s)
-DB_MULTIPLIER = 60           # Werte x60 für DB
-
-
-class TestBreakStation:
-    def __init__(self):
-        print("\n" + "="*60)
-        print("🧪 TEST MODE - BREAK STATION - pi-top 2")
-        print("="*60)
-        print("⚡ Schnelldurchlauf aktiviert!")
-        print(f"   Pausenphase: {TEST_BREAK_DURATION}s → DB: {TEST_BREAK_DURATION * DB_MULTIPLIER}s")
-        print("="*60 + "\n")
-        
-        # Hardware
-        self.steps = StepCounter()
-        
-        # Services
-        self.notify = NotificationService()
-        self.db = SupabaseManager()
-        
-        # State
-        self.state = "IDLE"
-        self.session_id = None
-        self.pause_number = 0
-        self.pause_start_time = None
-        self.user_name = "User"
-        
-        # Polling
-        self.polling_active = True
-        self.polling_thread = None
-        self.last_session_id = None
-        
-        # Break kann von außen abgebrochen werden
-        self.break_cancelled = False
-        
-        print(f"✅ Test-Initialisierung abgeschlossen\n")
-    
-    # ===== POLLING =====
-    
-    def start_polling(self):
-        print("⏳ Starte Datenbank-Polling (TEST)...")
-        print("   → Suche nach timer_status='break' alle 1 Sekunde\n")
-        
-        self.polling_thread = Thread(target=self._polling_loop, daemon=True)
-        self.polling_thread.start()
-    
-    def _polling_loop(self):
-        poll_interval = 1
-        
-        while self.polling_active:
-            try:
-                if not self.db.client:
-                    time.sleep(poll_interval)
-                    continue
-                
-                result = self.db.client.table('sessions')\
-                    .select('session_id, pause_count, user_name, timer_status')\
-                    .order('start_time', desc=True)\
-                    .limit(1)\
-                    .execute()
-                
-                if not result.data:
-                    time.sleep(poll_interval)
-                    continue
-                
-                session = result.data[0]
-                session_id = session['session_id']
-                status = session.get('timer_status', 'idle')
-                
-                # BREAK SIGNAL
-                if status == 'break' and session_id != self.last_session_id:
-                    self.last_session_id = session_id
-                    
-                    self.session_id = session_id
-                    self.pause_number = session.get('pause_count', 0) + 1
-                    self.user_name = session.get('user_name', 'User')
-                    
-                    print(f"\n✅ BREAK-SIGNAL ERKANNT (TEST)!")
-                    print(f"   Session: {session_id[:8]}...")
-                    print(f"   User: {self.user_name}")
-                    print(f"   Pause #{self.pause_number}\n")
-                    
-                    self._start_break(self.user_name)
-                    
-                    self.last_session_id = None
-                
-                # SESSION BEENDET - Reset
-                elif status in ['ended', 'cancelled']:
-                    if self.state == "BREAK":
-                        print("\n⚠️ Session wurde von PiTop 1 beendet!")
-                        self.break_cancelled = True
-                    self.last_session_id = None
-                
-                time.sleep(poll_interval)
-            
-            except KeyboardInterrupt:
-                break
-            except Exception as e:
-                print(f"⚠️ Polling Fehler: {e}")
-                time.sleep(poll_interval)
-    
-    # ===== CO2 DATA FROM DB =====
-    
-    def _get_co2_stats(self):
-        """🌡️ Holt CO2-Statistiken aus der Datenbank"""
-        if not self.db.client or not self.session_id:
-            return None
-        
-        try:
-            result = self.db.client.table('co2_measurements')\
-                .select('co2_level, tvoc_level, is_alarm')\
-                .eq('session_id', self.session_id)\
-                .execute()
-            
-            if not result.data:
-                print("ℹ️  Keine CO2-Daten gefunden")
-                return None
-            
-            co2_values = [row['co2_level'] for row in result.data if row['co2_level']]
-            tvoc_values = [row['tvoc_level'] for row in result.data if row.get('tvoc_level')]
-            alarm_count = sum(1 for row in result.data if row.get('is_alarm'))
-            
-            if not co2_values:
-                return None
-            
-            stats = {
-                'avg_co2': int(sum(co2_values) / len(co2_values)),
-                'min_co2': min(co2_values),
-                'max_co2': max(co2_values),
-                'avg_tvoc': int(sum(tvoc_values) / len(tvoc_values)) if tvoc_values else 0,
-                'alarm_count': alarm_count,
-                'measurement_count': len(co2_values)
-            }
-            
-            print(f"📊 CO2-Daten geladen: {len(co2_values)} Messungen")
-            return stats
-        
-        except Exception as e:
-            print(f"⚠️ CO2-Daten Fehler: {e}")
-            return None
-    
-    # ===== BREAK SESSION =====
-    
-    def _start_break(self, user_name):
-        print("="*60)
-        print(f"🧪 TEST - PAUSE #{self.pause_number} GESTARTET (10s)")
-        print("="*60)
-        print(f"\n👤 User: {user_name}")
-        print(f"⏱️  Dauer: {TEST_BREAK_DURATION}s (= 10 Min simuliert)")
-        print(f"👣 Schrittzähler aktiv\n")
-        
-        self.state = "BREAK"
-        self.break_cancelled = False
-        self.pause_start_time = time.time()
-        
-        # Schrittzähler starten
-        print("🎯 Starte StepCounter AUTOMATISCH...\n")
-        self.steps.start()
-        
-        # 10 Sekunden Timer
-        start_time = time.time()
-        
-        try:
-            while time.time() - start_time < TEST_BREAK_DURATION:
-                # Check ob Break von PiTop 1 abgebrochen wurde
-                if self.break_cancelled:
-                    print("\n\n⚠️ Break wurde extern abgebrochen!")
-                    break
-                
-                elapsed = time.time() - start_time
-                remaining = TEST_BREAK_DURATION - elapsed
-                
-                steps = self.steps.read()
-                
-                print(f"\r⏱️ {int(remaining)}s verbleibend | 👣 {steps:,} Schritte", 
-                      end='', flush=True)
-                
-                time.sleep(1)
-            
-            if not self.break_cancelled:
-                print(f"\n\n⏰ PAUSE ABGELAUFEN!")
-        
-        except KeyboardInterrupt:
-            print(f"\n\n⚠️ Pause unterbrochen!")
-        
-        finally:
-            self._end_break(user_name)
-    
-    def _end_break(self, user_name):
-        self.state = "IDLE"
-        
-        # Schrittzähler stoppen
-        steps = self.steps.stop()
-        
-        # Statistiken
-        calories = int(steps * 0.05)
-        distance = int(steps * 0.75)
-        
-        # CO2-Daten aus DB holen
-        co2_stats = self._get_co2_stats()
-        
-        print("\n" + "="*60)
-        print(f"📊 TEST - PAUSE #{self.pause_number} STATISTIK")
-        print("="*60)
-        print(f"\n👣 Schritte:     {steps:,}")
-        print(f"🔥 Kalorien:     ~{calories} kcal")
-        print(f"📏 Distanz:      ~{distance}m")
-        
-        # CO2-Stats anzeigen
-        if co2_stats:
-            print(f"\n💨 CO2 Durchschnitt: {co2_stats['avg_co2']} ppm")
-            print(f"💨 CO2 Min/Max:      {co2_stats['min_co2']}/{co2_stats['max_co2']} ppm")
-            if co2_stats['avg_tvoc']:
-                print(f"🌿 TVOC Durchschnitt: {co2_stats['avg_tvoc']} ppb")
-            if co2_stats['alarm_count'] > 0:
-                print(f"⚠️  Alarme:          {co2_stats['alarm_count']}")
-        
-        print(f"\n💾 Echte Zeit: {TEST_BREAK_DURATION}s")
-        print(f"💾 DB Zeit: {TEST_BREAK_DURATION * DB_MULTIPLIER}s ({TEST_BREAK_DURATION * DB_MULTIPLIER // 60} Min)\n")
-        
-        # Nur speichern wenn nicht abgebrochen
-        if not self.break_cancelled:
-            # DB speichern
-            self._save_break_data(steps, calories, distance)
-            
-            # Discord mit CO2-Daten
-            self._send_break_notification(user_name, steps, calories, distance, co2_stats)
-            
-            # Status update
-            self._update_session_status('work_ready')
-        else:
-            print("⚠️ Break wurde abgebrochen - keine Daten gespeichert")
-        
-        # Reset
-        self.steps.reset()
-        self.break_cancelled = False
-        
-        print("✅ Bereit für nächste Pause!\n")
-    
-    def _save_break_data(self, steps, calories, distance):
-        if not self.session_id:
-            print("⚠️ Kann Break-Daten nicht speichern")
-            return
-
-        try:
-            # Verwende die zentrale db.log_steps() Funktion
-            success = self.db.log_steps(
-                session_id=self.session_id,
-                pause_number=self.pause_number,
-                step_count=steps,
-                calories=calories,
-                distance=distance
-            )
-
-            if success:
-                print("✅ Break-Daten in DB gespeichert")
-            else:
-                print("⚠️ Break-Daten-Speicherung fehlgeschlagen")
-
-        except Exception as e:
-            print(f"❌ DB-Fehler: {e}")
-    
-    def _update_session_status(self, status):
-        if not self.db.client or not self.session_id:
-            return
-        
-        try:
-            # Auch pause_count erhöhen
-            self.db.client.table('sessions').update({
-                'timer_status': status,
-                'pause_count': self.pause_number
-            }).eq('session_id', self.session_id).execute()
-            
-            print(f"📊 Session Status: {status}")
-        
-        except Exception as e:
-            print(f"⚠️ Status-Update Fehler: {e}")
-    
-    def _send_break_notification(self, user_name, steps, calories, distance, co2_stats=None):
-        """📱 Discord-Benachrichtigung mit CO2-Daten"""
-        if not self.notify.is_enabled:
-            return
-        
-        try:
-            from requests import post
-            
-            description = f"""
-👤 **User:** {user_name}
-⏱️ **Pause:** #{self.pause_number}
+TEST_BREAK_DURATION = 10     # 10 Sekunden (statt 600s) - frühere Deadline aus break_started gilt
 
-**🏃 Bewegung:**
-👣 Schritte: **{steps:,}**
-🔥 Kalorien: ~{calories} kcal
-📏 Distanz: ~{distance}m
-"""
-            
-            if co2_stats:
-                description += f"""
-**💨 Luftqualität:**
-📊 CO2 Ø: **{co2_stats['avg_co2']} ppm**
-📉 Min: {co2_stats['min_co2']} ppm | 📈 Max: {co2_stats['max_co2']} ppm
-"""
-                if co2_stats['avg_tvoc']:
-                    description += f"🌿 TVOC Ø: {co2_stats['avg_tvoc']} ppb\n"
-                
-                if co2_stats['alarm_count'] > 0:
-                    description += f"⚠️ **{co2_stats['alarm_count']} Luftqualitäts-Alarm(e)**\n"
-                
-                avg_co2 = co2_stats['avg_co2']
-                if avg_co2 < 600:
-                    description += "\n✅ **Luftqualität: Sehr gut!**"
-                elif avg_co2 < 800:
-                    description += "\n🟡 **Luftqualität: Okay**"
-                else:
-                    description += "\n🔴 **Luftqualität: Lüften empfohlen!**"
-            
-            description += "\n\n🧪 **TEST MODE** (10s = 10 Min)"
-            
-            color = 0x00FF00
-            if co2_stats:
-                if co2_stats['avg_co2'] >= 800:
-                    color = 0xFF0000
-                elif co2_stats['avg_co2'] >= 600:
-                    color = 0xFFAA00
-            
-            payload = {
-                "embeds": [{
-                    "title": f"☕ Pause #{self.pause_number} beendet!",
-                    "description": description,
-                    "color": color,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "footer": {"text": "Break Station - PiTop 2 [TEST]"}
-                }]
-            }
-            
-            response = post(self.notify.webhook_url, json=payload, timeout=5)
-            
-            if response.status_code == 204:
-                print("✅ Discord-Benachrichtigung versendet")
-        
-        except Exception as e:
-            print(f"⚠️ Discord-Fehler: {e}")
-    
-    # ===== MAIN =====
-    
-    def start(self):
-        print("\n" + "="*60)
-        print("✅ TEST BREAK STATION AKTIV")
-        print("="*60)
-        print(f"\n🔧 Device: {config.DEVICE_ID}")
-        print(f"📡 Supabase: {'✅' if self.db.client else '❌'}")
-        print(f"🤖 Discord: {'✅' if self.notify.is_enabled else '❌'}")
-        print(f"📊 Schrittzähler: ✅")
-        
-        print("\n🧪 TEST-MODUS:")
-        print(f"   ⚡ Pausenphase: {TEST_BREAK_DURATION}s (statt 10 Min)")
-        print(f"   📊 DB Multiplikator: x{DB_MULTIPLIER}")
-        print(f"   💨 CO2-Daten: Werden aus DB geladen")
-        
-        print("\n💡 FUNKTIONSWEISE:")
-        print("   1. 🔄 Pollt DB (jede Sekunde)")
-        print("   2. ✅ Erkennt timer_status='break'")
-        print("   3. 🏃 Startet StepCounter")
-        print("   4. ⏱️ Läuft 10 Sekunden")
-        print("   5. 💨 Holt CO2-Daten aus DB")
-        print("   6. 💾 Speichert Break-Daten")
-        print("   7. 📱 Sendet Discord (mit CO2)")
-        
-        print("\n⚠️ HINWEIS:")
-        print("   PiTop 2 hat KEINE Buttons!")
-        print("   Steuerung erfolgt über PiTop 1")
-        
-        print("\n" + "="*60)
-        print("👉 Warte auf Break-Signal von PiTop 1...\n")
-        
-        self.start_polling()
-        
-        try:
-            while True:
-                time.sleep(1)
-        
-        except KeyboardInterrupt:
-            self.stop()
-    
-    def stop(self):
-        print("\n\n🛑 Test Break Station wird gestoppt...")
-        
-        self.polling_active = False
-        
-        if self.state == "BREAK":
-            self.steps.stop()
-        
-        if self.polling_thread and self.polling_thread.is_alive():
-            self.polling_thread.join(timeout=2)
-        
-        print("✅ Cleanup abgeschlossen\n")
+main_pitop2.BREAK_DURATION = TEST_BREAK_DURATION
 
 
 def signal_handler(sig, frame):
@@ -450,11 +28,13 @@ def signal_handler(sig, frame):
 
 
 if __name__ == "__main__":
-    station = TestBreakStation()
+    print("\n🧪 TEST-MODUS:")
+    print(f"   ⚡ Pausenphase: {TEST_BREAK_DURATION}s (statt 10 Min)")
+    station = main_pitop2.BreakStation()
     signal.signal(signal.SIGINT, signal_handler)
     
     try:
         station.start()
     except KeyboardInterrupt:
         station.stop()
-        sys.exit(0)
\ No newline at end of file
+        sys.exit(0)